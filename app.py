@@ -1,14 +1,18 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import numpy as np
+import threading
+import time
 from datetime import datetime, timedelta
 
 from src.data import Fetcher, prepare_for_prophet
 from src.models import ForecastModel
 from src.analysis import ForecastAnalyzer
-from src.visualization.plotter import ForecastPlotter
+from src.visualization.plotter import ForecastPlotter, downsample_frame, FORECAST_COLUMNS
+from src.visualization.cache import PlotCache
+from src.visualization.template import ForecastFigureTemplate
+from src.service import ModelPool, JobQueue
+from src.utils import frame_fingerprint, load_config
 
 # Page config
 st.set_page_config(
@@ -17,8 +21,7 @@ st.set_page_config(
     layout="wide"
 )
 
-# Cache functions for performance
-@st.cache_data(ttl=3600)
+# Data and model helpers
 def fetch_stock_data(symbol: str, start_date: str, end_date: str):
     fetcher = Fetcher()
     
@@ -29,154 +32,118 @@ def fetch_stock_data(symbol: str, start_date: str, end_date: str):
     return data
 
 
-@st.cache_data(ttl=3600)
-def train_and_forecast(data, symbol: str, days: int):
-    # Prepare data
-    prophet_data = prepare_for_prophet(data)
-    
-    # Train model
-    model = ForecastModel()
-    model.train(prophet_data)
-    
-    # Generate forecast
-    forecast = model.predict(periods=days)
-    
-    return prophet_data, model, forecast
+@st.cache_resource
+def get_data_pool():
+    # Replaces st.cache_data, which job threads can't use: price history is
+    # fetched once per symbol and date range, so a new horizon or a rerun
+    # doesn't go back to Yahoo
+    return ModelPool(max_size=64, max_age=3600, name='data')
 
 
-def create_forecast_plot(prophet_data, forecast, symbol):
-    fig, ax = plt.subplots(figsize=(16, 8))
-    
-    # Plot historical data (black dots)
-    ax.plot(
-        prophet_data['ds'], 
-        prophet_data['y'], 
-        'k.', 
-        label='Historical Data', 
-        markersize=3, 
-        alpha=0.5
-    )
-    
-    # Plot FORECAST (blue line)
-    ax.plot(
-        forecast['ds'], 
-        forecast['yhat'], 
-        'b-', 
-        linewidth=2.5, 
-        label='Forecast (Expected)', 
-        alpha=0.9
-    )
-    
-    # Plot UPPER LIMIT (green dashed line)
-    ax.plot(
-        forecast['ds'], 
-        forecast['yhat_upper'], 
-        'g--', 
-        linewidth=2, 
-        label='Optimistic Scenario (95%)', 
-        alpha=0.8
-    )
-    
-    # Plot LOWER LIMIT (red dashed line)
-    ax.plot(
-        forecast['ds'], 
-        forecast['yhat_lower'], 
-        'r--', 
-        linewidth=2, 
-        label='Pessimistic Scenario (95%)', 
-        alpha=0.8
-    )
-    
-    # Fill confidence interval
-    x_data = np.array(forecast['ds'].values, dtype='datetime64[ns]')
-    y1_data = np.array(forecast['yhat_lower'].values, dtype=float)
-    y2_data = np.array(forecast['yhat_upper'].values, dtype=float)
-    
-    ax.fill_between(
-        x_data, 
-        y1_data, 
-        y2_data,
-        alpha=0.15, 
-        color='gray', 
-        label='95% Confidence Interval'
-    )
-    
-    # Add vertical line for "today"
-    today = pd.Timestamp.now()
-    today_num = float(mdates.date2num(today.to_pydatetime()))
-    ax.axvline(
-        x=today_num, 
-        color='orange', 
-        linestyle=':', 
-        linewidth=2.5, 
-        label=f'Today ({today.strftime("%Y-%m-%d")})', 
-        alpha=0.8
-    )
+@st.cache_resource
+def get_model_pool():
+    # Shared by every session, so concurrent requests for the same data
+    # wait on one fit instead of each training their own model
+    return ModelPool(max_size=32, max_age=3600)
+
+
+def train_and_forecast(pool, data, symbol: str, days: int):
+    model_key = f'{symbol}:{frame_fingerprint(data)}'
     
-    # Add annotations for final values
-    last_idx = len(forecast) - 1
-    last_date = forecast['ds'].iloc[last_idx]
-    
-    expected_value = forecast['yhat'].iloc[last_idx]
-    optimistic_value = forecast['yhat_upper'].iloc[last_idx]
-    pessimistic_value = forecast['yhat_lower'].iloc[last_idx]
-    
-    # Annotation for OPTIMISTIC (green, at top)
-    ax.annotate(
-        f'Optimistic: ${optimistic_value:.2f}',
-        xy=(last_date, optimistic_value),
-        xytext=(10, 10), 
-        textcoords='offset points',
-        fontsize=11, 
-        fontweight='bold', 
-        color='darkgreen',
-        bbox=dict(boxstyle='round,pad=0.5', facecolor='lightgreen', alpha=0.8),
-        arrowprops=dict(arrowstyle='->', color='green', lw=2)
-    )
+    def fit():
+        # Prepare data
+        prophet_data = prepare_for_prophet(data)
+        
+        # Train model
+        model = ForecastModel()
+        model.train(prophet_data)
+        
+        return prophet_data, model
     
-    # Annotation for EXPECTED (blue, middle)
-    ax.annotate(
-        f'Expected: ${expected_value:.2f}',
-        xy=(last_date, expected_value),
-        xytext=(10, -5), 
-        textcoords='offset points',
-        fontsize=11, 
-        fontweight='bold', 
-        color='darkblue',
-        bbox=dict(boxstyle='round,pad=0.5', facecolor='lightblue', alpha=0.8),
-        arrowprops=dict(arrowstyle='->', color='blue', lw=2)
-    )
+    def predict():
+        prophet_data, model = pool.get(model_key, fit)
+        
+        # Generate forecast
+        forecast = model.predict(periods=days)
+        
+        return prophet_data, model, forecast
     
-    # Annotation for PESSIMISTIC (red, bottom)
-    ax.annotate(
-        f'Pessimistic: ${pessimistic_value:.2f}',
-        xy=(last_date, pessimistic_value),
-        xytext=(10, -20), 
-        textcoords='offset points',
-        fontsize=11, 
-        fontweight='bold', 
-        color='darkred',
-        bbox=dict(boxstyle='round,pad=0.5', facecolor='lightcoral', alpha=0.8),
-        arrowprops=dict(arrowstyle='->', color='red', lw=2)
-    )
+    return pool.get(f'{model_key}:{days}', predict)
+
+
+@st.cache_resource
+def get_job_queue():
+    # Forecasts run off the script thread so reruns don't cancel them
+    return JobQueue(max_workers=2, max_age=3600)
+
+
+def run_forecast_job(report, data_pool, pool, symbol: str, start_date: str, end_date: str, days: int):
+    report(0.05, f"📥 Fetching data for {symbol}...")
+    data = data_pool.get(f'{symbol}:{start_date}:{end_date}', lambda: fetch_stock_data(symbol, start_date, end_date))
     
-    # Styling
-    ax.set_title(
-        f'Price Forecast - {symbol}\nProphet Model with Confidence Intervals', 
-        fontsize=16, 
-        fontweight='bold', 
-        pad=20
+    if data is None or len(data) == 0:
+        raise ValueError(f"Could not fetch data for {symbol}. Please check the symbol and try again.")
+    
+    report(0.3, "🤖 Training Prophet model and generating forecast...")
+    prophet_data, model, forecast = train_and_forecast(pool, data, symbol, days)
+    
+    return {
+        'symbol': symbol,
+        'days': days,
+        'records': len(data),
+        'prophet_data': prophet_data,
+        'model': model,
+        'forecast': forecast
+    }
+
+
+@st.cache_resource
+def get_plot_cache():
+    # Same cache directory as the CLI, under output.directory
+    try:
+        output_dir = load_config().get_output_config().get('directory', './outputs')
+    except (FileNotFoundError, ValueError):
+        output_dir = './outputs'
+    return PlotCache(f'{output_dir}/.plot_cache')
+
+
+@st.cache_resource
+def get_forecast_template():
+    # One figure shared by all sessions; matplotlib figures are not
+    # thread-safe, so renders are serialized with the lock
+    template = ForecastFigureTemplate(figsize=(16, 8), show_summary=False)
+    return template, threading.Lock()
+
+
+def cached_forecast_plot(prophet_data, forecast, symbol):
+    plot_cache = get_plot_cache()
+    key = plot_cache.key(
+        [prophet_data[['ds', 'y']], forecast[FORECAST_COLUMNS]],
+        {
+            'renderer': 'app_forecast',
+            'symbol': symbol,
+            'today': pd.Timestamp.now().strftime('%Y-%m-%d')
+        }
     )
-    ax.set_xlabel('Date', fontsize=13, fontweight='bold')
-    ax.set_ylabel('Price (USD)', fontsize=13, fontweight='bold')
-    ax.legend(loc='upper left', fontsize=10, framealpha=0.9)
-    ax.grid(True, alpha=0.3, linestyle='--')
     
-    # Format dates
-    fig.autofmt_xdate()
-    plt.tight_layout()
+    cached = plot_cache.lookup(key, 'png')
+    if cached is None:
+        template, lock = get_forecast_template()
+        with lock:
+            fig = create_forecast_plot(template, prophet_data, forecast, symbol)
+            cached = plot_cache.store(key, fig, 'png', dpi=fig.dpi)
     
-    return fig
+    return str(cached)
+
+
+def create_forecast_plot(template, prophet_data, forecast, symbol):
+    # Limit points to the figure's pixel width
+    max_points = int(template.fig.get_figwidth() * template.fig.dpi)
+    prophet_data = downsample_frame(prophet_data[['ds', 'y']], ['y'], max_points)
+    forecast = downsample_frame(forecast[FORECAST_COLUMNS], FORECAST_COLUMNS[1:], max_points)
+    
+    # Only line data, the band and annotation text change between symbols
+    return template.update(prophet_data, forecast, symbol)
 
 
 def analyze_range_quality(range_value: float, expected_price: float):
@@ -256,28 +223,43 @@ if forecast_btn:
         st.error("⚠️ Please enter a stock symbol!")
         st.stop()
     
-    # Fetch data
-    with st.spinner(f"📥 Fetching data for {symbol}..."):
-        data = fetch_stock_data(
-            symbol,
-            start_date.strftime('%Y-%m-%d'),
-            end_date.strftime('%Y-%m-%d')
-        )
-    
-    if data is None or len(data) == 0:
-        st.error(f"❌ Could not fetch data for {symbol}. Please check the symbol and try again.")
-        st.stop()
-    
-    st.success(f"✅ Fetched {len(data)} records for {symbol}")
+    start = start_date.strftime('%Y-%m-%d')
+    end = end_date.strftime('%Y-%m-%d')
     
-    # Train and forecast
-    with st.spinner("🤖 Training Prophet model and generating forecast..."):
-        prophet_data, model, forecast = train_and_forecast(data, symbol, forecast_days)
+    # Resolve the shared pools here, job threads have no script context
+    data_pool = get_data_pool()
+    pool = get_model_pool()
     
+    st.session_state['job_id'] = get_job_queue().submit(
+        f'{symbol}:{start}:{end}:{forecast_days}',
+        lambda report: run_forecast_job(report, data_pool, pool, symbol, start, end, forecast_days)
+    )
+
+job = get_job_queue().get(st.session_state.get('job_id'))
+
+if job is not None and not job.finished:
+    # Poll until the background job completes
+    st.progress(job.progress, text=job.message)
+    time.sleep(0.5)
+    st.rerun()
+
+if job is not None and job.status == 'failed':
+    st.error(f"❌ {job.error}")
+    st.stop()
+
+if job is not None:
+    # Render the job's own inputs, not whatever the sidebar shows now
+    symbol = job.result['symbol']
+    forecast_days = job.result['days']
+    prophet_data = job.result['prophet_data']
+    model = job.result['model']
+    forecast = job.result['forecast']
+    
+    st.success(f"✅ Fetched {job.result['records']} records for {symbol}")
     st.success(f"✅ Forecast generated for {forecast_days} days!")
     
     # Analyze
-    analyzer = ForecastAnalyzer()
+    analyzer = ForecastAnalyzer.from_config(model.config)
     current_price = float(prophet_data['y'].iloc[-1])
     
     # Metrics
@@ -329,10 +311,8 @@ if forecast_btn:
     with tab1:
         st.subheader("Price Forecast")
         
-        # Create styled plot (SEM forecast_days)
-        fig = create_forecast_plot(prophet_data, forecast, symbol)
-        st.pyplot(fig)
-        plt.close()
+        # Create styled plot (SEM forecast_days), reused when unchanged
+        st.image(cached_forecast_plot(prophet_data, forecast, symbol), use_container_width=True)
     
     with tab2:
         st.subheader("Forecast Components")
@@ -0,0 +1,118 @@
+import argparse
+import json
+import logging
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from benchmarks.synthetic import price_history
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_BUDGETS = ROOT / 'benchmarks' / 'memory_budgets.json'
+
+# Same targets as `main.py`
+TARGETS = ['predict', 'analyze', 'plot', 'export']
+
+
+def load_budgets(path: str = str(DEFAULT_BUDGETS)) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def run_pipeline(years: float, config_file: str = 'config.yaml', dpi: Optional[int] = None, plots: bool = True) -> Dict[str, Any]:
+    from src.pipeline import build_forecast_pipeline
+    from src.utils import load_config
+    from src.utils.memory import memory_profiling
+    from src.utils.profiling import get_profiler, profile_symbol
+    
+    cfg = load_config(config_file)
+    output_dir = tempfile.mkdtemp(prefix='bench-memory-')
+    cfg.config['output'] = {**cfg.get_output_config(), 'directory': output_dir, 'plot_cache': False}
+    if dpi is not None:
+        cfg.config['output']['plot_dpi'] = dpi
+    
+    def fetch(symbol: str, start: str, end: str) -> Any:
+        with get_profiler().stage('fetch'):
+            return price_history(symbol, years=years)
+    
+    # One-off import allocations would otherwise be charged to the first run
+    import prophet
+    import src.visualization.plotter
+    
+    pipeline = build_forecast_pipeline(cfg, 'SYN', cfg.get_forecast_config()['days'], fetch=fetch)
+    targets = TARGETS if plots else [target for target in TARGETS if target != 'plot']
+    
+    with memory_profiling() as profiler, profile_symbol('SYN'):
+        results = pipeline.run(targets)
+    
+    forecast = results['predict']
+    return {
+        'years': years,
+        'rows': len(results['preprocess']) if 'preprocess' in results else None,
+        'forecast_columns': len(forecast.columns),
+        'forecast_mb': float(forecast.memory_usage(deep=True).sum()) / (1024 * 1024),
+        'peak_rss_mb': profiler.sampler.peak_since(0),
+        'stages': profiler.memory_summary()
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"\n📦 {report['years']:g} years ({report['rows']} rows) — forecast frame "
+        f"{report['forecast_mb']:.1f} MB in {report['forecast_columns']} columns, peak RSS {report['peak_rss_mb']:.0f} MB"
+    )
+    print(f"   {'stage':<32} {'calls':>5} {'traced MB':>10} {'retained MB':>12} {'RSS MB':>8}")
+    for total in report['stages']:
+        rss = f"{total['rss_peak_mb']:.0f}" if total['rss_peak_mb'] is not None else '-'
+        print(f"   {total['stage']:<32} {total['calls']:>5} {total['traced_peak_mb']:>10.1f} {total['retained_mb']:>12.1f} {rss:>8}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from src.utils.logger import setup_logger
+    from src.utils.memory import check_budgets
+    
+    parser = argparse.ArgumentParser(description='Measure per-stage memory of the forecast pipeline on synthetic data')
+    parser.add_argument('--years', type=float, nargs='+', default=[1, 5, 10, 30], help='History lengths to run, in years of daily bars')
+    parser.add_argument('--config', type=str, default='config.yaml', help='Configuration file')
+    parser.add_argument('--dpi', type=int, help='Plot DPI (default: output.plot_dpi in the config)')
+    parser.add_argument('--no-plots', action='store_true', help='Skip the plot stage')
+    parser.add_argument('--json', type=str, help='Write the reports to a JSON file')
+    parser.add_argument('--check', nargs='?', const=str(DEFAULT_BUDGETS), help='Fail if a stage exceeds its budget (default budgets file if no path)')
+    args = parser.parse_args(argv)
+    
+    setup_logger(level='WARNING')
+    for name in ('prophet', 'cmdstanpy'):
+        logging.getLogger(name).disabled = True
+    
+    budgets = load_budgets(args.check) if args.check else None
+    if budgets is not None:
+        # Budgets only hold for the size and DPI they were set for
+        runs = [(budgets['years'], budgets.get('dpi'))]
+    else:
+        runs = [(years, args.dpi) for years in args.years]
+    
+    print("🧠 Memory benchmark (tracemalloc peaks per stage, sampled RSS)")
+    reports = []
+    for years, dpi in runs:
+        reports.append(run_pipeline(years, args.config, dpi=dpi, plots=not args.no_plots))
+        print_report(reports[-1])
+    
+    if args.json:
+        Path(args.json).write_text(json.dumps(reports, indent=2), encoding='utf-8')
+        print(f"💾 Results saved: {args.json}")
+    
+    if budgets is not None:
+        violations = check_budgets(reports[0]['stages'], budgets['budgets_mb'])
+        for violation in violations:
+            print(f"❌ {violation}")
+        if violations:
+            return 1
+        print("✅ All stages within budget")
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ['prophet', 'cmdstanpy', 'matplotlib', 'yfinance', 'pandas', 'streamlit']
+
+# Entry points the cron jobs and the service hit on every spawn
+SCENARIOS = {
+    'cli_help': [sys.executable, 'main.py', '--help'],
+    'import_packages': [sys.executable, '-c', 'import src.data, src.models, src.analysis, src.visualization, src.service, src.utils'],
+    'load_config': [sys.executable, '-c', 'from src.utils import load_config; load_config().validate()'],
+}
+
+
+def loaded_heavy_modules(code: str) -> list[str]:
+    probe = f'{code}\nimport sys\nprint(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+    result = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    lines = result.stdout.strip().splitlines()
+    return [m for m in lines[-1].split(',') if m] if lines else []
+
+
+def time_command(command: list[str], repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Measure CLI and package startup time')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per scenario')
+    parser.add_argument('--json', type=str, help='Write results to a JSON file')
+    args = parser.parse_args()
+    
+    print(f"⏱️  Startup benchmark ({args.repeat} runs per scenario)")
+    
+    results = {}
+    for name, command in SCENARIOS.items():
+        timings = time_command(command, args.repeat)
+        results[name] = {
+            'median_s': statistics.median(timings),
+            'min_s': min(timings),
+            'max_s': max(timings)
+        }
+        print(f"   {name:<18} median {results[name]['median_s'] * 1000:7.1f} ms   min {results[name]['min_s'] * 1000:7.1f} ms")
+    
+    heavy = loaded_heavy_modules('import main, src.data, src.models, src.analysis, src.visualization, src.service, src.utils')
+    results['heavy_modules_on_import'] = heavy
+    print(f"   Heavy modules loaded on import: {', '.join(heavy) if heavy else 'none'}")
+    
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"💾 Results saved: {args.json}")
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,326 @@
+import argparse
+import functools
+import json
+import logging
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from benchmarks.synthetic import forecast_frame, price_history, universe
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Slowdown (as a fraction of the baseline median) that fails a hot path, and
+# the absolute change below which timings are treated as noise
+DEFAULT_THRESHOLD = 0.25
+MIN_DELTA_S = 0.005
+
+SCALES: Dict[str, Dict[str, Any]] = {
+    'small': {'years': 3, 'freq': 'D', 'symbols': 10, 'periods': 90},
+    'medium': {'years': 10, 'freq': 'D', 'symbols': 50, 'periods': 365},
+    'large': {'years': 30, 'freq': 'D', 'symbols': 200, 'periods': 365},
+    'intraday': {'years': 0.25, 'freq': '5min', 'symbols': 10, 'periods': 78},
+}
+
+MODEL_CONFIG = {'yearly_seasonality': True, 'weekly_seasonality': True, 'daily_seasonality': False}
+
+
+class Workload:
+    # Inputs for one scale, built on first use and shared by its benchmarks
+    def __init__(self, scale: str, seed: int = 0):
+        self.scale = scale
+        self.params = SCALES[scale]
+        self.seed = seed
+        self.output_dir = tempfile.mkdtemp(prefix=f'bench-{scale}-')
+    
+    @functools.cached_property
+    def history(self) -> Any:
+        return price_history('SYN', years=self.params['years'], freq=self.params['freq'], seed=self.seed)
+    
+    @functools.cached_property
+    def prepared(self) -> Any:
+        from src.data import prepare_for_prophet
+        
+        return prepare_for_prophet(self.history)
+    
+    @functools.cached_property
+    def model_config(self) -> Dict[str, Any]:
+        return {**MODEL_CONFIG, 'daily_seasonality': self.params['freq'] != 'D'}
+    
+    @functools.cached_property
+    def model(self) -> Any:
+        from src.models import ForecastModel
+        
+        model = ForecastModel(config=self.model_config)
+        model.train(self.prepared)
+        return model
+    
+    @functools.cached_property
+    def forecast(self) -> Any:
+        return self.model.predict(periods=self.params['periods'], freq=self.params['freq'])
+    
+    @functools.cached_property
+    def universe(self) -> Dict[str, Any]:
+        return universe(self.params['symbols'], years=self.params['years'], freq=self.params['freq'], seed=self.seed)
+    
+    @functools.cached_property
+    def universe_prepared(self) -> Dict[str, Any]:
+        from src.data import prepare_for_prophet
+        
+        return {symbol: prepare_for_prophet(data) for symbol, data in self.universe.items()}
+    
+    @functools.cached_property
+    def universe_forecasts(self) -> Dict[str, Any]:
+        return {
+            symbol: forecast_frame(data, periods=self.params['periods'], freq=self.params['freq'])
+            for symbol, data in self.universe_prepared.items()
+        }
+    
+    @functools.cached_property
+    def plotter(self) -> Any:
+        from src.visualization.plotter import ForecastPlotter
+        
+        return ForecastPlotter(output_dir=self.output_dir, dpi=100)
+    
+    @functools.cached_property
+    def analyzer(self) -> Any:
+        from src.analysis import ForecastAnalyzer
+        
+        return ForecastAnalyzer()
+
+
+class Benchmark:
+    def __init__(self, name: str, fn: Callable[[Workload], Any], hot: bool = False, rounds: int = 5, warmup: bool = True):
+        self.name = name
+        self.fn = fn
+        # Only hot paths fail the comparison; the rest are reported
+        self.hot = hot
+        self.rounds = rounds
+        self.warmup = warmup
+
+
+def _preprocess(w: Workload) -> Any:
+    from src.data import prepare_for_prophet
+    
+    return prepare_for_prophet(w.history)
+
+
+def _train(w: Workload) -> Any:
+    from src.models import ForecastModel
+    
+    ForecastModel(config=w.model_config).train(w.prepared)
+
+
+def _pooled_train(w: Workload) -> Any:
+    from src.models import PooledModel
+    
+    PooledModel().train(w.universe_prepared)
+
+
+def _optimize_sell(w: Workload) -> Any:
+    from src.analysis import SellOptimizer
+    
+    SellOptimizer(min_hold_days=5, tranches=3, spacing_days=5).optimize(w.universe_forecasts)
+
+
+def _preprocess_universe(w: Workload) -> Any:
+    from src.data import prepare_for_prophet
+    
+    for data in w.universe.values():
+        prepare_for_prophet(data)
+
+
+BENCHMARKS = [
+    Benchmark('preprocess', _preprocess, hot=True),
+    Benchmark('preprocess.universe', _preprocess_universe),
+    Benchmark('train', _train, hot=True, rounds=2),
+    Benchmark('pooled.train', _pooled_train, rounds=3),
+    Benchmark('predict', lambda w: w.model.predict(periods=w.params['periods'], freq=w.params['freq']), hot=True, rounds=3),
+    Benchmark('analyze.get_future_values', lambda w: w.analyzer.get_future_values(w.forecast, days=w.params['periods'])),
+    Benchmark('analyze.find_optimal_sell_date', lambda w: w.analyzer.find_optimal_sell_date(w.forecast), hot=True),
+    Benchmark('analyze.optimize_sell', _optimize_sell, rounds=3),
+    Benchmark('analyze.generate_scenarios', lambda w: w.analyzer.generate_scenarios(w.forecast)),
+    Benchmark('analyze.calculate_volatility', lambda w: w.analyzer.calculate_volatility(w.forecast, window=90), hot=True),
+    Benchmark('plot.forecast', lambda w: w.plotter.plot_forecast(w.model, w.forecast, 'SYN'), hot=True, rounds=3),
+    Benchmark('plot.components', lambda w: w.plotter.plot_components(w.model, w.forecast, 'SYN'), rounds=1, warmup=False),
+    Benchmark('plot.comparison', lambda w: w.plotter.create_comparison_plot(w.universe_forecasts, list(w.universe_forecasts)), rounds=3),
+    Benchmark('export', lambda w: w.analyzer.export_to_csv(w.forecast, f'{w.output_dir}/forecast_SYN.csv', include_components=True), hot=True, rounds=3),
+]
+
+
+def selected(name: str, scales: list[str], pattern: Optional[str] = None) -> bool:
+    return name.split('/')[0] in scales and (not pattern or re.search(pattern, name) is not None)
+
+
+def time_benchmark(benchmark: Benchmark, workload: Workload, repeat: Optional[int] = None) -> Dict[str, Any]:
+    if benchmark.warmup:
+        benchmark.fn(workload)
+    
+    timings = []
+    for _ in range(repeat or benchmark.rounds):
+        start = time.perf_counter()
+        benchmark.fn(workload)
+        timings.append(time.perf_counter() - start)
+    
+    return {
+        'median_s': statistics.median(timings),
+        'min_s': min(timings),
+        'stdev_s': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'rounds': len(timings),
+        'rows': len(workload.history),
+        'hot': benchmark.hot
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_suite(scales: list[str], pattern: Optional[str] = None, repeat: Optional[int] = None, seed: int = 0) -> Dict[str, Any]:
+    from src.utils.logger import setup_logger
+    
+    # Keep the timings free of console I/O
+    setup_logger(level='WARNING')
+    for name in ('prophet', 'cmdstanpy'):
+        logging.getLogger(name).disabled = True
+    
+    results: Dict[str, Any] = {}
+    for scale in scales:
+        workload = Workload(scale, seed=seed)
+        for benchmark in BENCHMARKS:
+            name = f'{scale}/{benchmark.name}'
+            if not selected(name, scales, pattern):
+                continue
+            
+            results[name] = time_benchmark(benchmark, workload, repeat)
+            print(f"   {name:<40} median {results[name]['median_s'] * 1000:9.1f} ms   min {results[name]['min_s'] * 1000:9.1f} ms")
+    
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'scales': {scale: SCALES[scale] for scale in scales}
+        },
+        'results': results
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> list[Dict[str, Any]]:
+    rows = []
+    
+    for name in sorted(set(baseline['results']) | set(current['results'])):
+        base = baseline['results'].get(name)
+        cur = current['results'].get(name)
+        row: Dict[str, Any] = {'name': name, 'baseline_s': None, 'current_s': None, 'ratio': None}
+        
+        if base is None or cur is None:
+            row['status'] = 'new' if base is None else 'missing'
+            rows.append(row)
+            continue
+        
+        row.update(baseline_s=base['median_s'], current_s=cur['median_s'])
+        row['ratio'] = cur['median_s'] / base['median_s'] if base['median_s'] > 0 else None
+        delta = cur['median_s'] - base['median_s']
+        
+        if row['ratio'] is None or abs(delta) < MIN_DELTA_S:
+            row['status'] = 'ok'
+        elif row['ratio'] > 1 + threshold:
+            row['status'] = 'regressed' if cur.get('hot', base.get('hot')) else 'slower'
+        elif row['ratio'] < 1 / (1 + threshold):
+            row['status'] = 'faster'
+        else:
+            row['status'] = 'ok'
+        
+        rows.append(row)
+    
+    return rows
+
+
+def print_comparison(rows: list[Dict[str, Any]], threshold: float) -> bool:
+    print(f"📊 Comparison against baseline (threshold {threshold:.0%})")
+    
+    icons = {'ok': '  ', 'faster': '🚀', 'slower': '⚠️ ', 'regressed': '❌', 'new': '➕', 'missing': '➖'}
+    for row in rows:
+        if row['ratio'] is None:
+            print(f"   {icons[row['status']]} {row['name']:<40} {row['status']}")
+            continue
+        print(
+            f"   {icons[row['status']]} {row['name']:<40} {row['baseline_s'] * 1000:9.1f} ms -> "
+            f"{row['current_s'] * 1000:9.1f} ms  ({row['ratio']:.2f}x)"
+        )
+    
+    regressed = [row['name'] for row in rows if row['status'] == 'regressed']
+    if regressed:
+        print(f"❌ {len(regressed)} hot path(s) regressed: {', '.join(regressed)}")
+    else:
+        print("✅ No hot-path regressions")
+    
+    return not regressed
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save(results: Dict[str, Any], path: str) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print(f"💾 Results saved: {path}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the forecast hot paths on synthetic data')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    run = commands.add_parser('run', help='Run the benchmarks')
+    run.add_argument('--scale', action='append', choices=list(SCALES), help='Scale to run (repeatable, default: small)')
+    run.add_argument('--filter', type=str, help='Only run benchmarks whose scale/name matches this regex')
+    run.add_argument('--repeat', type=int, help='Timed rounds per benchmark (default: per benchmark)')
+    run.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data')
+    run.add_argument('--output', type=str, help='Write results to this JSON file (e.g. a new baseline)')
+    run.add_argument('--baseline', type=str, help='Compare against this baseline and fail on hot-path regressions')
+    run.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Allowed slowdown as a fraction of the baseline')
+    
+    cmp = commands.add_parser('compare', help='Compare two result files')
+    cmp.add_argument('baseline', type=str)
+    cmp.add_argument('current', type=str)
+    cmp.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Allowed slowdown as a fraction of the baseline')
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == 'compare':
+        return 0 if print_comparison(compare(_load(args.baseline), _load(args.current), args.threshold), args.threshold) else 1
+    
+    scales = args.scale or ['small']
+    print(f"⏱️  Benchmark suite (scales: {', '.join(scales)})")
+    results = run_suite(scales, args.filter, args.repeat, args.seed)
+    
+    if args.output:
+        _save(results, args.output)
+    
+    if args.baseline:
+        baseline = _load(args.baseline)
+        # Benchmarks this run did not select are not reported as missing
+        baseline['results'] = {name: value for name, value in baseline['results'].items() if selected(name, scales, args.filter)}
+        return 0 if print_comparison(compare(baseline, results, args.threshold), args.threshold) else 1
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import zlib
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+# Regular US session, in minutes after midnight
+SESSION_OPEN = 9 * 60 + 30
+SESSION_CLOSE = 16 * 60
+
+
+def _rng(symbol: str, seed: int) -> np.random.Generator:
+    # Same symbol and seed always give the same series, independent of order
+    return np.random.default_rng([seed, zlib.crc32(symbol.encode('utf-8'))])
+
+
+def trading_index(end: str, periods: int, freq: str = 'D') -> pd.DatetimeIndex:
+    if freq == 'D':
+        return pd.bdate_range(end=end, periods=periods, name='Date')
+    
+    step = int(pd.Timedelta(freq).total_seconds() // 60)
+    if step <= 0 or step > SESSION_CLOSE - SESSION_OPEN:
+        raise ValueError(f"Unsupported intraday frequency: {freq}")
+    
+    minutes = np.arange(SESSION_OPEN, SESSION_CLOSE, step)
+    days = pd.bdate_range(end=end, periods=-(-periods // len(minutes)))
+    
+    stamps = days.values[:, None] + (minutes * 60_000_000_000).astype('timedelta64[ns]')[None, :]
+    return pd.DatetimeIndex(stamps.ravel()[-periods:], name='Date')
+
+
+def price_history(
+    symbol: str = 'SYN',
+    years: float = 5,
+    freq: str = 'D',
+    end: Optional[str] = None,
+    seed: int = 0,
+    start_price: Optional[float] = None,
+    periods: Optional[int] = None
+) -> pd.DataFrame:
+    rng = _rng(symbol, seed)
+    
+    bars_per_day = 1 if freq == 'D' else (SESSION_CLOSE - SESSION_OPEN) // int(pd.Timedelta(freq).total_seconds() // 60)
+    periods = periods or int(years * TRADING_DAYS * bars_per_day)
+    # Histories end today so forecasts reach into the future like live data
+    index = trading_index(end or pd.Timestamp.now().strftime('%Y-%m-%d'), periods, freq)
+    dt = 1 / (TRADING_DAYS * bars_per_day)
+    
+    # Geometric Brownian motion whose drift and volatility switch between
+    # a few regimes, plus a yearly cycle so seasonality has something to fit
+    n_regimes = max(1, int(periods * dt))
+    regime = np.minimum((np.arange(periods) * dt).astype(int), n_regimes - 1)
+    drift = rng.normal(0.07, 0.15, n_regimes)[regime]
+    vol = rng.uniform(0.15, 0.45, n_regimes)[regime]
+    
+    shocks = rng.standard_normal(periods)
+    log_returns = (drift - 0.5 * vol ** 2) * dt + vol * np.sqrt(dt) * shocks
+    season = 0.03 * np.sin(2 * np.pi * index.dayofyear.to_numpy() / 365.25)
+    
+    price = start_price or rng.uniform(20, 400)
+    close = price * np.exp(np.cumsum(log_returns) + season - season[0])
+    
+    spread = np.abs(rng.standard_normal(periods)) * vol * np.sqrt(dt) * close
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + spread,
+        'Low': np.minimum(open_, close) - spread,
+        'Close': close,
+        'Volume': rng.integers(100_000, 10_000_000, periods)
+    }, index=index)
+
+
+def universe(n_symbols: int, years: float = 5, freq: str = 'D', seed: int = 0) -> dict[str, pd.DataFrame]:
+    symbols = [f'SYN{i:04d}' for i in range(n_symbols)]
+    return {symbol: price_history(symbol, years=years, freq=freq, seed=seed) for symbol in symbols}
+
+
+def forecast_frame(prophet_data: pd.DataFrame, periods: int = 365, freq: str = 'D', seed: int = 0) -> pd.DataFrame:
+    # Same columns as ForecastModel.predict(), without paying for a fit, so
+    # analysis, plotting and export can be measured at any size
+    rng = np.random.default_rng(seed)
+    
+    last = prophet_data['ds'].iloc[-1]
+    future = pd.date_range(start=last, periods=periods + 1, freq=freq)[1:]
+    ds = pd.DatetimeIndex(prophet_data['ds']).append(future)
+    n = len(ds)
+    
+    y = prophet_data['y'].to_numpy(dtype=float)
+    slope = (y[-1] - y[0]) / max(len(y) - 1, 1)
+    trend = np.concatenate((y, y[-1] + slope * np.arange(1, periods + 1)))
+    
+    t = np.arange(n)
+    weekly = 0.002 * trend * np.sin(2 * np.pi * t / 7)
+    yearly = 0.02 * trend * np.sin(2 * np.pi * ds.dayofyear.to_numpy() / 365.25)
+    yhat = trend + weekly + yearly
+    
+    # Uncertainty grows over the forecast horizon
+    width = 0.02 * trend * (1 + np.maximum(t - len(y), 0) / max(periods, 1)) + rng.uniform(0, 0.005, n) * trend
+    zeros = np.zeros(n)
+    
+    return pd.DataFrame({
+        'ds': ds,
+        'trend': trend,
+        'yhat_lower': yhat - width,
+        'yhat_upper': yhat + width,
+        'trend_lower': trend,
+        'trend_upper': trend,
+        'additive_terms': weekly + yearly,
+        'additive_terms_lower': weekly + yearly,
+        'additive_terms_upper': weekly + yearly,
+        'weekly': weekly,
+        'weekly_lower': weekly,
+        'weekly_upper': weekly,
+        'yearly': yearly,
+        'yearly_lower': yearly,
+        'yearly_upper': yearly,
+        'multiplicative_terms': zeros,
+        'multiplicative_terms_lower': zeros,
+        'multiplicative_terms_upper': zeros,
+        'yhat': yhat
+    })
@@ -1,142 +1,365 @@
 import sys
 import argparse
+import logging
 from pathlib import Path
-from src.data import Fetcher, prepare_for_prophet
-from src.models import ForecastModel
-from src.analysis import ForecastAnalyzer
-from src.visualization.plotter import ForecastPlotter
 from src.utils import load_config
 
+logger = logging.getLogger('src.cli')
+
+def serve(args) -> int:
+    from src.service import build_service, create_server
+    
+    cfg = load_config()
+    cfg.validate()
+    
+    service_config = cfg.get('service', {})
+    host = args.host or service_config.get('host', '127.0.0.1')
+    port = args.port or service_config.get('port', 8000)
+    
+    server = create_server(build_service(cfg), host, port)
+    logger.info("🚀 Forecast service listening on http://%s:%s", host, port)
+    logger.info("   Endpoints: /forecast, /scenarios, /optimal-sell-date, /health, /metrics")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("\n👋 Shutting down forecast service")
+    finally:
+        server.server_close()
+    
+    return 0
+
+def batch(args) -> int:
+    from src.pipeline import BatchRunner, read_symbols
+    
+    cfg = load_config()
+    cfg.validate()
+    
+    if args.days:
+        cfg.config['forecast']['days'] = args.days
+    if args.ensemble:
+        cfg.config['ensemble'] = {**(cfg.get('ensemble') or {}), 'enabled': True}
+    
+    try:
+        symbols = read_symbols(args.symbols_file)
+    except (FileNotFoundError, ValueError) as e:
+        logger.error("❌ Symbols file error: %s", e)
+        return 1
+    
+    runner = BatchRunner(cfg, checkpoint_dir=args.checkpoint_dir)
+    states = runner.run(symbols, workers=args.workers, resume=not args.fresh)
+    
+    failed = [symbol for symbol, state in states.items() if state.get('status') != 'done']
+    if failed:
+        logger.warning("   Failed symbols: %s", ', '.join(failed))
+        logger.warning("   Re-run the same command to retry them")
+        return 1
+    
+    return 0
+
+def monitor(args) -> int:
+    import pandas as pd
+    from src.data import Fetcher, prepare_for_prophet
+    from src.models import ModelRegistry
+    from src.monitoring import DriftMonitor, monitor_symbols
+    from src.pipeline import read_symbols
+    
+    cfg = load_config()
+    cfg.validate()
+    
+    output_dir = cfg.get_output_config().get('directory', './outputs')
+    monitoring_config = {'state_file': f'{output_dir}/monitoring/drift.npy', **(cfg.get('monitoring') or {})}
+    registry = ModelRegistry(cfg.get('registry', {}).get('directory', './outputs/models'))
+    
+    try:
+        if args.symbols_file:
+            symbols = read_symbols(args.symbols_file)
+        else:
+            symbols = [args.symbol.upper()] if args.symbol else registry.list_symbols()
+    except (FileNotFoundError, ValueError) as e:
+        logger.error("❌ Symbols file error: %s", e)
+        return 1
+    
+    def load_forecast(symbol: str):
+        # The forecast exported by the last run for this symbol
+        path = Path(output_dir) / f'forecast_{symbol}.csv'
+        return pd.read_csv(path, parse_dates=['ds']) if path.exists() else None
+    
+    def since(symbol: str):
+        meta = registry.meta(symbol)
+        return meta.get('history_end') if meta else None
+    
+    def fetch_actual(symbol: str, start: str):
+        return prepare_for_prophet(Fetcher().fetch(symbol, start, 'today'))
+    
+    drift = DriftMonitor.from_config(monitoring_config)
+    flagged = monitor_symbols(drift, symbols, load_forecast, fetch_actual, since=since)
+    logger.info("💾 Monitor state saved: %s", drift.save())
+    
+    if not flagged:
+        logger.info("✅ No drift in %s symbol(s)", len(symbols))
+    for symbol, reasons in flagged.items():
+        logger.info("⚠️  %s needs a refit: %s", symbol, ', '.join(reasons))
+    
+    return 0
+
+def schedule(args) -> int:
+    import pandas as pd
+    from src.models import ModelRegistry
+    from src.monitoring import DriftMonitor
+    from src.pipeline import BatchRunner, RetrainScheduler, read_symbols
+    
+    cfg = load_config()
+    cfg.validate()
+    
+    if args.ensemble:
+        cfg.config['ensemble'] = {**(cfg.get('ensemble') or {}), 'enabled': True}
+    
+    output_dir = cfg.get_output_config().get('directory', './outputs')
+    monitoring_config = {'state_file': f'{output_dir}/monitoring/drift.npy', **(cfg.get('monitoring') or {})}
+    scheduler_config = {'state_file': f'{output_dir}/monitoring/scheduler.json', **(cfg.get('scheduler') or {})}
+    if args.workers:
+        scheduler_config['workers'] = args.workers
+    
+    registry = ModelRegistry(cfg.get('registry', {}).get('directory', './outputs/models'))
+    
+    try:
+        symbols = read_symbols(args.symbols_file) if args.symbols_file else registry.list_symbols()
+    except (FileNotFoundError, ValueError) as e:
+        logger.error("❌ Symbols file error: %s", e)
+        return 1
+    
+    # Refits go through the batch worker, so they leave the same registry
+    # entries, forecast CSVs and checkpoints as a batch run
+    runner = BatchRunner(cfg, save_plots=False)
+    drift = DriftMonitor.from_config(monitoring_config)
+    scheduler = RetrainScheduler.from_config(
+        scheduler_config, runner.retrainer(scheduler_config.get('workers', 1)), registry=registry, monitor=drift
+    )
+    
+    demand_file = scheduler_config.get('demand_file')
+    if demand_file and Path(demand_file).exists():
+        for row in pd.read_csv(demand_file).itertuples(index=False):
+            scheduler.record_demand(row.symbol, row.requests)
+    
+    report = scheduler.run_cycle(symbols, budget=args.budget)
+    logger.info("💾 Scheduler state saved: %s", scheduler.save())
+    if drift.path is not None:
+        drift.save()
+    
+    if report['deferred']:
+        logger.info("   Next in line: %s", ', '.join(report['deferred'][:10]))
+    
+    return 1 if report['failed'] else 0
+
 def main():
     parser = argparse.ArgumentParser(description='Stock price forecasting')
+    parser.add_argument('command', nargs='?', default='run', choices=['run', 'serve', 'monitor', 'schedule'], help='Run a single forecast, start the HTTP service, check stored forecasts for drift or refit the most urgent models')
     parser.add_argument('--symbol', type=str, help='Stock symbol')
     parser.add_argument('--days', type=int, help='Forecast days')
+    parser.add_argument('--host', type=str, help='Service host (serve only)')
+    parser.add_argument('--port', type=int, help='Service port (serve only)')
+    parser.add_argument('--symbols-file', type=str, help='Forecast every symbol listed in this file (one per line)')
+    parser.add_argument('--workers', type=int, help='Parallel worker processes for --symbols-file')
+    parser.add_argument('--checkpoint-dir', type=str, help='Checkpoint directory for --symbols-file')
+    parser.add_argument('--budget', type=float, help='CPU seconds of refits for this cycle (schedule only, default: scheduler.cpu_budget in config.yaml)')
+    parser.add_argument('--fresh', action='store_true', help='Ignore checkpoints from previous batch runs')
+    parser.add_argument('--ensemble', action='store_true', help='Fit the ensemble configured in config.yaml instead of a single model')
+    parser.add_argument('--no-cache', action='store_true', help='Re-run every pipeline stage instead of reusing cached artifacts')
+    parser.add_argument('--profile', action='store_true', help='Record per-stage wall/CPU time, peak RSS and rows to a JSON report')
+    parser.add_argument('--profile-output', type=str, help='Path of the --profile JSON report')
+    parser.add_argument('--cprofile', type=str, help='Also write a cProfile dump to this path (implies --profile)')
+    parser.add_argument('--log-level', type=str, choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], help='Log level (default: logging.level in config.yaml)')
+    parser.add_argument('--log-format', type=str, choices=['text', 'json'], help='Log format (default: logging.format in config.yaml)')
+    parser.add_argument('--metrics-file', type=str, help='Write Prometheus metrics to this file when done (default: metrics.textfile in config.yaml)')
     args = parser.parse_args()
     
-    print("=" * 80)
-    print("📊 STOCK PRICE FORECASTING WITH PROPHET")
-    print("=" * 80)
+    setup_logging(args)
+    
+    if args.profile or args.cprofile:
+        code = profile(args)
+    else:
+        code = dispatch(args)
+    
+    write_metrics(args)
+    return code
+
+def setup_logging(args) -> None:
+    from src.utils.logger import configure_logging
+    
+    try:
+        cfg = load_config()
+    except (FileNotFoundError, ValueError):
+        cfg = None
+    
+    json_format = args.log_format == 'json' if args.log_format else None
+    configure_logging(cfg, level=args.log_level, json_format=json_format)
+
+def write_metrics(args) -> None:
+    path = args.metrics_file
+    if not path:
+        try:
+            path = (load_config().get('metrics') or {}).get('textfile')
+        except (FileNotFoundError, ValueError):
+            path = None
+    if not path:
+        return
+    
+    from src.utils.metrics import REGISTRY
+    
+    logger.info("📈 Metrics saved: %s", REGISTRY.write_textfile(path))
+
+def dispatch(args) -> int:
+    if args.command == 'serve':
+        return serve(args)
+    
+    if args.command == 'monitor':
+        return monitor(args)
+    
+    if args.command == 'schedule':
+        return schedule(args)
+    
+    if args.symbols_file:
+        return batch(args)
+    
+    return run(args)
+
+def profile(args) -> int:
+    import cProfile
+    from src.utils.profiling import profiling
     
     try:
+        output_dir = load_config().get_output_config().get('directory', './outputs')
+    except (FileNotFoundError, ValueError):
+        output_dir = './outputs'
+    report_path = args.profile_output or f'{output_dir}/profile.json'
+    
+    profiler = cProfile.Profile() if args.cprofile else None
+    
+    with profiling() as stages:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            code = dispatch(args)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+    
+    stages.print_summary()
+    logger.info("💾 Profile report saved: %s", stages.save(report_path))
+    
+    if profiler is not None:
+        profiler.dump_stats(args.cprofile)
+        logger.info("💾 cProfile dump saved: %s (view with: python -m pstats %s)", args.cprofile, args.cprofile)
+    
+    return code
+
+def run(args) -> int:
+    logger.info("=" * 80)
+    logger.info("📊 STOCK PRICE FORECASTING WITH PROPHET")
+    logger.info("=" * 80)
+    
+    try:
+        # Heavy dependencies (prophet, matplotlib, yfinance) are only imported
+        # for an actual run, so --help and argument errors return instantly
+        from src.models import ModelRegistry
+        from src.analysis import ForecastAnalyzer
+        from src.pipeline import ArtifactStore, build_forecast_pipeline
+        from src.utils.logger import log_context
+        from src.utils.profiling import profile_symbol
+        
         # Load config
-        print("\n🔧 Step 1: Loading Configuration...")
+        logger.info("\n🔧 Step 1: Loading Configuration...")
         cfg = load_config()
         cfg.validate()
         
         stock_config = cfg.get_stock_config()
-        model_config = cfg.get_model_config()
         forecast_config = cfg.get_forecast_config()
         output_config = cfg.get_output_config()
+        pipeline_config = cfg.get('pipeline', {})
+        
+        if args.ensemble:
+            cfg.config['ensemble'] = {**(cfg.get('ensemble') or {}), 'enabled': True}
         
         symbol = args.symbol if args.symbol else stock_config['symbol']
         start = stock_config['start']
         end = stock_config['end']
         forecast_days = args.days if args.days else forecast_config['days']
+        output_dir = output_config.get('directory', './outputs')
         
-        print(f"   Symbol: {symbol}")
-        print(f"   Period: {start} to {end}")
-        print(f"   Forecast: {forecast_days} days")
-        
-        # Fetch
-        print(f"\n📥 Step 2: Fetching Data for {symbol}...")
-        f = Fetcher()
-        
-        if not f.validate_symbol(symbol):
-            print(f"❌ Invalid symbol: {symbol}")
-            return 1
-        
-        data = f.fetch(symbol, start, end)
-        print(f"   ✅ Fetched {len(data)} records")
-        
-        # Preprocess
-        print("\n🧹 Step 3: Preprocessing Data...")
-        prophet_data = prepare_for_prophet(data)
-        
-        stats = {
-            'min': prophet_data['y'].min(),
-            'max': prophet_data['y'].max(),
-            'mean': prophet_data['y'].mean()
-        }
-        print(f"   Price range: ${stats['min']:.2f} - ${stats['max']:.2f}")
-        print(f"   Mean price: ${stats['mean']:.2f}")
-        
-        # Train
-        print("\n🤖 Step 4: Training Prophet Model...")
-        model = ForecastModel(config=model_config)
-        model.train(prophet_data)
-        print(f"   ✅ Trained on {len(prophet_data)} samples")
-        
-        # Forecast
-        print(f"\n🔮 Step 5: Generating Forecasts...")
-        forecast = model.predict(periods=forecast_days)
+        logger.info("   Symbol: %s", symbol)
+        logger.info("   Period: %s to %s", start, end)
+        logger.info("   Forecast: %s days", forecast_days)
         
-        # Visualize
-        print("\n📊 Step 6: Creating Visualizations...")
-        output_dir = output_config.get('directory', './outputs')
-        dpi = output_config.get('plot_dpi', 300)
+        # Run stages, reusing cached artifacts whose inputs are unchanged
+        logger.info("\n⚙️  Step 2: Running Pipeline for %s...", symbol)
+        store = None
+        if pipeline_config.get('cache', True):
+            store = ArtifactStore(pipeline_config.get('cache_dir', f'{output_dir}/.pipeline_cache'))
         
-        plotter = ForecastPlotter(output_dir=output_dir, dpi=dpi)
+        pipeline = build_forecast_pipeline(cfg, symbol, forecast_days, store)
+        with log_context(symbol=symbol), profile_symbol(symbol):
+            results = pipeline.run(['predict', 'analyze', 'plot', 'export'], force=args.no_cache)
         
-        # Main forecast plot
-        forecast_path = plotter.plot_forecast(model.model, forecast, symbol)
+        analysis = results['analyze']
+        logger.info("   Price range: $%.2f - $%.2f", analysis['min'], analysis['max'])
+        logger.info("   Mean price: $%.2f", analysis['mean'])
         
-        # Components plot
-        components_path = plotter.plot_components(model, forecast, symbol)
+        # Share the fitted model with other processes (e.g. the Streamlit app)
+        registry_config = cfg.get('registry', {})
+        if pipeline.status.get('train') == 'ran' and registry_config.get('enabled', True):
+            registry = ModelRegistry(registry_config.get('directory', './outputs/models'))
+            registry.save(symbol, results['train'])
         
         # Analyze
-        print("\n📈 Step 7: Analyzing Results...")
-        analyzer = ForecastAnalyzer()
-        
-        current_price = float(prophet_data['y'].iloc[-1])
-        analyzer.print_summary(forecast, current_price, symbol)
+        logger.info("\n📈 Step 3: Analyzing Results...")
+        with log_context(symbol=symbol), profile_symbol(symbol):
+            ForecastAnalyzer.from_config(cfg.get_model_config()).print_summary(results['predict'], analysis['current_price'], symbol)
         
-        # Export CSV
-        if output_config.get('save_csv', True):
-            csv_file = f'{output_dir}/forecast_{symbol}.csv'
-            analyzer.export_to_csv(forecast, csv_file, include_components=True)
+        cached = [name for name, status in pipeline.status.items() if status == 'cached']
+        if cached:
+            logger.info("⏭️  Reused cached stages: %s", ', '.join(cached))
         
         # Success
-        print("=" * 80)
-        print("✅ FORECASTING COMPLETED SUCCESSFULLY!")
-        print("=" * 80)
-        print(f"\n📁 Output files saved to: {output_dir}/")
-        print(f"   • Forecast plot: {Path(forecast_path).name}")
-        print(f"   • Components plot: {Path(components_path).name}")
-        if output_config.get('save_csv', True):
-            print(f"   • CSV data: forecast_{symbol}.csv")
-        print()
+        logger.info("=" * 80)
+        logger.info("✅ FORECASTING COMPLETED SUCCESSFULLY!")
+        logger.info("=" * 80)
+        logger.info("\n📁 Output files saved to: %s/", output_dir)
+        logger.info("   • Forecast plot: %s", Path(results['plot']['forecast']).name)
+        logger.info("   • Components plot: %s", Path(results['plot']['components']).name)
+        if 'csv' in results['export']:
+            logger.info("   • CSV data: %s", Path(results['export']['csv']).name)
+        logger.info('')
         
         return 0
     
     except FileNotFoundError as e:
-        print(f"\n❌ Configuration Error: {e}")
-        print("   Please ensure config.yaml exists in the project root.")
+        logger.error("\n❌ Configuration Error: %s", e)
+        logger.info("   Please ensure config.yaml exists in the project root.")
         return 1
     
     except ValueError as e:
-        print(f"\n❌ Data Error: {e}")
-        print("   This may be caused by:")
-        print("   • Invalid date range")
-        print("   • No data available for the specified period")
-        print("   • Invalid stock symbol")
+        logger.error("\n❌ Data Error: %s", e)
+        logger.info("   This may be caused by:")
+        logger.info("   • Invalid date range")
+        logger.info("   • No data available for the specified period")
+        logger.info("   • Invalid stock symbol")
         return 1
     
     except ImportError as e:
-        print(f"\n❌ Import Error: {e}")
-        print("\n💡 Solution: Install missing dependencies")
-        print("   Run: uv sync")
+        logger.error("\n❌ Import Error: %s", e)
+        logger.info("\n💡 Solution: Install missing dependencies")
+        logger.info("   Run: uv sync")
         return 1
     
     except KeyError as e:
-        print(f"\n❌ Configuration Error: Missing key {e}")
-        print("   Please check your config.yaml file.")
+        logger.error("\n❌ Configuration Error: Missing key %s", e)
+        logger.info("   Please check your config.yaml file.")
         return 1
     
     except Exception as e:
-        print(f"\n❌ Unexpected Error: {e}")
-        print("\n🐛 Debug information:")
-        import traceback
-        traceback.print_exc()
+        logger.error("\n❌ Unexpected Error: %s", e)
+        logger.exception("\n🐛 Debug information:")
         return 1
 
 if __name__ == '__main__':
@@ -1,3 +1,20 @@
-from .forecast import ForecastAnalyzer, calculate_metrics
+from typing import TYPE_CHECKING
 
-__all__ = ['ForecastAnalyzer', 'calculate_metrics']
+from src.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .forecast import ForecastAnalyzer, calculate_metrics
+    from .optimizer import SellOptimizer
+    from .portfolio import PortfolioAnalyzer
+    from .scenarios import ScenarioEngine, ScenarioSet
+
+__all__ = ['ForecastAnalyzer', 'calculate_metrics', 'ScenarioEngine', 'ScenarioSet', 'SellOptimizer', 'PortfolioAnalyzer']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'ForecastAnalyzer': '.forecast',
+    'calculate_metrics': '.forecast',
+    'ScenarioEngine': '.scenarios',
+    'ScenarioSet': '.scenarios',
+    'SellOptimizer': '.optimizer',
+    'PortfolioAnalyzer': '.portfolio',
+})
@@ -2,9 +2,15 @@
 # pyright: reportGeneralTypeIssues=false
 # pyright: reportReturnType=false
 
+import logging
 import pandas as pd
 from typing import Optional, Dict, Any
 
+from src.utils.metrics import AVG_INTERVAL_WIDTH, current_symbol, instrumented
+from src.utils.profiling import profiled
+
+logger = logging.getLogger(__name__)
+
 def calculate_metrics(data: pd.DataFrame) -> Dict[str, float]:
     metrics = {
         'mean': float(data['Close'].mean()),
@@ -17,9 +23,15 @@ def calculate_metrics(data: pd.DataFrame) -> Dict[str, float]:
 
 
 class ForecastAnalyzer:
-    def __init__(self):
-        pass
+    def __init__(self, interval_width: float = 0.8):
+        # Coverage of the yhat_lower/yhat_upper band the forecasts carry
+        self.interval_width = interval_width
+    
+    @classmethod
+    def from_config(cls, model_config: Dict[str, Any]) -> 'ForecastAnalyzer':
+        return cls(model_config.get('interval_width', 0.8))
     
+    @profiled('analyze.get_future_values')
     def get_future_values(self, forecast: pd.DataFrame, days: int = 30) -> pd.DataFrame:
         today = pd.Timestamp.now().normalize()
         future_forecast = forecast[forecast['ds'] > today].copy()
@@ -29,6 +41,7 @@ class ForecastAnalyzer:
         
         return future_forecast
     
+    @profiled('analyze.find_optimal_sell_date')
     def find_optimal_sell_date(self, forecast: pd.DataFrame, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
         # Handle empty forecast
         if len(forecast) == 0:
@@ -76,6 +89,7 @@ class ForecastAnalyzer:
             'days_from_now': (pd.Timestamp(optimal_row['ds']) - pd.Timestamp.now()).days
         }
     
+    @profiled('analyze.generate_scenarios')
     def generate_scenarios(self, forecast: pd.DataFrame, target_date: Optional[str] = None) -> Dict[str, Any]:
         if target_date is None:
             target_date = forecast['ds'].max().strftime('%Y-%m-%d')
@@ -89,11 +103,14 @@ class ForecastAnalyzer:
         
         row = target_data.iloc[0]
         
+        # Each bound of the interval leaves this much probability beyond it
+        tail = round((1 - self.interval_width) / 2, 6)
+        
         scenarios: Dict[str, Any] = {
             'optimistic': {
                 'price': float(row['yhat_upper']),
-                'probability': 0.025,
-                'description': 'Best case scenario (97.5th percentile)'
+                'probability': tail,
+                'description': f'Best case scenario ({100 * (1 - tail):g}th percentile)'
             },
             'expected': {
                 'price': float(row['yhat']),
@@ -102,13 +119,14 @@ class ForecastAnalyzer:
             },
             'pessimistic': {
                 'price': float(row['yhat_lower']),
-                'probability': 0.025,
-                'description': 'Worst case scenario (2.5th percentile)'
+                'probability': tail,
+                'description': f'Worst case scenario ({100 * tail:g}th percentile)'
             }
         }
         
         return scenarios
     
+    @profiled('analyze.calculate_volatility')
     def calculate_volatility(self, forecast: pd.DataFrame, window: int = 30) -> Dict[str, Any]:
         future = self.get_future_values(forecast, days=window)
         
@@ -120,6 +138,8 @@ class ForecastAnalyzer:
         yhat_upper_values = future['yhat_upper'].astype(float)
         yhat_lower_values = future['yhat_lower'].astype(float)
         
+        AVG_INTERVAL_WIDTH.set(float((yhat_upper_values - yhat_lower_values).mean()), symbol=current_symbol())
+        
         volatility: Dict[str, Any] = {
             'std_dev': float(yhat_values.std()),
             'coefficient_of_variation': float(yhat_values.std() / yhat_values.mean()),
@@ -130,13 +150,14 @@ class ForecastAnalyzer:
         
         return volatility
     
+    @profiled('analyze.print_summary')
     def print_summary(self, forecast: pd.DataFrame, current_price: float, symbol: str) -> None:
-        print(f"\n{'='*80}")
-        print(f"📊 FORECAST SUMMARY - {symbol}")
-        print(f"{'='*80}")
+        logger.info("\n%s", '=' * 80)
+        logger.info("📊 FORECAST SUMMARY - %s", symbol)
+        logger.info("%s", '=' * 80)
         
         # Current info
-        print(f"\n💰 Current Price: ${current_price:.2f}")
+        logger.info("\n💰 Current Price: $%.2f", current_price)
         
         # Future predictions
         future_30 = self.get_future_values(forecast, days=30)
@@ -144,40 +165,41 @@ class ForecastAnalyzer:
         
         if len(future_30) > 0:
             last_30 = future_30.iloc[-1]
-            print(f"\n📈 30-Day Forecast:")
-            print(f"   Expected:    ${float(last_30['yhat']):.2f}")
-            print(f"   Optimistic:  ${float(last_30['yhat_upper']):.2f}")
-            print(f"   Pessimistic: ${float(last_30['yhat_lower']):.2f}")
+            logger.info("\n📈 30-Day Forecast:")
+            logger.info("   Expected:    $%.2f", float(last_30['yhat']))
+            logger.info("   Optimistic:  $%.2f", float(last_30['yhat_upper']))
+            logger.info("   Pessimistic: $%.2f", float(last_30['yhat_lower']))
             
             change_30 = ((float(last_30['yhat']) - current_price) / current_price) * 100
-            print(f"   Change: {change_30:+.2f}%")
+            logger.info("   Change: %+.2f%%", change_30)
         
         if len(future_90) > 0:
             last_90 = future_90.iloc[-1]
-            print(f"\n📈 90-Day Forecast:")
-            print(f"   Expected:    ${float(last_90['yhat']):.2f}")
-            print(f"   Optimistic:  ${float(last_90['yhat_upper']):.2f}")
-            print(f"   Pessimistic: ${float(last_90['yhat_lower']):.2f}")
+            logger.info("\n📈 90-Day Forecast:")
+            logger.info("   Expected:    $%.2f", float(last_90['yhat']))
+            logger.info("   Optimistic:  $%.2f", float(last_90['yhat_upper']))
+            logger.info("   Pessimistic: $%.2f", float(last_90['yhat_lower']))
             
             change_90 = ((float(last_90['yhat']) - current_price) / current_price) * 100
-            print(f"   Change: {change_90:+.2f}%")
+            logger.info("   Change: %+.2f%%", change_90)
         
         # Optimal sell date
         optimal = self.find_optimal_sell_date(forecast)
         if 'error' not in optimal:
-            print(f"\n🎯 Optimal Sell Date: {optimal['date']}")
-            print(f"   Expected Price: ${optimal['price']:.2f}")
-            print(f"   Days from now: {optimal['days_from_now']}")
+            logger.info("\n🎯 Optimal Sell Date: %s", optimal['date'])
+            logger.info("   Expected Price: $%.2f", optimal['price'])
+            logger.info("   Days from now: %s", optimal['days_from_now'])
         
         # Volatility
         volatility = self.calculate_volatility(forecast, window=90)
         if 'error' not in volatility:
-            print(f"\n📊 Volatility (90-day):")
-            print(f"   Std Dev: ${volatility['std_dev']:.2f}")
-            print(f"   Avg Confidence Range: ${volatility['avg_confidence_range']:.2f}")
+            logger.info("\n📊 Volatility (90-day):")
+            logger.info("   Std Dev: $%.2f", volatility['std_dev'])
+            logger.info("   Avg Confidence Range: $%.2f", volatility['avg_confidence_range'])
         
-        print(f"\n{'='*80}\n")
+        logger.info("\n%s\n", '=' * 80)
     
+    @instrumented('export')
     def export_to_csv(self, forecast: pd.DataFrame, output_path: str, include_components: bool = False) -> None:
         if include_components:
             # Include all columns
@@ -187,4 +209,4 @@ class ForecastAnalyzer:
             essential = ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
             forecast[essential].to_csv(output_path, index=False)
         
-        print(f"✅ Forecast exported to: {output_path}")
+        logger.info("✅ Forecast exported to: %s", output_path, extra={'rows': len(forecast)})
@@ -0,0 +1,195 @@
+import logging
+from statistics import NormalDist
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+
+def stack_columns(frames: Dict[str, pd.DataFrame], columns: list[str], start: pd.Timestamp, end: pd.Timestamp) -> tuple[pd.DatetimeIndex, list[np.ndarray]]:
+    # Columns of per-symbol frames as (symbols x dates) arrays on the union
+    # of their dates, NaN where a symbol has no row. The frames are
+    # concatenated once and scattered into place, with no per-symbol work.
+    if not frames:
+        return pd.DatetimeIndex([]), [np.empty((0, 0)) for _ in columns]
+    
+    combined = pd.concat(frames.values(), ignore_index=True)
+    rows = np.repeat(np.arange(len(frames)), [len(frame) for frame in frames.values()])
+    dates = combined['ds'].to_numpy(dtype='datetime64[ns]')
+    
+    keep = (dates >= start.to_datetime64()) & (dates <= end.to_datetime64())
+    grid, positions = np.unique(dates[keep], return_inverse=True)
+    
+    stacked = []
+    for column in columns:
+        array = np.full((len(frames), len(grid)), np.nan)
+        array[rows[keep], positions] = combined[column].to_numpy(dtype=float)[keep]
+        stacked.append(array)
+    
+    return pd.DatetimeIndex(grid), stacked
+
+
+def stack_forecasts(forecasts: Dict[str, pd.DataFrame], start_date: Optional[str] = None, end_date: Optional[str] = None, interval_width: float = 0.8) -> tuple[list[str], pd.DatetimeIndex, np.ndarray, np.ndarray]:
+    # Expected price and its standard deviation, read back from the interval
+    start = pd.Timestamp(start_date) if start_date is not None else pd.Timestamp.now().normalize()
+    end = pd.Timestamp(end_date) if end_date is not None else pd.Timestamp.max
+    z = NormalDist().inv_cdf(0.5 + interval_width / 2)
+    
+    ds, (mean, lower, upper) = stack_columns(forecasts, ['yhat', 'yhat_lower', 'yhat_upper'], start, end)
+    return list(forecasts), ds, mean, (upper - lower) / (2 * z)
+
+
+def _suffix_argmax(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # For every column t, the max over columns >= t and where it sits,
+    # earliest date on ties. Computed as a running max over the reversed rows.
+    reversed_values = values[:, ::-1]
+    running = np.maximum.accumulate(reversed_values, axis=1)
+    
+    positions = np.arange(values.shape[1])
+    at_max = np.where(reversed_values == running, positions, 0)
+    latest = np.maximum.accumulate(at_max, axis=1)
+    
+    return running[:, ::-1], (values.shape[1] - 1 - latest)[:, ::-1]
+
+
+class SellOptimizer:
+    # Chooses sell dates per symbol by risk-adjusted value: expected proceeds
+    # after costs minus `risk_aversion` standard deviations. A position can
+    # be exited in `tranches` equal parts at least `spacing_days` apart
+    # (e.g. when it is too large to sell in one day).
+    def __init__(
+        self,
+        cost_rate: float = 0.001,
+        fixed_cost: float = 0.0,
+        min_hold_days: int = 0,
+        risk_aversion: float = 0.5,
+        tranches: int = 1,
+        spacing_days: int = 1,
+        interval_width: float = 0.8
+    ):
+        if tranches < 1:
+            raise ValueError("tranches must be at least 1")
+        if spacing_days < 1:
+            raise ValueError("spacing_days must be at least 1")
+        
+        self.cost_rate = cost_rate
+        self.fixed_cost = fixed_cost
+        self.min_hold_days = min_hold_days
+        self.risk_aversion = risk_aversion
+        self.tranches = tranches
+        self.spacing_days = spacing_days
+        self.interval_width = interval_width
+    
+    def tranche_values(self, ds: pd.DatetimeIndex, mean: np.ndarray, sd: np.ndarray, quantities: np.ndarray, entry_dates: np.ndarray) -> np.ndarray:
+        fraction = quantities[:, None] / self.tranches
+        values = fraction * (mean * (1 - self.cost_rate) - self.risk_aversion * sd) - self.fixed_cost
+        
+        earliest = entry_dates + np.timedelta64(self.min_hold_days, 'D')
+        allowed = (ds.to_numpy()[None, :] >= earliest[:, None]) & ~np.isnan(values)
+        return np.where(allowed, values, -np.inf)
+    
+    def _schedule(self, ds: pd.DatetimeIndex, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Best tranches at dates t1 < t2 < ... at least spacing_days apart,
+        # solved backwards: best[j][t] is the value of tranches j..K with
+        # tranche j on or after column t
+        n, horizon = values.shape
+        next_column = self._next_columns(ds)
+        reachable = next_column < horizon
+        
+        best, where = _suffix_argmax(values)
+        wheres = [where]
+        for _ in range(self.tranches - 1):
+            following = np.full((n, horizon), -np.inf)
+            following[:, reachable] = best[:, next_column[reachable]]
+            best, where = _suffix_argmax(values + following)
+            wheres.append(where)
+        
+        # Walk forwards through the stored argmaxes to recover the dates
+        rows = np.arange(n)
+        columns = np.zeros((n, self.tranches), dtype=int)
+        position = np.zeros(n, dtype=int)
+        for j, where in enumerate(reversed(wheres)):
+            columns[:, j] = where[rows, np.minimum(position, horizon - 1)]
+            position = next_column[columns[:, j]]
+        
+        total = best[:, 0]
+        return columns, total
+    
+    def _next_columns(self, ds: pd.DatetimeIndex) -> np.ndarray:
+        # First column a tranche may follow each column in, from the actual
+        # dates (business-day forecasts skip weekends)
+        return ds.searchsorted(ds + pd.Timedelta(days=self.spacing_days))
+    
+    @profiled('analyze.optimize_sell')
+    def optimize_arrays(
+        self,
+        symbols: list[str],
+        ds: pd.DatetimeIndex,
+        mean: np.ndarray,
+        sd: np.ndarray,
+        quantities: Optional[Dict[str, float]] = None,
+        entry_dates: Optional[Dict[str, str]] = None
+    ) -> pd.DataFrame:
+        quantities = quantities or {}
+        entry_dates = entry_dates or {}
+        today = pd.Timestamp.now().normalize()
+        
+        quantity = np.array([quantities.get(symbol, 1.0) for symbol in symbols], dtype=float)
+        entry = np.array([pd.Timestamp(entry_dates.get(symbol, today)) for symbol in symbols], dtype='datetime64[ns]')
+        
+        values = self.tranche_values(ds, mean, sd, quantity, entry)
+        columns, total = self._schedule(ds, values)
+        
+        feasible = np.isfinite(total)
+        rows = np.repeat(np.arange(len(symbols)), self.tranches)
+        flat = columns.ravel()
+        
+        schedule = pd.DataFrame({
+            'symbol': np.asarray(symbols, dtype=object)[rows],
+            'tranche': np.tile(np.arange(1, self.tranches + 1), len(symbols)),
+            'date': ds[flat],
+            'fraction': 1.0 / self.tranches,
+            'expected_price': mean[rows, flat],
+            'price_sd': sd[rows, flat],
+            'value': values[rows, flat],
+            'total_value': total[rows]
+        })
+        
+        # Symbols with too few allowed dates for the whole schedule
+        if not feasible.all():
+            logger.warning("No feasible sell schedule for %d symbol(s)", int((~feasible).sum()))
+            schedule.loc[~feasible[rows], ['date', 'expected_price', 'price_sd', 'value', 'total_value']] = np.nan
+        
+        return schedule
+    
+    def optimize(
+        self,
+        forecasts: Dict[str, pd.DataFrame],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        quantities: Optional[Dict[str, float]] = None,
+        entry_dates: Optional[Dict[str, str]] = None
+    ) -> pd.DataFrame:
+        symbols, ds, mean, sd = stack_forecasts(forecasts, start_date, end_date, self.interval_width)
+        if len(ds) == 0:
+            raise ValueError("No forecast data in specified date range")
+        return self.optimize_arrays(symbols, ds, mean, sd, quantities, entry_dates)
+    
+    def optimize_scenarios(
+        self,
+        scenarios: Dict[str, Any],
+        quantities: Optional[Dict[str, float]] = None,
+        entry_dates: Optional[Dict[str, str]] = None
+    ) -> pd.DataFrame:
+        # Same search on simulated paths (ScenarioSet): expected price and
+        # spread come from the paths instead of the forecast interval
+        frames = {
+            symbol: pd.DataFrame({'ds': s.ds, 'mean': s.paths.mean(axis=0), 'sd': s.paths.std(axis=0)})
+            for symbol, s in scenarios.items()
+        }
+        ds, (mean, sd) = stack_columns(frames, ['mean', 'sd'], pd.Timestamp.min, pd.Timestamp.max)
+        return self.optimize_arrays(list(scenarios), ds, mean, sd, quantities, entry_dates)
@@ -0,0 +1,164 @@
+import logging
+from statistics import NormalDist
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.utils.profiling import profiled
+
+from .optimizer import stack_columns, stack_forecasts
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUANTILES = (0.01, 0.05, 0.5, 0.95, 0.99)
+
+# Fewest overlapping residuals for a pairwise correlation to count
+MIN_OVERLAP = 10
+
+
+def shrunk_correlation(residuals: np.ndarray, shrinkage: Optional[float] = None) -> tuple[np.ndarray, float]:
+    # Correlation of (dates x symbols) residuals, NaN where missing, shrunk
+    # towards the identity. Pairwise overlaps are handled with mask products;
+    # the intensity is Ledoit-Wolf's (sampling variance of the off-diagonal
+    # entries over their squared distance from the target) unless given.
+    mask = ~np.isnan(residuals)
+    counts = mask.sum(axis=0)
+    means = np.divide(np.nansum(residuals, axis=0), counts, out=np.zeros(residuals.shape[1]), where=counts > 0)
+    centred = np.where(mask, residuals - means, 0.0)
+    sds = np.sqrt(np.divide((centred ** 2).sum(axis=0), counts, out=np.zeros_like(means), where=counts > 0))
+    z = np.divide(centred, sds, out=np.zeros_like(centred), where=sds > 0)
+    
+    m = mask.astype(float)
+    overlap = m.T @ m
+    valid = overlap >= MIN_OVERLAP
+    sample = np.divide(z.T @ z, overlap, out=np.zeros_like(overlap), where=valid)
+    
+    off = valid & ~np.eye(len(sample), dtype=bool)
+    if shrinkage is None:
+        second = np.divide((z ** 2).T @ (z ** 2), overlap, out=np.zeros_like(overlap), where=valid)
+        variance = np.divide(second - sample ** 2, overlap, out=np.zeros_like(overlap), where=valid)
+        distance = (sample[off] ** 2).sum()
+        shrinkage = float(np.clip(variance[off].sum() / distance, 0.0, 1.0)) if distance > 0 else 1.0
+    
+    correlation = np.where(off, (1 - shrinkage) * sample, 0.0)
+    np.fill_diagonal(correlation, 1.0)
+    
+    # Pairwise estimates need not be positive semi-definite
+    eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+    if eigenvalues[0] < 0:
+        correlation = (eigenvectors * np.maximum(eigenvalues, 0.0)) @ eigenvectors.T
+        scale = np.sqrt(np.diag(correlation))
+        correlation /= np.outer(scale, scale)
+    
+    return correlation, shrinkage
+
+
+class PortfolioAnalyzer:
+    def __init__(self, shrinkage: Optional[float] = None, interval_width: float = 0.8):
+        self.shrinkage = shrinkage
+        self.interval_width = interval_width
+        
+        self.symbols: list[str] = []
+        self.correlation: Optional[np.ndarray] = None
+        self.shrinkage_used: Optional[float] = None
+        self._factor: Optional[np.ndarray] = None
+    
+    def residuals(self, forecasts: Dict[str, pd.DataFrame], histories: Dict[str, pd.DataFrame]) -> tuple[pd.DatetimeIndex, np.ndarray]:
+        # In-sample log errors of every symbol as a (dates x symbols) array
+        ds, (actual,) = stack_columns({s: histories[s] for s in forecasts}, ['y'], pd.Timestamp.min, pd.Timestamp.max)
+        fitted_ds, (fitted,) = stack_columns(forecasts, ['yhat'], ds[0], ds[-1])
+        
+        columns = fitted_ds.get_indexer(ds)
+        fitted = np.where(columns >= 0, fitted[:, np.maximum(columns, 0)], np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            errors = np.log(actual / fitted)
+        errors[~np.isfinite(errors)] = np.nan
+        return ds, errors.T
+    
+    @profiled('analyze.portfolio')
+    def analyze(
+        self,
+        forecasts: Dict[str, pd.DataFrame],
+        histories: Dict[str, pd.DataFrame],
+        positions: Dict[str, float],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> pd.DataFrame:
+        missing = [symbol for symbol in positions if symbol not in forecasts or symbol not in histories]
+        if missing:
+            raise ValueError(f"No forecast or history for: {', '.join(missing)}")
+        
+        self.symbols = list(positions)
+        held = {symbol: forecasts[symbol] for symbol in self.symbols}
+        quantity = np.array([positions[symbol] for symbol in self.symbols], dtype=float)
+        
+        # Residual levels wander for weeks, which makes unrelated names look
+        # correlated; their day-to-day changes do not
+        _, residuals = self.residuals(held, histories)
+        self.correlation, self.shrinkage_used = shrunk_correlation(np.diff(residuals, axis=0), self.shrinkage)
+        self._factor = None
+        
+        _, ds, mean, sd = stack_forecasts(held, start_date, end_date, self.interval_width)
+        if len(ds) == 0:
+            raise ValueError("No forecast data in specified date range")
+        if np.isnan(mean).any():
+            logger.warning("Some symbols have no forecast for every date; their gaps count as zero value")
+        
+        # Batched over dates: var[t] = a[:, t]' R a[:, t] with a = q * sd
+        exposure = np.nan_to_num(quantity[:, None] * sd)
+        variance = (exposure * (self.correlation @ exposure)).sum(axis=0)
+        expected = np.nansum(quantity[:, None] * mean, axis=0)
+        
+        z = NormalDist().inv_cdf(0.5 + self.interval_width / 2)
+        portfolio_sd = np.sqrt(np.maximum(variance, 0.0))
+        
+        # Perfectly correlated names would simply add their spreads
+        diversification = np.divide(portfolio_sd, exposure.sum(axis=0), out=np.ones_like(portfolio_sd), where=exposure.sum(axis=0) > 0)
+        
+        self.current_value = float(sum(positions[s] * histories[s]['y'].iloc[-1] for s in self.symbols))
+        self._horizon = (ds, mean, sd, quantity)
+        
+        return pd.DataFrame({
+            'ds': ds,
+            'expected_value': expected,
+            'value_sd': portfolio_sd,
+            'value_lower': expected - z * portfolio_sd,
+            'value_upper': expected + z * portfolio_sd,
+            'diversification_ratio': diversification
+        })
+    
+    def scenarios(self, target_date: Optional[str] = None, n_paths: int = 5000, seed: Optional[int] = None, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, Any]:
+        # Correlated draws of every name's price at one date, log-normal
+        # around yhat (the median, as in ScenarioEngine)
+        if self.correlation is None:
+            raise RuntimeError("Call analyze() first")
+        
+        ds, mean, sd, quantity = self._horizon
+        column = len(ds) - 1 if target_date is None else ds.get_indexer([pd.Timestamp(target_date)])[0]
+        if column < 0:
+            raise ValueError(f"No forecast data for {target_date}")
+        
+        price, price_sd = mean[:, column], sd[:, column]
+        known = ~np.isnan(price) & (price > 0)
+        log_sd = np.where(known, np.divide(price_sd, price, out=np.zeros_like(price), where=known), 0.0)
+        
+        if self._factor is None:
+            eigenvalues, eigenvectors = np.linalg.eigh(self.correlation)
+            self._factor = eigenvectors * np.sqrt(np.maximum(eigenvalues, 0.0))
+        
+        rng = np.random.default_rng(seed)
+        shocks = rng.standard_normal((n_paths, len(price))) @ self._factor.T
+        values = np.exp(shocks * log_sd) @ np.where(known, quantity * price, 0.0)
+        
+        tail = values <= np.quantile(values, 0.05)
+        
+        return {
+            'date': ds[column].strftime('%Y-%m-%d'),
+            'paths': n_paths,
+            'current_value': self.current_value,
+            'expected_value': float(values.mean()),
+            'quantiles': {f'p{q * 100:g}': float(v) for q, v in zip(quantiles, np.quantile(values, quantiles))},
+            'probability_of_loss': float((values < self.current_value).mean()),
+            'expected_shortfall_5': float(values[tail].mean())
+        }
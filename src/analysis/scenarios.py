@@ -0,0 +1,167 @@
+import logging
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.utils.profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def noise_parameters(history: pd.DataFrame, forecast: pd.DataFrame) -> Dict[str, float]:
+    # The same two noise sources the cheap engines use for their intervals:
+    # a random walk in log price (trend uncertainty) and i.i.d. residuals
+    # around the fitted curve (observation noise)
+    history = history[['ds', 'y']].dropna()
+    log_y = np.log(history['y'].to_numpy(dtype=float))
+    days = ((history['ds'] - history['ds'].iloc[0]) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+    
+    gaps = np.maximum(np.diff(days), 1.0)
+    step_sd = float(np.std(np.diff(log_y) / np.sqrt(gaps))) if len(log_y) > 2 else 0.0
+    
+    fitted = history.merge(forecast[['ds', 'yhat']], on='ds', how='inner')
+    fitted = fitted[fitted['yhat'] > 0]
+    resid_sd = float(np.std(np.log(fitted['y'] / fitted['yhat']))) if len(fitted) > 1 else 0.0
+    
+    return {'step_sd': step_sd, 'resid_sd': resid_sd}
+
+
+def _label(q: float) -> str:
+    return f'p{q * 100:g}'
+
+
+class ScenarioSet:
+    # Simulated price paths, one row per path and one column per future date.
+    # `origin` is the last date of the history the paths start from.
+    def __init__(self, ds: pd.DatetimeIndex, paths: np.ndarray, params: Dict[str, float], origin: Optional[Any] = None):
+        self.ds = ds
+        self.paths = paths
+        self.params = params
+        self.origin = pd.Timestamp(origin) if origin is not None else ds[0] - pd.Timedelta(days=1)
+    
+    @property
+    def n_paths(self) -> int:
+        return self.paths.shape[0]
+    
+    @property
+    def horizon(self) -> int:
+        return self.paths.shape[1]
+    
+    def _column(self, date: Any) -> int:
+        column = self.ds.get_indexer([pd.Timestamp(date)])[0]
+        if column < 0:
+            raise ValueError(f"No simulated prices for {pd.Timestamp(date):%Y-%m-%d}")
+        return column
+    
+    def _window(self, start_date: Optional[str], end_date: Optional[str]) -> np.ndarray:
+        mask = np.ones(self.horizon, dtype=bool)
+        if start_date is not None:
+            mask &= self.ds >= pd.Timestamp(start_date)
+        if end_date is not None:
+            mask &= self.ds <= pd.Timestamp(end_date)
+        if not mask.any():
+            raise ValueError("No simulated dates in specified range")
+        return np.flatnonzero(mask)
+    
+    def quantiles(self, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> pd.DataFrame:
+        values = np.quantile(self.paths, quantiles, axis=0)
+        frame = pd.DataFrame({_label(q): row for q, row in zip(quantiles, values)})
+        frame.insert(0, 'ds', self.ds)
+        frame['mean'] = self.paths.mean(axis=0)
+        return frame
+    
+    def exceedance_curve(self, target: float) -> pd.DataFrame:
+        return pd.DataFrame({'ds': self.ds, 'probability': (self.paths > target).mean(axis=0)})
+    
+    def exceedance_probability(self, target: float, date: Optional[str] = None) -> float:
+        # At a given date, or at any point of the horizon when no date is given
+        if date is not None:
+            return float((self.paths[:, self._column(date)] > target).mean())
+        return float((self.paths.max(axis=1) > target).mean())
+    
+    def sell_date_distribution(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
+        # Where each path peaks, i.e. the hindsight-optimal sell date per path
+        columns = self._window(start_date, end_date)
+        window = self.paths[:, columns]
+        best = window.argmax(axis=1)
+        
+        counts = np.bincount(best, minlength=len(columns))
+        prices = np.bincount(best, weights=window[np.arange(self.n_paths), best], minlength=len(columns))
+        
+        return pd.DataFrame({
+            'ds': self.ds[columns],
+            'probability': counts / self.n_paths,
+            'mean_price': np.divide(prices, counts, out=np.full(len(columns), np.nan), where=counts > 0)
+        })
+    
+    def summary(self, quantiles: Sequence[float] = DEFAULT_QUANTILES, target: Optional[float] = None) -> Dict[str, Any]:
+        final = np.quantile(self.paths[:, -1], quantiles)
+        sell_dates = self.sell_date_distribution()
+        best = sell_dates.loc[sell_dates['probability'].idxmax()]
+        
+        # Columns skip weekends and holidays, so the median peak is mapped
+        # to its date before counting days
+        peaks = np.sort(self.paths.argmax(axis=1))
+        median_peak = self.ds[peaks[(len(peaks) - 1) // 2]]
+        
+        summary: Dict[str, Any] = {
+            'paths': self.n_paths,
+            'horizon': self.horizon,
+            'end_date': self.ds[-1].strftime('%Y-%m-%d'),
+            'quantiles': {_label(q): float(value) for q, value in zip(quantiles, final)},
+            'expected': float(self.paths[:, -1].mean()),
+            'sell_date': {
+                'mode': best['ds'].strftime('%Y-%m-%d'),
+                'mode_probability': float(best['probability']),
+                'median_date': median_peak.strftime('%Y-%m-%d'),
+                'median_days': int((median_peak - self.origin) / pd.Timedelta(days=1))
+            }
+        }
+        if target is not None:
+            summary['target'] = {
+                'price': float(target),
+                'probability_at_end': float((self.paths[:, -1] > target).mean()),
+                'probability_any_time': self.exceedance_probability(target)
+            }
+        
+        return summary
+
+
+class ScenarioEngine:
+    def __init__(self, n_paths: int = 1000, seed: Optional[int] = None):
+        if n_paths < 1:
+            raise ValueError("n_paths must be at least 1")
+        self.n_paths = n_paths
+        self.rng = np.random.default_rng(seed)
+    
+    @profiled('analyze.simulate')
+    def simulate(self, forecast: pd.DataFrame, history: pd.DataFrame, params: Optional[Dict[str, float]] = None) -> ScenarioSet:
+        # The forecast's yhat is the median path; the noise around it is
+        # drawn for all paths at once as one (paths x horizon) array
+        params = params or noise_parameters(history, forecast)
+        
+        last = history['ds'].max()
+        future = forecast[forecast['ds'] > last]
+        if len(future) == 0:
+            raise ValueError("Forecast has no dates after the history")
+        if (future['yhat'] <= 0).any():
+            raise ValueError("Forecast must be positive to simulate prices")
+        
+        ds = pd.DatetimeIndex(future['ds'])
+        elapsed = ((ds - last) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+        step_scale = params['step_sd'] * np.sqrt(np.diff(elapsed, prepend=0.0))
+        
+        log_paths = self.rng.standard_normal((self.n_paths, len(ds)))
+        log_paths *= step_scale
+        np.cumsum(log_paths, axis=1, out=log_paths)
+        log_paths += params['resid_sd'] * self.rng.standard_normal((self.n_paths, len(ds)))
+        log_paths += np.log(future['yhat'].to_numpy(dtype=float))
+        
+        logger.debug("Simulated %d paths over %d dates", self.n_paths, len(ds))
+        return ScenarioSet(ds, np.exp(log_paths, out=log_paths), params, origin=last)
+    
+    def simulate_model(self, model: Any, periods: int = 365, freq: str = 'D') -> ScenarioSet:
+        return self.simulate(model.predict(periods=periods, freq=freq), model.history)
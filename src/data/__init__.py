@@ -1,4 +1,14 @@
-from .fetcher import Fetcher
-from .preprocessor import prepare_for_prophet
+from typing import TYPE_CHECKING
+
+from src.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .fetcher import Fetcher
+    from .preprocessor import prepare_for_prophet
 
 __all__ = ['Fetcher', 'prepare_for_prophet']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'Fetcher': '.fetcher',
+    'prepare_for_prophet': '.preprocessor',
+})
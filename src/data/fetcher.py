@@ -3,6 +3,8 @@ import pandas as pd
 import logging
 from datetime import datetime, timedelta
 
+from src.utils.metrics import FETCH_SECONDS, instrumented
+
 logger = logging.getLogger(__name__)
 
 class Fetcher:
@@ -22,11 +24,12 @@ class Fetcher:
             ticker = yf.Ticker(symbol)
             return ticker.info
         except Exception as e:
-            print(f"⚠️  Could not fetch stock info: {e}")
+            logger.warning("⚠️  Could not fetch stock info: %s", e)
             return {}
     
+    @instrumented('fetch', FETCH_SECONDS)
     def fetch(self, symbol, start, end):
-        print(f"📥 Downloading {symbol} data from Yahoo Finance...")
+        logger.info("📥 Downloading %s data from Yahoo Finance...", symbol)
         
         # Handle 'today' keyword
         if end.lower() == 'today':
@@ -38,9 +41,9 @@ class Fetcher:
         
         if end_date_obj > today_obj:
             end = today_obj.strftime('%Y-%m-%d')
-            print(f"   ⚠️  End date in future, using today: {end}")
+            logger.warning("   ⚠️  End date in future, using today: %s", end)
         
-        print(f"   Period: {start} to {end}")
+        logger.info("   Period: %s to %s", start, end)
         
         # yfinance end date is exclusive, add 1 day
         end_inclusive = (end_date_obj + timedelta(days=1)).strftime('%Y-%m-%d')
@@ -62,11 +65,11 @@ class Fetcher:
         # Normalize column names to lowercase
         data.columns = data.columns.str.lower()
         
-        print(f"✅ Downloaded {len(data)} rows")
+        logger.info("✅ Downloaded %d rows", len(data), extra={'rows': len(data)})
         
         if len(data) > 0:
             last_close = data['close'].iloc[-1]
             last_date = data.index[-1]
-            print(f"   Last closing price: ${last_close:.2f} on {last_date}")
+            logger.info("   Last closing price: $%.2f on %s", last_close, last_date)
         
         return data
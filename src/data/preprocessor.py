@@ -2,6 +2,8 @@ import pandas as pd
 import logging
 from typing import Optional
 
+from src.utils.metrics import instrumented
+
 logger = logging.getLogger(__name__)
 
 def _find_date_column(df: pd.DataFrame) -> Optional[str]:
@@ -27,8 +29,9 @@ def _find_price_column(df: pd.DataFrame, price_column: str = 'close') -> Optiona
     
     return None
 
+@instrumented('preprocess')
 def prepare_for_prophet(df):
-    print("🧹 Preparing data for Prophet...")
+    logger.info("🧹 Preparing data for Prophet...")
     
     if isinstance(df.columns, pd.MultiIndex):
         df.columns = df.columns.get_level_values(0)
@@ -54,13 +57,13 @@ def prepare_for_prophet(df):
     
     result = result.dropna()
     
-    print(f"   ✅ Prepared {len(result)} rows for Prophet")
-    print(f"   Date range: {result['ds'].min()} to {result['ds'].max()}")
+    logger.info("   ✅ Prepared %d rows for Prophet", len(result), extra={'rows': len(result)})
+    logger.info("   Date range: %s to %s", result['ds'].min(), result['ds'].max())
     
     return result
 
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
-    print("🧹 Cleaning data...")
+    logger.info("🧹 Cleaning data...")
     
     original_len = len(df)
     
@@ -74,13 +77,13 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     if price_col:
         missing = df[price_col].isna().sum()
         if missing > 0:
-            print(f"   Filling {missing} missing prices")
+            logger.info("   Filling %d missing prices", missing)
             df[price_col] = df[price_col].ffill().bfill()
     
     removed = original_len - len(df)
     if removed > 0:
-        print(f"   Removed {removed} rows")
+        logger.info("   Removed %d rows", removed)
     
-    print(f"   Final records: {len(df)}")
+    logger.info("   Final records: %d", len(df), extra={'rows': len(df)})
     
     return df
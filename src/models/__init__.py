@@ -1,3 +1,22 @@
-from .prophet_model import ForecastModel
+from typing import TYPE_CHECKING
 
-__all__ = ['ForecastModel']
+from src.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .ensemble import EnsembleModel, TrendModel, load_model
+    from .incremental import IncrementalForecaster
+    from .pooled import PooledModel
+    from .prophet_model import ForecastModel
+    from .registry import ModelRegistry
+
+__all__ = ['ForecastModel', 'ModelRegistry', 'EnsembleModel', 'TrendModel', 'load_model', 'PooledModel', 'IncrementalForecaster']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'ForecastModel': '.prophet_model',
+    'ModelRegistry': '.registry',
+    'EnsembleModel': '.ensemble',
+    'TrendModel': '.ensemble',
+    'load_model': '.ensemble',
+    'PooledModel': '.pooled',
+    'IncrementalForecaster': '.incremental',
+})
@@ -0,0 +1,364 @@
+import contextvars
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.metrics import INTERVAL_WIDTH, current_symbol
+from src.utils.profiling import profiled
+
+from .prophet_model import FORMAT_VERSION, HISTORY_FILE, META_FILE, ForecastModel, atomic_directory
+
+logger = logging.getLogger(__name__)
+
+PARAMS_FILE = 'params.json'
+
+# Error of a perfect backtest, so inverse-error weights stay finite
+MIN_ERROR = 1e-12
+
+
+class TrendModel:
+    # Log-linear trend with random-walk uncertainty: a cheap engine that
+    # keeps an ensemble from leaning on a single Prophet fit
+    kind = 'trend'
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        self.params: Dict[str, float] = {}
+        self.history: Optional[pd.DataFrame] = None
+        self.meta: Dict[str, Any] = {}
+        self.trained = False
+    
+    @property
+    def model(self) -> None:
+        return None
+    
+    def _days(self, ds: pd.Series) -> np.ndarray:
+        return ((pd.to_datetime(ds) - pd.Timestamp(self.params['origin'])) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+    
+    def train(self, data: pd.DataFrame) -> None:
+        if len(data) < 3 or (data['y'] <= 0).any():
+            raise ValueError("Trend model needs at least 3 positive prices")
+        
+        history = data[['ds', 'y']].reset_index(drop=True)
+        self.params = {'origin': history['ds'].iloc[0].isoformat()}
+        
+        t = self._days(history['ds'])
+        log_y = np.log(history['y'].to_numpy(dtype=float))
+        slope, intercept = np.polyfit(t, log_y, 1)
+        residuals = log_y - (intercept + slope * t)
+        
+        # Day-over-day volatility, scaled to calendar days so gaps like
+        # weekends widen the interval the same way they would in live data
+        gaps = np.maximum(np.diff(t), 1.0)
+        step_sd = float(np.std(np.diff(log_y) / np.sqrt(gaps)))
+        
+        self.params.update(
+            slope=float(slope),
+            intercept=float(intercept),
+            resid_sd=float(np.std(residuals)),
+            step_sd=step_sd,
+            last_t=float(t[-1])
+        )
+        self.history = history
+        self.trained = True
+    
+    def predict(self, periods: int = 365, freq: str = 'D') -> pd.DataFrame:
+        if not self.trained:
+            raise RuntimeError("Model must be trained first")
+        
+        last = self.history['ds'].iloc[-1]
+        future = pd.date_range(start=last, periods=periods + 1, freq=freq)[1:]
+        return self.predict_dates(pd.concat([self.history['ds'], pd.Series(future)], ignore_index=True))
+    
+    def predict_dates(self, ds: Any) -> pd.DataFrame:
+        if not self.trained:
+            raise RuntimeError("Model must be trained first")
+        
+        ds = pd.to_datetime(pd.Series(ds)).reset_index(drop=True)
+        t = self._days(ds)
+        trend = self.params['intercept'] + self.params['slope'] * t
+        horizon = np.maximum(t - self.params['last_t'], 0.0)
+        sd = np.sqrt(self.params['resid_sd'] ** 2 + self.params['step_sd'] ** 2 * horizon)
+        
+        z = NormalDist().inv_cdf(0.5 + self.config.get('interval_width', 0.8) / 2)
+        
+        return pd.DataFrame({
+            'ds': ds,
+            'trend': np.exp(trend),
+            'yhat_lower': np.exp(trend - z * sd),
+            'yhat_upper': np.exp(trend + z * sd),
+            'trend_lower': np.exp(trend),
+            'trend_upper': np.exp(trend),
+            'yhat': np.exp(trend)
+        })
+    
+    def save(self, path: str) -> str:
+        if not self.trained:
+            raise RuntimeError("Model must be trained first")
+        
+        with atomic_directory(path) as staging:
+            with open(staging / PARAMS_FILE, 'w', encoding='utf-8') as f:
+                json.dump(self.params, f, indent=2)
+            self.history.to_csv(staging / HISTORY_FILE, index=False)
+            _write_meta(staging, self.kind, self.config, self.history)
+        
+        return str(Path(path))
+    
+    @classmethod
+    def load(cls, path: str) -> 'TrendModel':
+        source = Path(path)
+        meta = _read_meta(source)
+        
+        instance = cls(config=meta.get('config'))
+        with open(source / PARAMS_FILE, 'r', encoding='utf-8') as f:
+            instance.params = json.load(f)
+        instance.history = pd.read_csv(source / HISTORY_FILE, parse_dates=['ds'])
+        instance.meta = meta
+        instance.trained = True
+        return instance
+
+
+ENGINES: Dict[str, Any] = {
+    'prophet': ForecastModel,
+    'trend': TrendModel,
+}
+
+
+def _write_meta(target: Path, kind: str, config: Dict[str, Any], history: pd.DataFrame, **extra: Any) -> None:
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'kind': kind,
+        'config': config,
+        'saved_at': datetime.now().isoformat(timespec='seconds'),
+        'history_rows': len(history),
+        'history_start': history['ds'].min().strftime('%Y-%m-%d'),
+        'history_end': history['ds'].max().strftime('%Y-%m-%d'),
+        **extra
+    }
+    with open(target / META_FILE, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+
+def _read_meta(source: Path) -> Dict[str, Any]:
+    meta_file = source / META_FILE
+    if not meta_file.exists():
+        raise FileNotFoundError(f"No saved model found at: {source}")
+    
+    with open(meta_file, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported model format: {meta.get('format_version')}")
+    
+    return meta
+
+
+def load_model(path: str) -> Any:
+    # Any model saved by this package, whatever its engine
+    kind = _read_meta(Path(path)).get('kind', 'prophet')
+    if kind == EnsembleModel.kind:
+        return EnsembleModel.load(path)
+    if kind not in ENGINES:
+        raise ValueError(f"Unknown model kind: {kind}")
+    return ENGINES[kind].load(path)
+
+
+def combine_forecasts(forecasts: list[pd.DataFrame], weights: np.ndarray) -> pd.DataFrame:
+    # Stacks every member into a (members, rows, columns) cube and reduces it
+    # in one weighted pass. Columns only some engines produce (e.g. Prophet's
+    # seasonal components) are averaged over the members that have them.
+    # Interval bounds are averaged like any other column, i.e. quantiles
+    # rather than distributions are combined.
+    ds = forecasts[0]['ds']
+    
+    columns: list[str] = []
+    for forecast in forecasts:
+        columns += [c for c in forecast.columns if c != 'ds' and c not in columns and pd.api.types.is_numeric_dtype(forecast[c])]
+    
+    cube = np.stack([
+        forecast.set_index('ds').reindex(ds).reindex(columns=columns).to_numpy(dtype=float)
+        for forecast in forecasts
+    ])
+    
+    present = ~np.isnan(cube)
+    w = np.asarray(weights, dtype=float)[:, None, None] * present
+    with np.errstate(invalid='ignore', divide='ignore'):
+        combined = (np.where(present, cube, 0.0) * w).sum(axis=0) / w.sum(axis=0)
+    
+    result = pd.DataFrame(combined, columns=columns)
+    result.insert(0, 'ds', ds.to_numpy())
+    return result
+
+
+def backtest_weights(errors: list[float], power: float = 1.0) -> np.ndarray:
+    inverse = 1.0 / np.maximum(np.asarray(errors, dtype=float), MIN_ERROR) ** power
+    return inverse / inverse.sum()
+
+
+class EnsembleModel:
+    kind = 'ensemble'
+    
+    def __init__(self, members: list[Dict[str, Any]], holdout: int = 60, workers: Optional[int] = None, power: float = 1.0):
+        if not members:
+            raise ValueError("An ensemble needs at least one member")
+        
+        for member in members:
+            if member.get('engine', 'prophet') not in ENGINES:
+                raise ValueError(f"Unknown engine: {member.get('engine')}")
+        
+        self.members = [
+            {'name': member.get('name') or f"{member.get('engine', 'prophet')}_{i}", 'engine': member.get('engine', 'prophet'), 'config': member.get('config', {})}
+            for i, member in enumerate(members)
+        ]
+        self.holdout = holdout
+        self.workers = workers
+        self.power = power
+        
+        # Part of the registry's cache key, like ForecastModel.config
+        self.config = {'members': self.members, 'holdout': holdout, 'power': power}
+        
+        self.models: Dict[str, Any] = {}
+        self.errors: Dict[str, float] = {}
+        self.weights: Dict[str, float] = {}
+        self.history: Optional[pd.DataFrame] = None
+        self.meta: Dict[str, Any] = {}
+        self.trained = False
+    
+    @classmethod
+    def from_config(cls, model_config: Dict[str, Any], ensemble_config: Dict[str, Any]) -> 'EnsembleModel':
+        # Prophet members start from the `model` section and override it;
+        # every member's interval has the model's coverage
+        members = []
+        for member in ensemble_config.get('members') or [{'engine': 'prophet'}]:
+            config = member.get('config') or {}
+            if member.get('engine', 'prophet') == 'prophet':
+                config = {**model_config, **config}
+            elif 'interval_width' in model_config:
+                config = {'interval_width': model_config['interval_width'], **config}
+            members.append({**member, 'config': config})
+        
+        return cls(
+            members,
+            holdout=ensemble_config.get('holdout', 60),
+            workers=ensemble_config.get('workers'),
+            power=ensemble_config.get('power', 1.0)
+        )
+    
+    @property
+    def model(self) -> Any:
+        # The heaviest-weighted Prophet member, for Prophet's component plots
+        for name in sorted(self.weights, key=self.weights.get, reverse=True):
+            if self.models[name].model is not None:
+                return self.models[name].model
+        return None
+    
+    def _fit_member(self, member: Dict[str, Any], data: pd.DataFrame, holdout: int) -> tuple[Any, float]:
+        engine = ENGINES[member['engine']]
+        
+        # Score on the last `holdout` rows with a model that never saw them
+        train, test = data.iloc[:-holdout], data.iloc[-holdout:]
+        backtest = engine(config=member['config'])
+        backtest.train(train)
+        
+        days = int((test['ds'].iloc[-1] - train['ds'].iloc[-1]) / pd.Timedelta(days=1))
+        predicted = backtest.predict(periods=max(days, 1)).set_index('ds')['yhat']
+        errors = test.set_index('ds')['y'] - predicted.reindex(test['ds'])
+        error = float(np.nanmean(errors.to_numpy(dtype=float) ** 2))
+        
+        model = engine(config=member['config'])
+        model.train(data)
+        return model, error
+    
+    @profiled('ensemble.train')
+    def train(self, data: pd.DataFrame) -> None:
+        holdout = min(self.holdout, len(data) // 5)
+        if holdout < 1:
+            raise ValueError("Not enough history to backtest the ensemble")
+        
+        logger.info("🤝 Training %d-member ensemble (holdout %d rows)...", len(self.members), holdout)
+        
+        # cmdstan fits run in their own processes, so threads are enough to
+        # fit the members side by side; each task keeps the caller's log context
+        workers = self.workers or len(self.members)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                member['name']: executor.submit(contextvars.copy_context().run, self._fit_member, member, data, holdout)
+                for member in self.members
+            }
+        
+        self.models, self.errors = {}, {}
+        for name, future in futures.items():
+            try:
+                self.models[name], self.errors[name] = future.result()
+            except Exception as e:
+                logger.warning("   ⚠️  Ensemble member %s failed: %s", name, e)
+        
+        scored = [name for name in self.models if not np.isnan(self.errors[name])]
+        if not scored:
+            raise RuntimeError("Every ensemble member failed")
+        
+        weights = backtest_weights([self.errors[name] for name in scored], self.power)
+        self.weights = dict(zip(scored, weights.tolist()))
+        self.models = {name: self.models[name] for name in scored}
+        self.history = data[['ds', 'y']].reset_index(drop=True)
+        self.trained = True
+        
+        for name in scored:
+            logger.info("   %s: backtest RMSE %.4f, weight %.3f", name, np.sqrt(self.errors[name]), self.weights[name])
+    
+    @profiled('ensemble.predict')
+    def predict(self, periods: int = 365, freq: str = 'D') -> pd.DataFrame:
+        if not self.trained:
+            raise RuntimeError("Model must be trained first")
+        
+        names = list(self.weights)
+        forecasts = [self.models[name].predict(periods=periods, freq=freq) for name in names]
+        forecast = combine_forecasts(forecasts, np.array([self.weights[name] for name in names]))
+        
+        last = forecast.iloc[-1]
+        if last['yhat'] != 0:
+            INTERVAL_WIDTH.set((last['yhat_upper'] - last['yhat_lower']) / abs(last['yhat']), symbol=current_symbol())
+        
+        return forecast
+    
+    def predict_dates(self, ds: Any) -> pd.DataFrame:
+        if not self.trained:
+            raise RuntimeError("Model must be trained first")
+        
+        names = list(self.weights)
+        forecasts = [self.models[name].predict_dates(ds) for name in names]
+        return combine_forecasts(forecasts, np.array([self.weights[name] for name in names]))
+    
+    def save(self, path: str) -> str:
+        if not self.trained:
+            raise RuntimeError("Model must be trained first")
+        
+        with atomic_directory(path) as staging:
+            for name, model in self.models.items():
+                model.save(str(staging / 'members' / name))
+            self.history.to_csv(staging / HISTORY_FILE, index=False)
+            _write_meta(staging, self.kind, self.config, self.history, weights=self.weights, errors=self.errors)
+        
+        return str(Path(path))
+    
+    @classmethod
+    def load(cls, path: str) -> 'EnsembleModel':
+        source = Path(path)
+        meta = _read_meta(source)
+        config = meta['config']
+        
+        instance = cls(config['members'], holdout=config['holdout'], power=config['power'])
+        instance.weights = meta['weights']
+        instance.errors = meta['errors']
+        instance.models = {name: load_model(str(source / 'members' / name)) for name in instance.weights}
+        instance.history = pd.read_csv(source / HISTORY_FILE, parse_dates=['ds'])
+        instance.meta = meta
+        instance.trained = True
+        return instance
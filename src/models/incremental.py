@@ -0,0 +1,137 @@
+import logging
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalForecaster:
+    # Keeps a fitted model's forecast current as new bars arrive. The fitted
+    # parameters do not change between refits, so rows already forecast stay
+    # valid: an update only appends the bars to the history and predicts the
+    # few dates that are new (the bars themselves if the forecast lacked
+    # them, and the tail that keeps the horizon at `periods`).
+    def __init__(
+        self,
+        model: Any,
+        periods: int = 365,
+        freq: str = 'D',
+        refit_every: Optional[int] = None,
+        max_outside: int = 3,
+        auto_refit: bool = True,
+        forecast: Optional[pd.DataFrame] = None,
+        monitor: Optional[Any] = None,
+        symbol: Optional[str] = None
+    ):
+        if not model.trained:
+            raise RuntimeError("Model must be trained first")
+        
+        self.model = model
+        self.periods = periods
+        self.freq = freq
+        self.refit_every = refit_every
+        self.max_outside = max_outside
+        self.auto_refit = auto_refit
+        
+        # A DriftMonitor, if given, also sees every bar and can call a refit
+        self.monitor = monitor
+        self.symbol = symbol or 'DEFAULT'
+        
+        self.history = model.history[['ds', 'y']].reset_index(drop=True)
+        self.forecast = forecast if forecast is not None else model.predict(periods=periods, freq=freq)
+        
+        self.bars_since_fit = 0
+        self.outside_streak = 0
+        self.refits = 0
+    
+    @property
+    def refit_reason(self) -> Optional[str]:
+        if self.max_outside and self.outside_streak >= self.max_outside:
+            return 'drift'
+        if self.monitor is not None and self.monitor.flags(self.symbol):
+            return 'drift'
+        if self.refit_every and self.bars_since_fit >= self.refit_every:
+            return 'schedule'
+        return None
+    
+    def _predict_dates(self, ds: pd.DatetimeIndex) -> pd.DataFrame:
+        if hasattr(self.model, 'predict_dates'):
+            return self.model.predict_dates(ds)
+        
+        # Engines without date-level prediction pay for a full forecast
+        full = self.model.predict(periods=self.periods, freq=self.freq)
+        return full.set_index('ds').reindex(ds).reset_index()
+    
+    def _track_outside(self, bars: pd.DataFrame) -> None:
+        rows = self.forecast.set_index('ds').reindex(bars['ds'])
+        outside = ((bars['y'].to_numpy() < rows['yhat_lower'].to_numpy()) | (bars['y'].to_numpy() > rows['yhat_upper'].to_numpy()))
+        
+        # Consecutive bars outside the interval; a bar with no forecast row
+        # neither extends nor breaks the streak
+        known = ~np.isnan(rows['yhat'].to_numpy())
+        for is_known, is_outside in zip(known, outside):
+            if is_known:
+                self.outside_streak = self.outside_streak + 1 if is_outside else 0
+    
+    @profiled('incremental.update')
+    def update(self, bars: pd.DataFrame) -> pd.DataFrame:
+        bars = bars[['ds', 'y']].dropna().sort_values('ds').drop_duplicates('ds', keep='last')
+        last = self.history['ds'].iloc[-1]
+        
+        stale = bars['ds'] < last
+        if stale.any():
+            logger.warning("Ignoring %d bar(s) older than the history", int(stale.sum()))
+            bars = bars[~stale]
+        if len(bars) == 0:
+            return self.forecast
+        
+        self._track_outside(bars)
+        if self.monitor is not None:
+            self.monitor.observe(self.symbol, bars, self.forecast)
+        
+        # A bar for the last date (e.g. today's close moving intraday)
+        # replaces it instead of being appended
+        history = self.history[self.history['ds'] < bars['ds'].iloc[0]] if bars['ds'].iloc[0] == last else self.history
+        self.history = pd.concat([history, bars], ignore_index=True)
+        self.bars_since_fit += int((bars['ds'] > last).sum())
+        
+        reason = self.refit_reason
+        if reason is not None and self.auto_refit:
+            logger.info("Refitting (%s) after %d new bar(s)", reason, self.bars_since_fit)
+            self.refit()
+            return self.forecast
+        
+        self.forecast = self._shift(last, pd.DatetimeIndex(bars['ds']))
+        return self.forecast
+    
+    def _shift(self, previous_last: pd.Timestamp, bar_dates: pd.DatetimeIndex) -> pd.DataFrame:
+        # Same rows a full predict() would return: one per history date,
+        # then `periods` dates after the new last bar
+        forecast = self.forecast
+        new_last = bar_dates[-1]
+        keep = (forecast['ds'] <= previous_last) | forecast['ds'].isin(bar_dates) | (forecast['ds'] > new_last)
+        forecast = forecast[keep]
+        
+        missing = bar_dates[~bar_dates.isin(forecast['ds'])]
+        future = pd.date_range(start=new_last, periods=self.periods + 1, freq=self.freq)[1:]
+        missing = missing.append(future[future > forecast['ds'].iloc[-1]])
+        
+        if len(missing):
+            forecast = pd.concat([forecast, self._predict_dates(missing)], ignore_index=True)
+            forecast = forecast.sort_values('ds', kind='stable')
+        
+        return forecast[forecast['ds'] <= future[-1]].reset_index(drop=True)
+    
+    def refit(self) -> pd.DataFrame:
+        self.model.train(self.history)
+        self.forecast = self.model.predict(periods=self.periods, freq=self.freq)
+        self.bars_since_fit = 0
+        self.outside_streak = 0
+        self.refits += 1
+        if self.monitor is not None:
+            self.monitor.reset(self.symbol)
+        return self.forecast
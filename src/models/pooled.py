@@ -0,0 +1,206 @@
+import logging
+from statistics import NormalDist
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+# Fourier orders, as Prophet uses by default
+YEARLY_ORDER = 10
+WEEKLY_ORDER = 3
+
+# Regularizes the otherwise unpenalized intercept and slope just enough to
+# keep the per-series systems solvable for one-point histories
+MIN_PENALTY = 1e-6
+
+
+def _days(ds: Any) -> np.ndarray:
+    return (pd.DatetimeIndex(ds) - pd.Timestamp('1970-01-01')) / pd.Timedelta(days=1)
+
+
+def fourier_features(ds: Any, yearly_order: int = YEARLY_ORDER, weekly_order: int = WEEKLY_ORDER) -> np.ndarray:
+    t = np.asarray(_days(ds), dtype=float)
+    columns = []
+    for period, order in ((365.25, yearly_order), (7.0, weekly_order)):
+        for k in range(1, order + 1):
+            angle = 2 * np.pi * k * t / period
+            columns += [np.sin(angle), np.cos(angle)]
+    return np.column_stack(columns) if columns else np.empty((len(t), 0))
+
+
+class PooledModel:
+    # Fits a whole sector at once: every series gets its own piecewise-linear
+    # trend in log price, while weekly and yearly seasonality are shared.
+    # Everything is solved as one ridge-regularized least-squares problem.
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        self.yearly_order = self.config.get('yearly_order', YEARLY_ORDER)
+        self.weekly_order = self.config.get('weekly_order', WEEKLY_ORDER)
+        self.n_changepoints = self.config.get('n_changepoints', 25)
+        self.changepoint_range = self.config.get('changepoint_range', 0.8)
+        self.changepoint_penalty = self.config.get('changepoint_penalty', 10.0)
+        self.seasonality_penalty = self.config.get('seasonality_penalty', 1.0)
+        self.interval_width = self.config.get('interval_width', 0.8)
+        
+        self.symbols: list[str] = []
+        self.histories: Dict[str, pd.DataFrame] = {}
+        self.trained = False
+    
+    def _trend_features(self, ds: Any) -> np.ndarray:
+        t = (np.asarray(_days(ds), dtype=float) - self.origin) / 365.25
+        hinges = np.maximum(t[:, None] - self.changepoints[None, :], 0.0)
+        return np.column_stack((np.ones_like(t), t, hinges))
+    
+    def _seasonal_features(self, ds: Any) -> np.ndarray:
+        return fourier_features(ds, self.yearly_order, self.weekly_order)
+    
+    @profiled('pooled.train')
+    def train(self, data: Dict[str, pd.DataFrame]) -> None:
+        if not data:
+            raise ValueError("No series to fit")
+        
+        logger.info("🧩 Training pooled model on %d series...", len(data))
+        
+        self.symbols = list(data)
+        self.histories = {symbol: frame[['ds', 'y']].dropna().reset_index(drop=True) for symbol, frame in data.items()}
+        for symbol, history in self.histories.items():
+            if len(history) < 2 or (history['y'] <= 0).any():
+                raise ValueError(f"{symbol}: need at least 2 positive prices")
+        
+        # Every series lives on the union of all dates; missing ones are masked
+        grid = pd.DatetimeIndex(sorted(set().union(*(h['ds'] for h in self.histories.values()))))
+        days = np.asarray(_days(grid), dtype=float)
+        self.origin = float(days[0])
+        span = (days[-1] - days[0]) / 365.25
+        self.changepoints = np.linspace(0, span * self.changepoint_range, self.n_changepoints + 1)[1:]
+        
+        n, T = len(self.symbols), len(grid)
+        W = np.zeros((n, T))
+        Z = np.zeros((n, T))
+        self.offsets = np.zeros(n)
+        self.step_sd = np.zeros(n)
+        
+        for i, symbol in enumerate(self.symbols):
+            history = self.histories[symbol]
+            log_y = np.log(history['y'].to_numpy(dtype=float))
+            rows = grid.get_indexer(history['ds'])
+            
+            # Series are centred so the shared terms see comparable scales
+            self.offsets[i] = log_y.mean()
+            W[i, rows] = 1.0
+            Z[i, rows] = log_y - self.offsets[i]
+            
+            gaps = np.maximum(np.diff(np.asarray(_days(history['ds']), dtype=float)), 1.0)
+            self.step_sd[i] = float(np.std(np.diff(log_y) / np.sqrt(gaps))) if len(log_y) > 2 else 0.0
+        
+        X = self._trend_features(grid)
+        F = self._seasonal_features(grid)
+        p, s = X.shape[1], F.shape[1]
+        
+        # Normal equations of all series at once. The per-series trend blocks
+        # are eliminated (Schur complement), leaving one small system for the
+        # shared seasonality; the trends then follow from a batched solve.
+        penalty = np.full(p, MIN_PENALTY)
+        penalty[2:] = self.changepoint_penalty
+        A = (W @ (X[:, :, None] * X[:, None, :]).reshape(T, p * p)).reshape(n, p, p) + np.diag(penalty)
+        B = (W @ (X[:, :, None] * F[:, None, :]).reshape(T, p * s)).reshape(n, p, s)
+        c = (W * Z) @ X
+        
+        solved = np.linalg.solve(A, np.concatenate((B, c[:, :, None]), axis=2))
+        A_inv_B, A_inv_c = solved[:, :, :s], solved[:, :, s]
+        
+        S = F.T @ (W.sum(axis=0)[:, None] * F) + self.seasonality_penalty * np.eye(s) - np.einsum('nps,npr->sr', B, A_inv_B)
+        rhs = F.T @ (W * Z).sum(axis=0) - np.einsum('nps,np->s', B, A_inv_c)
+        self.beta = np.linalg.solve(S, rhs) if s else np.empty(0)
+        self.theta = A_inv_c - A_inv_B @ self.beta
+        
+        fitted = self.theta @ X.T + (F @ self.beta)[None, :]
+        residuals = (Z - fitted) * W
+        self.resid_sd = np.sqrt((residuals ** 2).sum(axis=1) / W.sum(axis=1))
+        
+        self.trained = True
+        logger.info("✅ Pooled model trained!")
+    
+    def forecast_symbol(self, symbol: str, periods: int = 365, freq: str = 'D') -> pd.DataFrame:
+        if not self.trained:
+            raise RuntimeError("Model must be trained first")
+        
+        i = self.symbols.index(symbol)
+        history = self.histories[symbol]
+        
+        last = history['ds'].iloc[-1]
+        future = pd.date_range(start=last, periods=periods + 1, freq=freq)[1:]
+        ds = pd.DatetimeIndex(history['ds']).append(future)
+        
+        trend = self._trend_features(ds) @ self.theta[i] + self.offsets[i]
+        F = self._seasonal_features(ds)
+        yearly_columns = 2 * self.yearly_order
+        yearly = F[:, :yearly_columns] @ self.beta[:yearly_columns]
+        weekly = F[:, yearly_columns:] @ self.beta[yearly_columns:]
+        
+        horizon = np.maximum(np.asarray(_days(ds), dtype=float) - float(_days([last])[0]), 0.0)
+        sd = np.sqrt(self.resid_sd[i] ** 2 + self.step_sd[i] ** 2 * horizon)
+        z = NormalDist().inv_cdf(0.5 + self.interval_width / 2)
+        
+        log_yhat = trend + yearly + weekly
+        trend_price = np.exp(trend)
+        multiplicative = np.exp(yearly + weekly) - 1
+        zeros = np.zeros(len(ds))
+        
+        # Same layout as a multiplicative-seasonality Prophet forecast:
+        # yhat = trend * (1 + multiplicative_terms)
+        return pd.DataFrame({
+            'ds': ds,
+            'trend': trend_price,
+            'yhat_lower': np.exp(log_yhat - z * sd),
+            'yhat_upper': np.exp(log_yhat + z * sd),
+            'trend_lower': trend_price,
+            'trend_upper': trend_price,
+            'additive_terms': zeros,
+            'additive_terms_lower': zeros,
+            'additive_terms_upper': zeros,
+            'weekly': np.exp(weekly) - 1,
+            'weekly_lower': np.exp(weekly) - 1,
+            'weekly_upper': np.exp(weekly) - 1,
+            'yearly': np.exp(yearly) - 1,
+            'yearly_lower': np.exp(yearly) - 1,
+            'yearly_upper': np.exp(yearly) - 1,
+            'multiplicative_terms': multiplicative,
+            'multiplicative_terms_lower': multiplicative,
+            'multiplicative_terms_upper': multiplicative,
+            'yhat': np.exp(log_yhat)
+        })
+    
+    @profiled('pooled.predict')
+    def predict(self, periods: int = 365, freq: str = 'D') -> Dict[str, pd.DataFrame]:
+        return {symbol: self.forecast_symbol(symbol, periods, freq) for symbol in self.symbols}
+    
+    def series(self, symbol: str) -> 'PooledSeries':
+        if symbol not in self.histories:
+            raise KeyError(f"Unknown symbol: {symbol}")
+        return PooledSeries(self, symbol)
+
+
+class PooledSeries:
+    # One symbol of a fitted PooledModel, usable wherever a single fitted
+    # model is expected (e.g. ForecastPlotter.plot_forecast)
+    def __init__(self, pooled: PooledModel, symbol: str):
+        self.pooled = pooled
+        self.symbol = symbol
+        self.config = pooled.config
+        self.trained = pooled.trained
+    
+    @property
+    def model(self) -> None:
+        return None
+    
+    @property
+    def history(self) -> pd.DataFrame:
+        return self.pooled.histories[self.symbol]
+    
+    def predict(self, periods: int = 365, freq: str = 'D') -> pd.DataFrame:
+        return self.pooled.forecast_symbol(self.symbol, periods, freq)
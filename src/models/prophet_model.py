@@ -1,22 +1,100 @@
 # pyright: reportOptionalMemberAccess=false
 # pyright: reportArgumentType=false
 
-from prophet import Prophet
 import pandas as pd
+import gzip
+import json
 import logging
-from typing import Optional, Dict, Any
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional, Dict, Any
+
+from src.utils.metrics import FIT_SECONDS, INTERVAL_WIDTH, PREDICT_SECONDS, current_symbol, instrumented
+
+# prophet pulls in cmdstanpy and takes seconds to import, so it is only
+# loaded once a model is trained or deserialized
+if TYPE_CHECKING:
+    from prophet import Prophet
+
+logger = logging.getLogger(__name__)
 
 logging.getLogger('prophet').setLevel(logging.WARNING)
 logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
 
+# Files written by ForecastModel.save
+META_FILE = 'meta.json'
+PARAMS_FILE = 'params.json.gz'
+HISTORY_FILE = 'history.csv.gz'
+FORMAT_VERSION = 1
+
+
+@contextmanager
+def atomic_directory(path: str) -> Iterator[Path]:
+    # Files are written to a sibling directory that then takes the target's
+    # place, so the service, app and batch workers reading the same model
+    # see the old one or the new one, never a half-written mix
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = target.with_name(f'.{target.name}.{uuid.uuid4().hex}.tmp')
+    staging.mkdir()
+    
+    try:
+        yield staging
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    
+    # A directory can't be renamed over a non-empty one, so the old model is
+    # moved aside first and removed once the new one is in place
+    retired = target.with_name(f'.{target.name}.{uuid.uuid4().hex}.old')
+    if target.exists():
+        os.replace(target, retired)
+    os.replace(staging, target)
+    shutil.rmtree(retired, ignore_errors=True)
+
 class ForecastModel:
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
-        self.model: Optional[Prophet] = None
+        self._model: Optional['Prophet'] = None
+        self._history: Optional[pd.DataFrame] = None
+        self._source: Optional[Path] = None
+        self.meta: Dict[str, Any] = {}
         self.trained = False
     
+    @property
+    def model(self) -> Optional['Prophet']:
+        # Saved models only deserialize their parameters on first use
+        if self._model is None and self._source is not None:
+            from prophet.serialize import model_from_dict
+            
+            with gzip.open(self._source / PARAMS_FILE, 'rt', encoding='utf-8') as f:
+                self._model = model_from_dict(json.load(f))
+        return self._model
+    
+    @model.setter
+    def model(self, value: Optional['Prophet']) -> None:
+        self._model = value
+        self._history = None
+        self._source = None
+    
+    @property
+    def history(self) -> Optional[pd.DataFrame]:
+        if self._history is None:
+            if self._source is not None:
+                self._history = pd.read_csv(self._source / HISTORY_FILE, parse_dates=['ds'])
+            elif self._model is not None and self._model.history is not None:
+                self._history = self._model.history[['ds', 'y']]
+        return self._history
+    
+    @instrumented('train', FIT_SECONDS)
     def train(self, data: pd.DataFrame) -> None:
-        print("🤖 Training Prophet model...")
+        from prophet import Prophet
+        
+        logger.info("🤖 Training Prophet model...", extra={'rows': len(data)})
         
         # Create model with config
         self.model = Prophet(
@@ -26,6 +104,7 @@ class ForecastModel:
             weekly_seasonality=self.config.get('weekly_seasonality', True),
             yearly_seasonality=self.config.get('yearly_seasonality', True),
             daily_seasonality=self.config.get('daily_seasonality', False),
+            interval_width=self.config.get('interval_width', 0.8),
         )
         
         # Add holidays if configured
@@ -33,25 +112,38 @@ class ForecastModel:
         if country and self.model:
             try:
                 self.model.add_country_holidays(country_name=country)
-                print(f"   Added {country} holidays")
+                logger.info("   Added %s holidays", country)
             except Exception as e:
-                print(f"   ⚠️  Could not add holidays: {e}")
+                logger.warning("   ⚠️  Could not add holidays: %s", e)
         
         if self.model:
             self.model.fit(data)
             self.trained = True
-            print("✅ Model trained successfully!")
+            logger.info("✅ Model trained successfully!")
     
+    @instrumented('predict', PREDICT_SECONDS)
     def predict(self, periods: int = 365, freq: str = 'D') -> pd.DataFrame:
         if not self.trained or not self.model:
             raise RuntimeError("Model must be trained first")
         
-        print(f"🔮 Generating {periods}-day forecast...")
+        logger.info("🔮 Generating %d-day forecast...", periods)
         future = self.model.make_future_dataframe(periods=periods, freq=freq)
         forecast = self.model.predict(future)
-        print(f"✅ Forecast generated!")
+        
+        last = forecast.iloc[-1]
+        if last['yhat'] != 0:
+            INTERVAL_WIDTH.set((last['yhat_upper'] - last['yhat_lower']) / abs(last['yhat']), symbol=current_symbol())
+        
+        logger.info("✅ Forecast generated!")
         return forecast
     
+    def predict_dates(self, ds: Any) -> pd.DataFrame:
+        # Forecast rows for the given dates only, e.g. to extend a cached forecast
+        if not self.trained or not self.model:
+            raise RuntimeError("Model must be trained first")
+        
+        return self.model.predict(pd.DataFrame({'ds': pd.to_datetime(pd.Series(ds))}))
+    
     def get_components(self, forecast: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         if not self.trained or not self.model:
             raise RuntimeError("Model must be trained first")
@@ -79,3 +171,55 @@ class ForecastModel:
                 return pd.DataFrame({'changepoint': changepoints})
         
         return None
+    
+    def save(self, path: str) -> str:
+        if not self.trained or not self.model:
+            raise RuntimeError("Model must be trained first")
+        
+        from prophet.serialize import model_to_dict
+        
+        history = self.history
+        
+        # Prophet only needs a non-empty history to predict on a supplied
+        # frame, so the full history is stored separately for plotting
+        model_dict = model_to_dict(self.model)
+        model_dict['history'] = self.model.history.tail(1).to_json(orient='table', index=False)
+        
+        with atomic_directory(path) as staging:
+            with gzip.open(staging / PARAMS_FILE, 'wt', encoding='utf-8') as f:
+                json.dump(model_dict, f, separators=(',', ':'))
+            
+            history.to_csv(staging / HISTORY_FILE, index=False)
+            
+            meta = {
+                'format_version': FORMAT_VERSION,
+                'config': self.config,
+                'saved_at': datetime.now().isoformat(timespec='seconds'),
+                'history_rows': len(history),
+                'history_start': history['ds'].min().strftime('%Y-%m-%d'),
+                'history_end': history['ds'].max().strftime('%Y-%m-%d'),
+            }
+            with open(staging / META_FILE, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=2)
+        
+        return str(Path(path))
+    
+    @classmethod
+    def load(cls, path: str) -> 'ForecastModel':
+        source = Path(path)
+        meta_file = source / META_FILE
+        
+        if not meta_file.exists():
+            raise FileNotFoundError(f"No saved model found at: {source}")
+        
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported model format: {meta.get('format_version')}")
+        
+        instance = cls(config=meta.get('config'))
+        instance._source = source
+        instance.meta = meta
+        instance.trained = True
+        return instance
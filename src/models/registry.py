@@ -0,0 +1,79 @@
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+
+from src.utils.metrics import cache_result
+
+from .ensemble import load_model
+from .prophet_model import ForecastModel, META_FILE
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    def __init__(self, directory: str = './outputs/models'):
+        self.directory = Path(directory)
+        
+        # Create registry directory if it doesn't exist
+        self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def path_for(self, symbol: str) -> Path:
+        return self.directory / symbol.upper()
+    
+    def exists(self, symbol: str) -> bool:
+        return (self.path_for(symbol) / META_FILE).exists()
+    
+    def save(self, symbol: str, model: ForecastModel) -> str:
+        path = model.save(str(self.path_for(symbol)))
+        logger.info("💾 Model saved to registry: %s", path)
+        return path
+    
+    def load(
+        self,
+        symbol: str,
+        config: Optional[Dict[str, Any]] = None,
+        max_age: Optional[float] = None,
+        window: Optional[Tuple[str, str]] = None
+    ) -> Optional[ForecastModel]:
+        model = self._load(symbol, config, max_age, window)
+        cache_result('registry', model is not None)
+        return model
+    
+    def _load(self, symbol: str, config: Optional[Dict[str, Any]], max_age: Optional[float], window: Optional[Tuple[str, str]]) -> Optional[ForecastModel]:
+        if not self.exists(symbol):
+            return None
+        
+        model = load_model(str(self.path_for(symbol)))
+        
+        # A model trained with different settings is not a valid substitute
+        if config is not None and model.config != config:
+            return None
+        
+        # Neither is a model fitted on a different span of history, given as
+        # (first, last) date of the data it would be fitted on now
+        if window is not None and (model.meta.get('history_start'), model.meta.get('history_end')) != tuple(window):
+            return None
+        
+        # Stale models are left for the caller to refit
+        if max_age is not None:
+            saved_at = datetime.fromisoformat(model.meta['saved_at'])
+            if (datetime.now() - saved_at).total_seconds() > max_age:
+                return None
+        
+        return model
+    
+    def meta(self, symbol: str) -> Optional[Dict[str, Any]]:
+        # Saved-model metadata (history_end, saved_at, ...) without loading it
+        if not self.exists(symbol):
+            return None
+        with open(self.path_for(symbol) / META_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def list_symbols(self) -> list[str]:
+        return sorted(
+            path.name for path in self.directory.iterdir()
+            # Dotted names are models still being written or replaced
+            if not path.name.startswith('.') and (path / META_FILE).exists()
+        )
@@ -0,0 +1,13 @@
+from typing import TYPE_CHECKING
+
+from src.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .drift import DriftMonitor, monitor_symbols
+
+__all__ = ['DriftMonitor', 'monitor_symbols']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'DriftMonitor': '.drift',
+    'monitor_symbols': '.drift',
+})
@@ -0,0 +1,287 @@
+import logging
+import math
+import os
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DRIFT_SCORE = REGISTRY.gauge('forecast_drift_score', 'CUSUM drift relative to its alarm threshold (1 = alarm)', ('symbol',))
+COVERAGE = REGISTRY.gauge('forecast_interval_coverage', 'Share of recent prices inside the forecast interval', ('symbol',))
+
+# One fixed-size record per symbol; the whole state is a single array
+MAX_SYMBOL_LENGTH = 32
+
+STATE_DTYPE = np.dtype([
+    ('symbol', f'U{MAX_SYMBOL_LENGTH}'),
+    ('n', 'i8'),
+    ('last_day', 'i8'),  # days since epoch of the last observed bar, -1 if none
+    ('model_day', 'i8'),  # history end of the model the errors belong to, -1 if unknown
+    ('mae', 'f8'),  # price units
+    ('mape', 'f8'),
+    ('bias', 'f8'),  # standardized error
+    ('coverage', 'f8'),
+    ('cusum_pos', 'f8'),
+    ('cusum_neg', 'f8'),
+])
+
+EPOCH = pd.Timestamp('1970-01-01')
+
+
+def _day(ds: Any) -> int:
+    return int((pd.Timestamp(ds) - EPOCH) // pd.Timedelta(days=1))
+
+
+def _dates(days: pd.Series) -> pd.Series:
+    return pd.to_datetime(np.where(days >= 0, days, np.nan), unit='D', origin=EPOCH)
+
+
+class DriftMonitor:
+    # Online forecast-error statistics per symbol. Every bar is an O(1)
+    # update of one record: exponentially weighted MAE, MAPE, bias and
+    # interval coverage, plus a two-sided CUSUM of the standardized log
+    # error, which alarms on a persistent shift rather than a single outlier.
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        window: int = 20,
+        cusum_k: float = 0.5,
+        cusum_h: float = 5.0,
+        interval_width: float = 0.8,
+        min_coverage: float = 0.5,
+        min_observations: int = 10,
+        max_mape: Optional[float] = None
+    ):
+        self.path = Path(path) if path else None
+        self.alpha = 2.0 / (window + 1)
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.z = NormalDist().inv_cdf(0.5 + interval_width / 2)
+        self.interval_width = interval_width
+        self.min_coverage = min_coverage
+        self.min_observations = min_observations
+        self.max_mape = max_mape
+        
+        self.state = np.zeros(0, dtype=STATE_DTYPE)
+        self.size = 0
+        self._index: Dict[str, int] = {}
+        
+        if self.path is not None and self.path.exists():
+            self.load()
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'DriftMonitor':
+        return cls(
+            path=config.get('state_file'),
+            window=config.get('window', 20),
+            cusum_k=config.get('cusum_k', 0.5),
+            cusum_h=config.get('cusum_h', 5.0),
+            interval_width=config.get('interval_width', 0.8),
+            min_coverage=config.get('min_coverage', 0.5),
+            min_observations=config.get('min_observations', 10),
+            max_mape=config.get('max_mape')
+        )
+    
+    @property
+    def records(self) -> np.ndarray:
+        return self.state[:self.size]
+    
+    def load(self) -> None:
+        # Copied field by field, so files written before a field was added
+        # still load with that field at its default
+        state = np.load(self.path, allow_pickle=False)
+        self.state = np.zeros(len(state), dtype=STATE_DTYPE)
+        self.state['model_day'] = -1
+        for name in STATE_DTYPE.names:
+            if name in state.dtype.names:
+                self.state[name] = state[name]
+        self.size = len(state)
+        self._index = {str(symbol): i for i, symbol in enumerate(self.state['symbol'][:self.size])}
+    
+    def save(self, path: Optional[str] = None) -> str:
+        target = Path(path) if path else self.path
+        if target is None:
+            raise ValueError("No state file configured")
+        
+        # Written next to the target and renamed, so readers never see a
+        # half-written file
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp = target.with_name(f'.{target.name}.{os.getpid()}.tmp')
+        with open(temp, 'wb') as f:
+            np.save(f, self.records, allow_pickle=False)
+        os.replace(temp, target)
+        return str(target)
+    
+    def _row(self, symbol: str) -> int:
+        symbol = symbol.upper()
+        row = self._index.get(symbol)
+        if row is not None:
+            return row
+        if len(symbol) > MAX_SYMBOL_LENGTH:
+            raise ValueError(f"Symbol longer than {MAX_SYMBOL_LENGTH} characters: {symbol}")
+        
+        # Capacity doubles, so adding symbols is amortized O(1) too
+        if self.size == len(self.state):
+            grown = np.zeros(max(2 * len(self.state), 16), dtype=STATE_DTYPE)
+            grown[:self.size] = self.records
+            self.state = grown
+        
+        row = self.size
+        self.state[row] = (symbol, 0, -1, -1, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+        self._index[symbol] = row
+        self.size += 1
+        return row
+    
+    def update(self, symbol: str, ds: Any, y: float, yhat: float, yhat_lower: float, yhat_upper: float) -> None:
+        # Indexing a structured array yields a view, so this updates in place
+        row = self._row(symbol)
+        record = self.state[row]
+        
+        # Log error in units of the interval's implied standard deviation
+        if yhat_lower > 0 and yhat > 0:
+            sd = math.log(yhat_upper / yhat_lower) / (2 * self.z)
+            error = math.log(y / yhat) / sd if sd > 0 else 0.0
+        else:
+            sd = (yhat_upper - yhat_lower) / (2 * self.z)
+            error = (y - yhat) / sd if sd > 0 else 0.0
+        
+        record['n'] += 1
+        # Plain means until the window fills, then exponential weighting
+        alpha = max(self.alpha, 1.0 / record['n'])
+        record['mae'] += alpha * (abs(y - yhat) - record['mae'])
+        record['mape'] += alpha * (abs(y - yhat) / abs(y) - record['mape']) if y else 0.0
+        record['bias'] += alpha * (error - record['bias'])
+        record['coverage'] += alpha * (float(yhat_lower <= y <= yhat_upper) - record['coverage'])
+        record['cusum_pos'] = max(0.0, record['cusum_pos'] + error - self.cusum_k)
+        record['cusum_neg'] = max(0.0, record['cusum_neg'] - error - self.cusum_k)
+        record['last_day'] = _day(ds)
+    
+    def observe(self, symbol: str, actual: pd.DataFrame, forecast: pd.DataFrame, since: Optional[str] = None) -> int:
+        # Realized prices (ds, y) against the forecast rows for the same
+        # dates; bars already seen, or not after `since`, are skipped
+        last_day = self.last_day(symbol)
+        cutoff = max(last_day, _day(since) if since is not None else -1)
+        
+        days = ((pd.to_datetime(actual['ds']) - EPOCH) // pd.Timedelta(days=1)).to_numpy()
+        bars = actual[days > cutoff]
+        rows = bars.merge(forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']], on='ds', how='inner').sort_values('ds')
+        
+        for bar in rows.itertuples(index=False):
+            self.update(symbol, bar.ds, float(bar.y), float(bar.yhat), float(bar.yhat_lower), float(bar.yhat_upper))
+        
+        if len(rows):
+            self._export(symbol)
+        return len(rows)
+    
+    def last_day(self, symbol: str) -> int:
+        row = self._index.get(symbol.upper())
+        return int(self.state['last_day'][row]) if row is not None else -1
+    
+    def _export(self, symbol: str) -> None:
+        record = self.state[self._index[symbol.upper()]]
+        DRIFT_SCORE.set(float(max(record['cusum_pos'], record['cusum_neg']) / self.cusum_h), symbol=symbol.upper())
+        COVERAGE.set(float(record['coverage']), symbol=symbol.upper())
+    
+    def scores(self) -> np.ndarray:
+        # Per-symbol staleness of the model's errors: 1 is the alarm level.
+        # CUSUM drift or, once enough bars are in, the coverage shortfall.
+        records = self.records
+        drift = np.maximum(records['cusum_pos'], records['cusum_neg']) / self.cusum_h
+        shortfall = np.where(
+            records['n'] >= self.min_observations,
+            (self.interval_width - records['coverage']) / max(self.interval_width - self.min_coverage, 1e-9),
+            0.0
+        )
+        return np.maximum(drift, shortfall)
+    
+    def flags(self, symbol: str) -> list[str]:
+        row = self._index.get(symbol.upper())
+        if row is None:
+            return []
+        
+        record = self.state[row]
+        reasons = []
+        if max(record['cusum_pos'], record['cusum_neg']) > self.cusum_h:
+            reasons.append('drift_up' if record['cusum_pos'] >= record['cusum_neg'] else 'drift_down')
+        if record['n'] >= self.min_observations and record['coverage'] < self.min_coverage:
+            reasons.append('coverage')
+        if self.max_mape is not None and record['n'] >= self.min_observations and record['mape'] > self.max_mape:
+            reasons.append('error')
+        return reasons
+    
+    def needs_refit(self) -> Dict[str, list[str]]:
+        flagged = {}
+        for symbol in self._index:
+            reasons = self.flags(symbol)
+            if reasons:
+                flagged[symbol] = reasons
+        return flagged
+    
+    def reset(self, symbol: str) -> None:
+        # After a refit the old errors say nothing about the new model; the
+        # last observed date is kept so bars are not counted twice
+        row = self._row(symbol)
+        record = self.state[row]
+        self.state[row] = (symbol.upper(), 0, record['last_day'], record['model_day'], 0.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+    
+    def track_model(self, symbol: str, history_end: str) -> bool:
+        # Resets the symbol when its model was refitted on newer data since
+        # the errors were collected, e.g. by a batch run outside the scheduler
+        row = self._row(symbol)
+        day = _day(history_end)
+        refitted = 0 <= self.state['model_day'][row] < day
+        if refitted:
+            self.reset(symbol)
+        self.state['model_day'][row] = max(day, self.state['model_day'][row])
+        return refitted
+    
+    def summary(self) -> pd.DataFrame:
+        frame = pd.DataFrame(self.records)
+        frame['model_end'] = _dates(frame['model_day'])
+        frame['last_date'] = _dates(frame['last_day'])
+        frame['score'] = self.scores()
+        return frame.drop(columns=['last_day', 'model_day'])
+
+
+def monitor_symbols(
+    monitor: DriftMonitor,
+    symbols: list[str],
+    load_forecast: Callable[[str], Optional[pd.DataFrame]],
+    fetch_actual: Callable[[str, str], pd.DataFrame],
+    since: Optional[Callable[[str], Optional[str]]] = None
+) -> Dict[str, list[str]]:
+    # Feeds every symbol's new realized prices into the monitor and returns
+    # the symbols that need a refit, with reasons
+    for symbol in symbols:
+        forecast = load_forecast(symbol)
+        if forecast is None:
+            logger.warning("No stored forecast for %s", symbol)
+            continue
+        
+        # Only bars after the model's training data are out of sample, and
+        # only bars after the last one seen are new
+        cutoff = since(symbol) if since is not None else None
+        if cutoff is not None and monitor.track_model(symbol, cutoff):
+            logger.info("%s was refitted, drift statistics reset", symbol)
+        start = max(_day(cutoff) + 1 if cutoff is not None else _day(forecast['ds'].min()), monitor.last_day(symbol) + 1)
+        
+        if EPOCH + pd.Timedelta(days=start) > pd.Timestamp.now():
+            continue
+        
+        try:
+            actual = fetch_actual(symbol, (EPOCH + pd.Timedelta(days=start)).strftime('%Y-%m-%d'))
+        except Exception as e:
+            logger.warning("Could not fetch %s: %s", symbol, e)
+            continue
+        
+        added = monitor.observe(symbol, actual, forecast, since=cutoff)
+        logger.debug("%s: %d new bar(s)", symbol, added)
+    
+    wanted = {symbol.upper() for symbol in symbols}
+    return {symbol: reasons for symbol, reasons in monitor.needs_refit().items() if symbol in wanted}
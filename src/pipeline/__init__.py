@@ -0,0 +1,22 @@
+from typing import TYPE_CHECKING
+
+from src.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .batch import BatchRunner, CheckpointManifest, read_symbols
+    from .dag import ArtifactStore, Pipeline, Stage
+    from .scheduler import RetrainScheduler
+    from .stages import build_forecast_pipeline
+
+__all__ = ['BatchRunner', 'CheckpointManifest', 'read_symbols', 'ArtifactStore', 'Pipeline', 'Stage', 'RetrainScheduler', 'build_forecast_pipeline']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'BatchRunner': '.batch',
+    'CheckpointManifest': '.batch',
+    'read_symbols': '.batch',
+    'ArtifactStore': '.dag',
+    'Pipeline': '.dag',
+    'Stage': '.dag',
+    'RetrainScheduler': '.scheduler',
+    'build_forecast_pipeline': '.stages',
+})
@@ -0,0 +1,373 @@
+import json
+import logging
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.logger import get_log_settings, log_context, setup_logger
+from src.utils.metrics import REGISTRY
+from src.utils.profiling import get_profiler, profile_symbol, profiling
+
+from .stages import create_model, create_plotter, plot_options, plot_outputs
+
+logger = logging.getLogger(__name__)
+
+# Stages run for every symbol, in order
+STAGES = ['fetch', 'preprocess', 'train', 'predict', 'analyze', 'export']
+
+FetchFunction = Callable[[str, str, str], Any]
+
+BATCH_SYMBOLS = REGISTRY.counter('forecast_batch_symbols_total', 'Symbols processed by batch runs, by outcome', ('status',))
+
+# One plotter per process and plot settings: a new plotter opens its plot
+# cache, which scans the whole cache directory
+_plotters: Dict[tuple, Any] = {}
+
+
+def read_symbols(path: str) -> list[str]:
+    symbols = []
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            # One symbol per line, blank lines and comments are ignored
+            symbol = line.split('#', 1)[0].strip().upper()
+            if symbol and symbol not in symbols:
+                symbols.append(symbol)
+    
+    if not symbols:
+        raise ValueError(f"No symbols found in {path}")
+    
+    return symbols
+
+
+def _fetch_yahoo(symbol: str, start: str, end: str) -> Any:
+    from src.data import Fetcher
+    
+    return Fetcher().fetch(symbol, start, end)
+
+
+class CheckpointManifest:
+    # One small JSON file per symbol: workers never contend for a shared file
+    # and a killed run loses at most the stage that was in flight
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        
+        # Create checkpoint directory if it doesn't exist
+        self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def path_for(self, symbol: str) -> Path:
+        return self.directory / f'{symbol.upper()}.json'
+    
+    def read(self, symbol: str) -> Optional[Dict[str, Any]]:
+        path = self.path_for(symbol)
+        if not path.exists():
+            return None
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return None
+    
+    def write(self, symbol: str, state: Dict[str, Any]) -> None:
+        path = self.path_for(symbol)
+        state = {**state, 'symbol': symbol.upper(), 'updated_at': datetime.now().isoformat()}
+        
+        # Write to a temporary name so a crash never leaves a partial file
+        tmp_path = path.with_name(f'{path.name}.{uuid.uuid4().hex}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+    
+    def is_done(self, symbol: str, params: Dict[str, Any]) -> bool:
+        state = self.read(symbol)
+        return state is not None and state.get('status') == 'done' and state.get('params') == params
+    
+    def reached(self, symbol: str, stage: str, params: Dict[str, Any]) -> bool:
+        state = self.read(symbol)
+        if state is None or state.get('params') != params or state.get('stage') not in STAGES:
+            return False
+        return STAGES.index(state['stage']) >= STAGES.index(stage)
+    
+    def states(self) -> Dict[str, Dict[str, Any]]:
+        states = {}
+        for path in sorted(self.directory.glob('*.json')):
+            state = self.read(path.stem)
+            if state is not None:
+                states[path.stem] = state
+        return states
+
+
+def run_symbol(task: tuple) -> Dict[str, Any]:
+    symbol, settings, fetch, in_worker = task
+    
+    if in_worker:
+        _setup_worker_logging(settings['logging'])
+        # A worker process runs many symbols; ship each one's metrics only once
+        REGISTRY.reset()
+    
+    with log_context(symbol=symbol):
+        if not settings.get('profile'):
+            state = _run_symbol(symbol, settings, fetch)
+        else:
+            # Workers profile themselves and ship their records back to the parent
+            with profiling() as profiler, profile_symbol(symbol):
+                state = _run_symbol(symbol, settings, fetch)
+            state = {**state, 'profile': profiler.records}
+    
+    if in_worker:
+        state = {**state, 'metrics': REGISTRY.snapshot()}
+    return state
+
+
+def retrain_symbol(symbol: str, settings: Dict[str, Any], fetch: FetchFunction, in_worker: bool = False) -> Dict[str, Any]:
+    return run_symbol((symbol, settings, fetch, in_worker))
+
+
+def _setup_worker_logging(log_settings: Dict[str, Any]) -> None:
+    if logging.getLogger('src').handlers:
+        return
+    
+    # Plain-text workers would flood the shared terminal, so they only report
+    # problems and the parent prints one line per symbol; JSON logs are for
+    # machines and keep full detail
+    level = log_settings['level'] if log_settings['json'] else 'WARNING'
+    setup_logger(level=level, json_format=log_settings['json'])
+
+
+def _plotter(options: Dict[str, Any]) -> Any:
+    key = tuple(sorted(options.items()))
+    plotter = _plotters.get(key)
+    if plotter is None:
+        plotter = _plotters[key] = create_plotter(options)
+    return plotter
+
+
+def _run_symbol(symbol: str, settings: Dict[str, Any], fetch: FetchFunction) -> Dict[str, Any]:
+    from src.data import prepare_for_prophet
+    from src.models import ModelRegistry
+    from src.analysis import ForecastAnalyzer
+    
+    manifest = CheckpointManifest(settings['checkpoint_dir'])
+    registry = ModelRegistry(settings['registry_dir'])
+    params = settings['params']
+    output_dir = Path(settings['output_dir'])
+    
+    state: Dict[str, Any] = {'symbol': symbol.upper(), 'params': params, 'status': 'running', 'stage': None, 'outputs': {}}
+    
+    def checkpoint(stage: str, **outputs: Any) -> None:
+        state['stage'] = stage
+        state['outputs'].update(outputs)
+        manifest.write(symbol, state)
+    
+    # Read before this run's checkpoints overwrite the previous run's stage
+    trained = settings['resume'] and manifest.reached(symbol, 'train', params)
+    
+    try:
+        data = fetch(symbol, params['start'], params['end'])
+        checkpoint('fetch', records=len(data))
+        
+        prophet_data = prepare_for_prophet(data)
+        checkpoint('preprocess', samples=len(prophet_data))
+        
+        # A model fitted by an interrupted run is reused instead of refitted,
+        # as long as it was fitted with the same settings on the same data
+        model = None
+        if trained:
+            window = (prophet_data['ds'].min().strftime('%Y-%m-%d'), prophet_data['ds'].max().strftime('%Y-%m-%d'))
+            model = registry.load(symbol, config=create_model(params['model'], params['ensemble']).config, window=window)
+        
+        if model is None:
+            model = create_model(params['model'], params['ensemble'])
+            model.train(prophet_data)
+            registry.save(symbol, model)
+        checkpoint('train', model=str(registry.path_for(symbol)))
+        
+        forecast = model.predict(periods=params['days'])
+        checkpoint('predict')
+        
+        analyzer = ForecastAnalyzer.from_config(params['model'])
+        current_price = float(prophet_data['y'].iloc[-1])
+        expected_price = float(forecast['yhat'].iloc[-1])
+        optimal = analyzer.find_optimal_sell_date(forecast)
+        summary = {
+            'current_price': current_price,
+            'expected_price': expected_price,
+            'change_pct': (expected_price - current_price) / current_price * 100,
+            'optimal_sell_date': optimal.get('date'),
+            'optimal_sell_price': optimal.get('price')
+        }
+        checkpoint('analyze', **summary)
+        
+        outputs = {}
+        if settings['save_csv']:
+            csv_file = output_dir / f'forecast_{symbol}.csv'
+            analyzer.export_to_csv(forecast, str(csv_file), include_components=True)
+            outputs['csv'] = str(csv_file)
+        
+        if settings['save_plots']:
+            plots = plot_outputs(_plotter(settings['plot']), model, forecast, symbol, settings['plot'])
+            outputs['plot'] = plots['forecast']
+            outputs['components_plot'] = plots['components']
+        
+        state['status'] = 'done'
+        state['error'] = None
+        checkpoint('export', **outputs)
+    
+    except Exception as e:
+        state['status'] = 'failed'
+        state['error'] = f'{type(e).__name__}: {e}'
+        manifest.write(symbol, state)
+    
+    return state
+
+
+class BatchRunner:
+    def __init__(self, cfg: Any, checkpoint_dir: Optional[str] = None, fetch: Optional[FetchFunction] = None, save_plots: bool = True):
+        stock_config = cfg.get_stock_config()
+        forecast_config = cfg.get_forecast_config()
+        output_config = cfg.get_output_config()
+        registry_config = cfg.get('registry', {})
+        batch_config = cfg.get('batch', {})
+        
+        output_dir = output_config.get('directory', './outputs')
+        checkpoint_dir = checkpoint_dir or batch_config.get('checkpoint_dir', f'{output_dir}/batch')
+        
+        # Without a shared registry, fitted models live next to the checkpoints
+        if registry_config.get('enabled', True):
+            registry_dir = registry_config.get('directory', './outputs/models')
+        else:
+            registry_dir = f'{checkpoint_dir}/models'
+        
+        end = stock_config['end']
+        if end.lower() == 'today':
+            end = datetime.now().strftime('%Y-%m-%d')
+        
+        self.workers = batch_config.get('workers', 1)
+        self.fetch = fetch or _fetch_yahoo
+        self.manifest = CheckpointManifest(checkpoint_dir)
+        
+        # A checkpoint only counts as done for the exact same inputs
+        ensemble_config = cfg.get('ensemble') or {}
+        self.params = {
+            'start': stock_config['start'],
+            'end': end,
+            'days': forecast_config['days'],
+            'model': cfg.get_model_config(),
+            'ensemble': ensemble_config if ensemble_config.get('enabled', False) else None
+        }
+        
+        self.settings = {
+            'params': self.params,
+            'checkpoint_dir': checkpoint_dir,
+            'registry_dir': registry_dir,
+            'output_dir': output_dir,
+            'save_csv': output_config.get('save_csv', True),
+            'save_plots': save_plots,
+            'plot': plot_options(output_config, cfg.get_visualization_config())
+        }
+        
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+    
+    def worker_settings(self, resume: bool = True) -> Dict[str, Any]:
+        return {
+            **self.settings,
+            'resume': resume,
+            'profile': get_profiler() is not None,
+            'logging': get_log_settings()
+        }
+    
+    def retrainer(self, workers: int = 1) -> Callable[[str], Dict[str, Any]]:
+        # A picklable one-symbol refit (fetch, train, predict, export) for
+        # callers that decide themselves which symbols to run
+        return partial(retrain_symbol, settings=self.worker_settings(resume=False), fetch=self.fetch, in_worker=workers > 1)
+    
+    def run(self, symbols: list[str], workers: Optional[int] = None, resume: bool = True) -> Dict[str, Dict[str, Any]]:
+        workers = workers or self.workers
+        
+        pending = [s for s in symbols if not (resume and self.manifest.is_done(s, self.params))]
+        skipped = len(symbols) - len(pending)
+        
+        logger.info("🚀 Batch forecast: %d symbols, %d worker(s)", len(symbols), workers)
+        if skipped:
+            logger.info("   ⏭️  Skipping %d symbols completed by a previous run", skipped)
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        settings = self.worker_settings(resume)
+        tasks = [(symbol, settings, self.fetch, workers > 1) for symbol in pending]
+        
+        if workers == 1 or len(tasks) <= 1:
+            for i, task in enumerate(tasks, 1):
+                results[task[0]] = run_symbol(task)
+                self._report(task[0], results[task[0]], i, len(tasks))
+        else:
+            # Spawned workers don't inherit locks held by the parent's threads
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = {executor.submit(run_symbol, task): task[0] for task in tasks}
+                for i, future in enumerate(as_completed(futures), 1):
+                    symbol = futures[future]
+                    try:
+                        results[symbol] = future.result()
+                    except Exception as e:
+                        # A crashed worker process leaves the checkpoint at its last stage
+                        results[symbol] = {'symbol': symbol, 'status': 'failed', 'error': f'{type(e).__name__}: {e}'}
+                    self._report(symbol, results[symbol], i, len(tasks))
+        
+        profiler = get_profiler()
+        for state in results.values():
+            records = state.pop('profile', None)
+            if profiler is not None and records:
+                profiler.extend(records)
+            
+            snapshot = state.pop('metrics', None)
+            if snapshot:
+                REGISTRY.merge(snapshot)
+            BATCH_SYMBOLS.inc(status=state.get('status', 'failed'))
+        
+        states = {symbol: results.get(symbol) or self.manifest.read(symbol) or {} for symbol in symbols}
+        self.write_summary(states)
+        
+        failed = [s for s, state in states.items() if state.get('status') != 'done']
+        logger.info("✅ Batch completed: %d done, %d failed", len(symbols) - len(failed), len(failed))
+        
+        return states
+    
+    def _report(self, symbol: str, state: Dict[str, Any], index: int, total: int) -> None:
+        with log_context(symbol=symbol):
+            if state.get('status') == 'done':
+                change = state['outputs'].get('change_pct')
+                logger.info("   ✅ [%d/%d] %s: expected change %+.2f%%", index, total, symbol, change, extra={'change_pct': change})
+            else:
+                logger.error(
+                    "   ❌ [%d/%d] %s failed at %s: %s", index, total, symbol, state.get('stage') or 'start', state.get('error'),
+                    extra={'error': state.get('error')}
+                )
+    
+    def write_summary(self, states: Dict[str, Dict[str, Any]]) -> str:
+        import pandas as pd
+        
+        rows = []
+        for symbol, state in states.items():
+            outputs = state.get('outputs', {})
+            rows.append({
+                'symbol': symbol,
+                'status': state.get('status'),
+                'stage': state.get('stage'),
+                'current_price': outputs.get('current_price'),
+                'expected_price': outputs.get('expected_price'),
+                'change_pct': outputs.get('change_pct'),
+                'optimal_sell_date': outputs.get('optimal_sell_date'),
+                'error': state.get('error')
+            })
+        
+        summary_path = Path(self.settings['output_dir']) / 'batch_summary.csv'
+        pd.DataFrame(rows).to_csv(summary_path, index=False)
+        logger.info("💾 Batch summary saved: %s", summary_path)
+        
+        return str(summary_path)
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.metrics import cache_result
+
+logger = logging.getLogger(__name__)
+
+# How a stage's artifact is written to and read from the cache
+ARTIFACT_KINDS = ['frame', 'model', 'json', 'files']
+
+
+def _file_stamps(paths: Dict[str, str]) -> Dict[str, Optional[list[int]]]:
+    stamps = {}
+    for name, path in paths.items():
+        try:
+            stat = os.stat(path)
+            stamps[name] = [stat.st_size, stat.st_mtime_ns]
+        except FileNotFoundError:
+            stamps[name] = None
+    return stamps
+
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        inputs: Optional[list[str]] = None,
+        config: Optional[Dict[str, Any]] = None,
+        kind: str = 'json',
+        version: int = 1
+    ):
+        if kind not in ARTIFACT_KINDS:
+            raise ValueError(f"Unknown artifact kind: {kind}")
+        
+        self.name = name
+        self.fn = fn
+        self.inputs = inputs or []
+        self.config = config or {}
+        self.kind = kind
+        
+        # Bump when the stage's code changes so old artifacts are not reused
+        self.version = version
+
+
+class ArtifactStore:
+    def __init__(self, directory: str = './outputs/.pipeline_cache'):
+        self.directory = Path(directory)
+        
+        # Create cache directory if it doesn't exist
+        self.directory.mkdir(parents=True, exist_ok=True)
+    
+    def path(self, stage: Stage, key: str) -> Path:
+        suffix = {'frame': '.pkl', 'model': '', 'json': '.json', 'files': '.json'}[stage.kind]
+        return self.directory / stage.name / f'{key}{suffix}'
+    
+    def exists(self, stage: Stage, key: str) -> bool:
+        path = self.path(stage, key)
+        if not path.exists():
+            return False
+        
+        # Published files may have been deleted or overwritten since
+        if stage.kind == 'files':
+            stored = self._read_json(path)
+            return stored['stamps'] == _file_stamps(stored['paths'])
+        
+        return True
+    
+    def load(self, stage: Stage, key: str) -> Any:
+        path = self.path(stage, key)
+        
+        if stage.kind == 'frame':
+            import pandas as pd
+            
+            return pd.read_pickle(path)
+        
+        if stage.kind == 'model':
+            from src.models import load_model
+            
+            return load_model(str(path))
+        
+        if stage.kind == 'files':
+            return self._read_json(path)['paths']
+        
+        return self._read_json(path)
+    
+    def save(self, stage: Stage, key: str, artifact: Any) -> None:
+        path = self.path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Write to a temporary name so a killed run never leaves a partial artifact
+        tmp_path = path.with_name(f'{path.name}.{uuid.uuid4().hex}.tmp')
+        
+        if stage.kind == 'frame':
+            artifact.to_pickle(tmp_path)
+        elif stage.kind == 'model':
+            artifact.save(str(tmp_path))
+            if path.exists():
+                shutil.rmtree(path)
+        else:
+            if stage.kind == 'files':
+                artifact = {'paths': artifact, 'stamps': _file_stamps(artifact)}
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(artifact, f, indent=2, default=str)
+        
+        os.replace(tmp_path, path)
+    
+    def _read_json(self, path: Path) -> Any:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+class Pipeline:
+    def __init__(self, stages: list[Stage], store: Optional[ArtifactStore] = None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.store = store
+        
+        # What happened to each stage in the last run: 'cached' or 'ran'
+        self.status: Dict[str, str] = {}
+        self._keys: Dict[str, str] = {}
+        
+        for stage in stages:
+            for name in stage.inputs:
+                if name not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{name}'")
+    
+    def key(self, name: str, _path: tuple = ()) -> str:
+        if name in _path:
+            raise ValueError(f"Cycle in pipeline: {' -> '.join(_path + (name,))}")
+        
+        if name not in self._keys:
+            stage = self.stages[name]
+            
+            # A stage's key covers its code version, its config section and,
+            # transitively, everything its inputs were built from
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(json.dumps(
+                {'stage': name, 'version': stage.version, 'config': stage.config},
+                sort_keys=True,
+                default=str
+            ).encode('utf-8'))
+            for input_name in stage.inputs:
+                digest.update(b'|' + self.key(input_name, _path + (name,)).encode('utf-8'))
+            
+            self._keys[name] = digest.hexdigest()
+        
+        return self._keys[name]
+    
+    def run(self, targets: Optional[list[str]] = None, force: bool = False) -> Dict[str, Any]:
+        targets = targets or list(self.stages)
+        self.status = {}
+        
+        results: Dict[str, Any] = {}
+        for name in targets:
+            self._resolve(name, results, force)
+        
+        return results
+    
+    def _resolve(self, name: str, results: Dict[str, Any], force: bool) -> Any:
+        if name in results:
+            return results[name]
+        
+        stage = self.stages[name]
+        key = self.key(name)
+        
+        # Cached artifacts are loaded without touching their inputs, so an
+        # unchanged fit never triggers a refetch
+        hit = self.store is not None and not force and self.store.exists(stage, key)
+        if self.store is not None and not force:
+            cache_result('pipeline', hit)
+        
+        if hit:
+            logger.info("⏭️  %s: using cached artifact", name, extra={'stage': name})
+            results[name] = self.store.load(stage, key)
+            self.status[name] = 'cached'
+            return results[name]
+        
+        inputs = {input_name: self._resolve(input_name, results, force) for input_name in stage.inputs}
+        results[name] = stage.fn(**inputs)
+        self.status[name] = 'ran'
+        
+        if self.store is not None:
+            self.store.save(stage, key, results[name])
+        
+        return results[name]
@@ -0,0 +1,300 @@
+import heapq
+import json
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.metrics import REGISTRY
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+RetrainFunction = Callable[[str], Dict[str, Any]]
+
+SCHEDULED_RETRAINS = REGISTRY.counter('forecast_scheduler_retrains_total', 'Retrains dispatched by the scheduler, by outcome', ('status',))
+SCHEDULED_CPU = REGISTRY.counter('forecast_scheduler_cpu_seconds_total', 'CPU seconds spent in scheduled retrains')
+BACKLOG = REGISTRY.gauge('forecast_scheduler_backlog', 'Symbols due for a retrain that the last cycle had no budget for')
+
+DEFAULT_WEIGHTS = {'staleness': 1.0, 'age': 0.5, 'error': 1.0, 'demand': 0.5}
+
+
+def _cpu_seconds() -> float:
+    # This process plus its finished children (cmdstan runs as a subprocess)
+    seconds = time.process_time()
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        seconds += children.ru_utime + children.ru_stime
+    return seconds
+
+
+def _run_timed(task: tuple) -> tuple[Dict[str, Any], float]:
+    retrain, symbol = task
+    start = _cpu_seconds()
+    try:
+        state = retrain(symbol)
+    except Exception as e:
+        state = {'status': 'failed', 'error': f'{type(e).__name__}: {e}'}
+    return state, _cpu_seconds() - start
+
+
+def _days_since(value: Optional[str], now: datetime) -> Optional[float]:
+    if value is None:
+        return None
+    return max((now - datetime.fromisoformat(value)).total_seconds() / 86400, 0.0)
+
+
+class RetrainScheduler:
+    # Decides which symbols to refit when there is compute for only some of
+    # them. Each symbol's need grows with data staleness (days of prices
+    # newer than the model's history), model age and forecast error (the
+    # drift monitor's score, 1 = alarm); user demand scales the need up but
+    # never creates it. Every cycle the due symbols go into a max-heap and
+    # are refitted in priority order until the CPU budget is spent.
+    def __init__(
+        self,
+        retrain: RetrainFunction,
+        cpu_budget: float = 3600.0,
+        workers: int = 1,
+        weights: Optional[Dict[str, float]] = None,
+        staleness_days: float = 7.0,
+        age_days: float = 30.0,
+        min_priority: float = 1.0,
+        untrained_priority: float = 10.0,
+        default_cost: float = 30.0,
+        demand_decay: float = 0.5,
+        state_file: Optional[str] = None,
+        registry: Optional[Any] = None,
+        monitor: Optional[Any] = None
+    ):
+        self.retrain = retrain
+        self.cpu_budget = cpu_budget
+        self.workers = workers
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.staleness_days = staleness_days
+        self.age_days = age_days
+        self.min_priority = min_priority
+        self.untrained_priority = untrained_priority
+        self.default_cost = default_cost
+        self.demand_decay = demand_decay
+        self.state_file = Path(state_file) if state_file else None
+        self.registry = registry
+        self.monitor = monitor
+        
+        # Per symbol: history_end and saved_at (ISO strings, None if never
+        # trained), error score, demand and the measured CPU cost of a refit
+        self.symbols: Dict[str, Dict[str, Any]] = {}
+        
+        if self.state_file is not None and self.state_file.exists():
+            self.load()
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], retrain: RetrainFunction, **kwargs: Any) -> 'RetrainScheduler':
+        return cls(
+            retrain,
+            cpu_budget=config.get('cpu_budget', 3600.0),
+            workers=config.get('workers', 1),
+            weights=config.get('weights'),
+            staleness_days=config.get('staleness_days', 7.0),
+            age_days=config.get('age_days', 30.0),
+            min_priority=config.get('min_priority', 1.0),
+            untrained_priority=config.get('untrained_priority', 10.0),
+            default_cost=config.get('default_cost', 30.0),
+            demand_decay=config.get('demand_decay', 0.5),
+            state_file=config.get('state_file'),
+            **kwargs
+        )
+    
+    def _entry(self, symbol: str) -> Dict[str, Any]:
+        symbol = symbol.upper()
+        if symbol not in self.symbols:
+            self.symbols[symbol] = {'history_end': None, 'saved_at': None, 'error': 0.0, 'demand': 0.0, 'cost': None}
+        return self.symbols[symbol]
+    
+    def load(self) -> None:
+        # Only what no other component keeps: demand and refit costs
+        with open(self.state_file, 'r', encoding='utf-8') as f:
+            for symbol, saved in json.load(f).items():
+                entry = self._entry(symbol)
+                entry['demand'] = saved.get('demand', 0.0)
+                entry['cost'] = saved.get('cost')
+    
+    def save(self, path: Optional[str] = None) -> str:
+        target = Path(path) if path else self.state_file
+        if target is None:
+            raise ValueError("No state file configured")
+        
+        state = {symbol: {'demand': entry['demand'], 'cost': entry['cost']} for symbol, entry in self.symbols.items()}
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp = target.with_name(f'.{target.name}.{os.getpid()}.tmp')
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp, target)
+        return str(target)
+    
+    def update(self, symbol: str, history_end: Optional[str] = None, saved_at: Optional[str] = None, error: Optional[float] = None) -> None:
+        entry = self._entry(symbol)
+        if history_end is not None:
+            entry['history_end'] = history_end
+        if saved_at is not None:
+            entry['saved_at'] = saved_at
+        if error is not None:
+            entry['error'] = float(error)
+    
+    def record_demand(self, symbol: str, requests: float = 1.0) -> None:
+        self._entry(symbol)['demand'] += requests
+    
+    def refresh(self, symbols: list[str]) -> None:
+        # Staleness and age from the registry, errors from the drift monitor
+        for symbol in symbols:
+            entry = self._entry(symbol)
+            if self.registry is not None:
+                meta = self.registry.meta(symbol) or {}
+                entry['history_end'] = meta.get('history_end')
+                entry['saved_at'] = meta.get('saved_at')
+                if self.monitor is not None and entry['history_end'] is not None:
+                    self.monitor.track_model(symbol, entry['history_end'])
+        
+        if self.monitor is not None:
+            scores = self.monitor.scores()
+            for record, score in zip(self.monitor.records, scores):
+                symbol = str(record['symbol'])
+                if symbol in self.symbols:
+                    self.symbols[symbol]['error'] = float(score)
+    
+    def priority(self, symbol: str, now: Optional[datetime] = None) -> float:
+        entry = self._entry(symbol)
+        now = now or datetime.now()
+        
+        staleness = _days_since(entry['history_end'], now)
+        age = _days_since(entry['saved_at'], now)
+        if staleness is None or age is None:
+            need = self.untrained_priority
+        else:
+            need = (
+                self.weights['staleness'] * staleness / self.staleness_days
+                + self.weights['age'] * age / self.age_days
+                + self.weights['error'] * entry['error']
+            )
+        
+        return need * (1 + self.weights['demand'] * math.log1p(entry['demand']))
+    
+    def estimate(self, symbol: str) -> float:
+        # A symbol never refitted here costs what the others typically do
+        cost = self._entry(symbol)['cost']
+        if cost is not None:
+            return cost
+        known = sorted(entry['cost'] for entry in self.symbols.values() if entry['cost'] is not None)
+        return known[len(known) // 2] if known else self.default_cost
+    
+    def queue(self, symbols: Optional[list[str]] = None, now: Optional[datetime] = None) -> list[tuple[float, str]]:
+        # Heap of (-priority, symbol) over the symbols that are due
+        now = now or datetime.now()
+        heap = []
+        for symbol in (symbols if symbols is not None else list(self.symbols)):
+            priority = self.priority(symbol, now)
+            if priority >= self.min_priority:
+                heap.append((-priority, symbol.upper()))
+        heapq.heapify(heap)
+        return heap
+    
+    def run_cycle(self, symbols: Optional[list[str]] = None, budget: Optional[float] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+        budget = self.cpu_budget if budget is None else budget
+        self.refresh(symbols if symbols is not None else list(self.symbols))
+        heap = self.queue(symbols, now)
+        due = len(heap)
+        
+        report: Dict[str, Any] = {'due': due, 'done': [], 'failed': [], 'cpu_seconds': 0.0, 'budget': budget}
+        in_flight: Dict[Any, tuple[str, float]] = {}
+        
+        def next_symbol() -> Optional[tuple[str, float]]:
+            if not heap:
+                return None
+            estimate = self.estimate(heap[0][1])
+            committed = report['cpu_seconds'] + sum(cost for _, cost in in_flight.values())
+            # Strictly in priority order, so a costly symbol is not starved by
+            # cheaper ones behind it; the first one runs even over budget
+            started = report['done'] or report['failed'] or in_flight
+            if started and committed + estimate > budget:
+                return None
+            return heapq.heappop(heap)[1], estimate
+        
+        logger.info("🗓️  Retrain cycle: %d symbol(s) due, %.0fs CPU budget", due, budget)
+        
+        if self.workers == 1:
+            task = next_symbol()
+            while task is not None:
+                self._finish(task[0], *_run_timed((self.retrain, task[0])), report)
+                task = next_symbol()
+        else:
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+                while True:
+                    while len(in_flight) < self.workers:
+                        task = next_symbol()
+                        if task is None:
+                            break
+                        in_flight[executor.submit(_run_timed, (self.retrain, task[0]))] = task
+                    if not in_flight:
+                        break
+                    
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        symbol, _ = in_flight.pop(future)
+                        try:
+                            state, cpu = future.result()
+                        except Exception as e:
+                            state, cpu = {'status': 'failed', 'error': f'{type(e).__name__}: {e}'}, 0.0
+                        self._finish(symbol, state, cpu, report)
+        
+        # Demand is spent once it has been served or waited a cycle
+        for entry in self.symbols.values():
+            entry['demand'] *= self.demand_decay
+        
+        report['deferred'] = [symbol for _, symbol in sorted(heap)]
+        BACKLOG.set(len(heap))
+        logger.info(
+            "✅ Cycle done: %d refitted, %d failed, %d deferred, %.0fs CPU",
+            len(report['done']), len(report['failed']), len(heap), report['cpu_seconds']
+        )
+        return report
+    
+    def _finish(self, symbol: str, state: Dict[str, Any], cpu: float, report: Dict[str, Any]) -> None:
+        entry = self._entry(symbol)
+        report['cpu_seconds'] += cpu
+        SCHEDULED_CPU.inc(cpu)
+        
+        snapshot = state.pop('metrics', None)
+        if snapshot:
+            REGISTRY.merge(snapshot)
+        state.pop('profile', None)
+        
+        # A failed fit's cost says little about a successful one
+        status = state.get('status', 'failed')
+        SCHEDULED_RETRAINS.inc(status='done' if status == 'done' else 'failed')
+        if status != 'done':
+            logger.error("   ❌ %s: %s", symbol, state.get('error'))
+            report['failed'].append(symbol)
+            return
+        
+        entry['cost'] = cpu if entry['cost'] is None else 0.5 * (entry['cost'] + cpu)
+        entry['error'] = 0.0
+        if self.monitor is not None:
+            self.monitor.reset(symbol)
+        if self.registry is not None:
+            self.refresh([symbol])
+        else:
+            entry['saved_at'] = datetime.now().isoformat(timespec='seconds')
+            entry['history_end'] = entry['saved_at'][:10]
+        
+        logger.info("   ✅ %s refitted in %.1fs CPU", symbol, cpu)
+        report['done'].append(symbol)
@@ -0,0 +1,129 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from .dag import ArtifactStore, Pipeline, Stage
+
+
+# Shared by the single-symbol pipeline and the batch runner, so both pick
+# the same model type and plot settings for a symbol
+
+def create_model(model_config: Dict[str, Any], ensemble_config: Optional[Dict[str, Any]] = None) -> Any:
+    from src.models import EnsembleModel, ForecastModel
+    
+    if ensemble_config and ensemble_config.get('enabled', False):
+        return EnsembleModel.from_config(model_config, ensemble_config)
+    return ForecastModel(config=model_config)
+
+
+def plot_options(output_config: Dict[str, Any], visualization_config: Dict[str, Any]) -> Dict[str, Any]:
+    output_dir = output_config.get('directory', './outputs')
+    return {
+        'output_dir': output_dir,
+        'figsize': (visualization_config.get('figure_width', 16), visualization_config.get('figure_height', 8)),
+        'dpi': output_config.get('plot_dpi', 300),
+        'cache_dir': f'{output_dir}/.plot_cache' if output_config.get('plot_cache', True) else None,
+        'show_annotations': visualization_config.get('show_annotations', True)
+    }
+
+
+def create_plotter(options: Dict[str, Any]) -> Any:
+    from src.visualization.plotter import ForecastPlotter
+    
+    return ForecastPlotter(output_dir=options['output_dir'], figsize=options['figsize'], dpi=options['dpi'], cache_dir=options['cache_dir'])
+
+
+def plot_outputs(plotter: Any, model: Any, forecast: Any, symbol: str, options: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        'forecast': plotter.plot_forecast(model, forecast, symbol, show_annotations=options['show_annotations']),
+        'components': plotter.plot_components(model, forecast, symbol)
+    }
+
+
+def build_forecast_pipeline(cfg: Any, symbol: str, days: int, store: Optional[ArtifactStore] = None, fetch: Optional[Any] = None) -> Pipeline:
+    stock_config = cfg.get_stock_config()
+    model_config = cfg.get_model_config()
+    forecast_config = cfg.get_forecast_config()
+    output_config = cfg.get_output_config()
+    visualization_config = cfg.get_visualization_config()
+    ensemble_config = cfg.get('ensemble') or {}
+    use_ensemble = ensemble_config.get('enabled', False)
+    
+    # 'today' is pinned to a date so the fetch is reused for the rest of the day
+    end = stock_config['end']
+    if end.lower() == 'today':
+        end = datetime.now().strftime('%Y-%m-%d')
+    
+    output_dir = output_config.get('directory', './outputs')
+    as_of = datetime.now().strftime('%Y-%m-%d')
+    
+    def fetch_data() -> Any:
+        if fetch is not None:
+            return fetch(symbol, stock_config['start'], end)
+        
+        from src.data import Fetcher
+        
+        f = Fetcher()
+        if not f.validate_symbol(symbol):
+            raise ValueError(f"Invalid symbol: {symbol}")
+        
+        return f.fetch(symbol, stock_config['start'], end)
+    
+    def preprocess(fetch: Any) -> Any:
+        from src.data import prepare_for_prophet
+        
+        return prepare_for_prophet(fetch)
+    
+    def train(preprocess: Any) -> Any:
+        model = create_model(model_config, ensemble_config)
+        model.train(preprocess)
+        return model
+    
+    def predict(train: Any) -> Any:
+        return train.predict(periods=days, freq=forecast_config.get('freq', 'D'))
+    
+    def analyze(preprocess: Any, predict: Any) -> Dict[str, Any]:
+        from src.analysis import ForecastAnalyzer
+        
+        analyzer = ForecastAnalyzer.from_config(model_config)
+        
+        return {
+            'current_price': float(preprocess['y'].iloc[-1]),
+            'min': float(preprocess['y'].min()),
+            'max': float(preprocess['y'].max()),
+            'mean': float(preprocess['y'].mean()),
+            'samples': len(preprocess),
+            'optimal': analyzer.find_optimal_sell_date(predict),
+            'volatility': analyzer.calculate_volatility(predict, window=90)
+        }
+    
+    def plot(train: Any, predict: Any) -> Dict[str, str]:
+        options = plot_options(output_config, visualization_config)
+        return plot_outputs(create_plotter(options), train, predict, symbol, options)
+    
+    def export(predict: Any) -> Dict[str, str]:
+        if not output_config.get('save_csv', True):
+            return {}
+        
+        from src.analysis import ForecastAnalyzer
+        
+        csv_file = f'{output_dir}/forecast_{symbol}.csv'
+        ForecastAnalyzer().export_to_csv(predict, csv_file, include_components=True)
+        return {'csv': csv_file}
+    
+    # Each stage only hashes the config it actually reads, so e.g. a change
+    # to `visualization` re-runs plotting without refetching or refitting
+    train_config: Dict[str, Any] = {'model': model_config}
+    if use_ensemble:
+        train_config['ensemble'] = ensemble_config
+    
+    stages = [
+        Stage('fetch', fetch_data, config={'symbol': symbol, 'start': stock_config['start'], 'end': end}, kind='frame'),
+        Stage('preprocess', preprocess, inputs=['fetch'], kind='frame'),
+        Stage('train', train, inputs=['preprocess'], config=train_config, kind='model'),
+        Stage('predict', predict, inputs=['train'], config={'days': days, 'freq': forecast_config.get('freq', 'D')}, kind='frame'),
+        Stage('analyze', analyze, inputs=['preprocess', 'predict'], config={'as_of': as_of}, kind='json'),
+        Stage('plot', plot, inputs=['train', 'predict'], config={'symbol': symbol, 'as_of': as_of, 'output': output_config, 'visualization': visualization_config}, kind='files'),
+        Stage('export', export, inputs=['predict'], config={'symbol': symbol, 'output': output_config}, kind='files'),
+    ]
+    
+    return Pipeline(stages, store)
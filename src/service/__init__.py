@@ -0,0 +1,19 @@
+from typing import TYPE_CHECKING
+
+from src.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .pool import ModelPool
+    from .jobs import Job, JobQueue
+    from .server import ForecastService, build_service, create_server
+
+__all__ = ['ModelPool', 'Job', 'JobQueue', 'ForecastService', 'build_service', 'create_server']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'ModelPool': '.pool',
+    'Job': '.jobs',
+    'JobQueue': '.jobs',
+    'ForecastService': '.server',
+    'build_service': '.server',
+    'create_server': '.server',
+})
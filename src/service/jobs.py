@@ -0,0 +1,92 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+ProgressCallback = Callable[[float, str], None]
+
+
+class Job:
+    def __init__(self, job_id: str, key: str):
+        self.id = job_id
+        self.key = key
+        self.status = 'pending'
+        self.progress = 0.0
+        self.message = 'Queued'
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed')
+    
+    def report(self, progress: float, message: str) -> None:
+        self.progress = min(max(progress, 0.0), 1.0)
+        self.message = message
+
+
+class JobQueue:
+    def __init__(self, max_workers: int = 2, max_jobs: int = 100, max_age: float = 3600):
+        self.max_jobs = max_jobs
+        self.max_age = max_age
+        
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='forecast-job')
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._keys: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, key: str, fn: Callable[[ProgressCallback], Any]) -> str:
+        with self._lock:
+            # Running and recently finished jobs are reused across reruns
+            existing = self._jobs.get(self._keys.get(key, ''))
+            if existing is not None and existing.status != 'failed' and not self._expired(existing):
+                return existing.id
+            
+            job = Job(uuid.uuid4().hex[:12], key)
+            self._jobs[job.id] = job
+            self._keys[key] = job.id
+            self._trim()
+        
+        self._executor.submit(self._run, job, fn)
+        return job.id
+    
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        if job_id is None:
+            return None
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+    
+    def _run(self, job: Job, fn: Callable[[ProgressCallback], Any]) -> None:
+        job.status = 'running'
+        job.report(0.0, 'Starting')
+        
+        try:
+            job.result = fn(job.report)
+            job.report(1.0, 'Done')
+            job.status = 'done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.monotonic()
+    
+    def _expired(self, job: Job) -> bool:
+        return job.finished_at is not None and time.monotonic() - job.finished_at > self.max_age
+    
+    def _trim(self) -> None:
+        # Drop the oldest finished jobs once the history is full
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            job = self._jobs[job_id]
+            if job.finished:
+                del self._jobs[job_id]
+                if self._keys.get(job.key) == job_id:
+                    del self._keys[job.key]
@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.utils.metrics import cache_result
+
+
+class ModelPool:
+    def __init__(self, loader: Optional[Callable[[Any], Any]] = None, max_size: int = 32, max_age: float = 3600, name: str = 'pool'):
+        self.loader = loader
+        self.name = name
+        self.max_size = max_size
+        self.max_age = max_age
+        
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable, loader: Optional[Callable[[], Any]] = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.max_age:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                cache_result(self.name, True)
+                return entry[1]
+            
+            # Concurrent requests for the same key wait on a single load
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+        
+        if owner:
+            cache_result(self.name, False)
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            value = loader() if loader is not None else self.loader(key)
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        
+        future.set_result(value)
+        return value
+    
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def keys(self) -> list[Hashable]:
+        with self._lock:
+            return list(self._entries.keys())
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
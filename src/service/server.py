@@ -0,0 +1,226 @@
+import json
+import math
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+from src.analysis import ForecastAnalyzer, ScenarioEngine
+from src.data import Fetcher, prepare_for_prophet
+from src.models import ForecastModel, ModelRegistry
+from src.utils.logger import log_context
+from src.utils.metrics import REGISTRY
+from .pool import ModelPool
+
+# Prometheus text exposition format
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bound on simulated paths per request (paths x days floats in memory)
+MAX_PATHS = 20000
+
+# Ticker characters Yahoo Finance uses (e.g. BRK-B, ^GSPC, EURUSD=X)
+SYMBOL_PATTERN = re.compile(r'[A-Za-z0-9.^=-]{1,32}')
+
+REQUESTS = REGISTRY.counter('forecast_service_requests_total', 'Service requests by endpoint and status', ('endpoint', 'status'))
+REQUEST_SECONDS = REGISTRY.histogram('forecast_service_request_seconds', 'Service request latency', ('endpoint',))
+
+
+class ForecastService:
+    def __init__(self, loader: Callable[[str], Any], pool_size: int = 32, max_age: float = 3600, max_days: int = 365, interval_width: float = 0.8):
+        self.max_days = max_days
+        self.analyzer = ForecastAnalyzer(interval_width)
+        
+        # Fitted models and their forecasts are cached separately so that
+        # every horizon reuses a single fit
+        self.models = ModelPool(loader, max_size=pool_size, max_age=max_age, name='models')
+        self.forecasts = ModelPool(self._predict, max_size=pool_size * 4, max_age=max_age, name='forecasts')
+    
+    def _predict(self, key: Tuple[str, int]) -> pd.DataFrame:
+        symbol, days = key
+        return self.models.get(symbol).predict(periods=days)
+    
+    def get_forecast(self, symbol: str, days: int) -> pd.DataFrame:
+        if days < 1 or days > self.max_days:
+            raise ValueError(f"days must be between 1 and {self.max_days}")
+        return self.forecasts.get((symbol.upper(), days))
+    
+    def forecast(self, symbol: str, days: int = 30) -> Dict[str, Any]:
+        forecast = self.get_forecast(symbol, days)
+        future = self.analyzer.get_future_values(forecast, days=days)
+        
+        return {
+            'symbol': symbol.upper(),
+            'days': days,
+            'forecast': _records(future[['ds', 'yhat', 'yhat_lower', 'yhat_upper']])
+        }
+    
+    def scenarios(self, symbol: str, days: int = 30, target_date: Optional[str] = None, paths: Optional[int] = None, seed: Optional[int] = None, target: Optional[float] = None) -> Dict[str, Any]:
+        forecast = self.get_forecast(symbol, days)
+        
+        result = {
+            'symbol': symbol.upper(),
+            'scenarios': self.analyzer.generate_scenarios(forecast, target_date)
+        }
+        
+        if paths is not None:
+            if paths < 1 or paths > MAX_PATHS:
+                raise ValueError(f"paths must be between 1 and {MAX_PATHS}")
+            history = self.models.get(symbol.upper()).history
+            simulated = ScenarioEngine(paths, seed).simulate(forecast, history)
+            result['simulation'] = simulated.summary(target=target)
+        
+        return result
+    
+    def optimal_sell_date(self, symbol: str, days: int = 365, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
+        forecast = self.get_forecast(symbol, days)
+        
+        return {
+            'symbol': symbol.upper(),
+            'optimal': self.analyzer.find_optimal_sell_date(forecast, start_date, end_date)
+        }
+    
+    def health(self) -> Dict[str, Any]:
+        return {
+            'status': 'ok',
+            'models': self.models.keys(),
+            'model_hits': self.models.hits,
+            'model_misses': self.models.misses,
+            'forecast_hits': self.forecasts.hits,
+            'forecast_misses': self.forecasts.misses
+        }
+    
+    def handle(self, path: str, params: Dict[str, str]) -> Tuple[int, Union[Dict[str, Any], str]]:
+        if path == '/health':
+            return 200, self.health()
+        
+        if path == '/metrics':
+            return 200, REGISTRY.render()
+        
+        routes = {
+            '/forecast': lambda symbol, days: self.forecast(symbol, days),
+            '/scenarios': lambda symbol, days: self.scenarios(
+                symbol, days, params.get('target_date'),
+                paths=_optional(params, 'paths', int), seed=_optional(params, 'seed', int), target=_optional(params, 'target', float)
+            ),
+            '/optimal-sell-date': lambda symbol, days: self.optimal_sell_date(
+                symbol, days, params.get('start'), params.get('end')
+            ),
+        }
+        
+        if path not in routes:
+            return 404, {'error': f'Unknown endpoint: {path}'}
+        
+        symbol = params.get('symbol')
+        if not symbol:
+            return 400, {'error': 'Missing required parameter: symbol'}
+        if not SYMBOL_PATTERN.fullmatch(symbol):
+            return 400, {'error': f'Invalid symbol: {symbol}'}
+        
+        # Gauges and failure counts recorded while serving are labelled with
+        # the requested symbol instead of 'unknown'
+        try:
+            days = int(params.get('days', 30 if path == '/forecast' else self.max_days))
+            with log_context(symbol=symbol.upper()):
+                return 200, routes[path](symbol, days)
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+
+def _optional(params: Dict[str, str], name: str, cast: Callable[[str], Any]) -> Any:
+    return cast(params[name]) if params.get(name) else None
+
+
+def _records(df: pd.DataFrame) -> list[Dict[str, Any]]:
+    records = []
+    for row in df.itertuples(index=False):
+        record = {}
+        for name, value in zip(df.columns, row):
+            if isinstance(value, pd.Timestamp):
+                record[name] = value.strftime('%Y-%m-%d')
+            elif isinstance(value, float) and math.isnan(value):
+                record[name] = None
+            else:
+                record[name] = float(value)
+        records.append(record)
+    return records
+
+
+def make_handler(service: ForecastService) -> type:
+    class ForecastRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            start = time.perf_counter()
+            url = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            
+            status, payload = service.handle(url.path, params)
+            if isinstance(payload, str):
+                body = payload.encode('utf-8')
+                content_type = METRICS_CONTENT_TYPE
+            else:
+                body = json.dumps(payload, default=str).encode('utf-8')
+                content_type = 'application/json'
+            
+            # Unknown paths share one label so scanners can't blow up cardinality
+            endpoint = url.path if status != 404 else 'other'
+            REQUESTS.inc(endpoint=endpoint, status=status)
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+            
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format: str, *args: Any) -> None:
+            # Dashboards poll at high QPS, keep the console quiet
+            pass
+    
+    return ForecastRequestHandler
+
+
+def build_service(cfg: Any) -> ForecastService:
+    stock_config = cfg.get_stock_config()
+    model_config = cfg.get_model_config()
+    registry_config = cfg.get('registry', {})
+    service_config = cfg.get('service', {})
+    max_age = service_config.get('max_age', 3600)
+    
+    registry = None
+    if registry_config.get('enabled', True):
+        registry = ModelRegistry(registry_config.get('directory', './outputs/models'))
+    
+    def load_model(symbol: str) -> ForecastModel:
+        with log_context(symbol=symbol.upper()):
+            # A recent model from the registry avoids refitting
+            if registry is not None:
+                model = registry.load(symbol, config=model_config, max_age=max_age)
+                if model is not None:
+                    return model
+            
+            data = Fetcher().fetch(symbol, stock_config['start'], stock_config['end'])
+            model = ForecastModel(config=model_config)
+            model.train(prepare_for_prophet(data))
+            
+            if registry is not None:
+                registry.save(symbol, model)
+            
+            return model
+    
+    return ForecastService(
+        load_model,
+        pool_size=service_config.get('pool_size', 32),
+        max_age=max_age,
+        max_days=service_config.get('max_days', 365),
+        interval_width=model_config.get('interval_width', 0.8)
+    )
+
+
+def create_server(service: ForecastService, host: str = '127.0.0.1', port: int = 8000) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
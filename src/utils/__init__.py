@@ -1,3 +1,26 @@
-from .config import load_config
+from typing import TYPE_CHECKING
 
-__all__ = ['load_config']
+from .lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .config import load_config
+    from .hashing import frame_fingerprint
+    from .memory import MemoryProfiler, memory_profiling
+    from .metrics import REGISTRY, MetricsRegistry, instrumented
+    from .profiling import Profiler, profiled, profiling, profile_symbol
+
+__all__ = ['load_config', 'frame_fingerprint', 'Profiler', 'profiled', 'profiling', 'profile_symbol', 'REGISTRY', 'MetricsRegistry', 'instrumented', 'MemoryProfiler', 'memory_profiling']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'load_config': '.config',
+    'frame_fingerprint': '.hashing',
+    'Profiler': '.profiling',
+    'profiled': '.profiling',
+    'profiling': '.profiling',
+    'profile_symbol': '.profiling',
+    'REGISTRY': '.metrics',
+    'MetricsRegistry': '.metrics',
+    'instrumented': '.metrics',
+    'MemoryProfiler': '.memory',
+    'memory_profiling': '.memory',
+})
@@ -0,0 +1,10 @@
+import hashlib
+import pandas as pd
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    # Vectorized row hashes are far cheaper than pickling the frame
+    row_hashes = pd.util.hash_pandas_object(df, index=True).values
+    digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16)
+    digest.update(','.join(str(col) for col in df.columns).encode('utf-8'))
+    return digest.hexdigest()
@@ -0,0 +1,20 @@
+from importlib import import_module
+from typing import Any, Callable, Dict, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    # Submodules (and their prophet/matplotlib/yfinance imports) are only
+    # loaded when one of their names is first accessed
+    namespace = import_module(package).__dict__
+    
+    def __getattr__(name: str) -> Any:
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(import_module(exports[name], package), name)
+        namespace[name] = value
+        return value
+    
+    def __dir__() -> list[str]:
+        return sorted(set(namespace) | set(exports))
+    
+    return __getattr__, __dir__
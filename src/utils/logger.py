@@ -1,14 +1,165 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, TextIO
 
-def setup_logger(name='stock-forecast'):
+# Fields attached to every record logged inside log_context()
+_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar('log_context', default={})
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_settings: Dict[str, Any] = {'level': 'INFO', 'json': False}
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    token = _context.set({**_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def get_log_context() -> Dict[str, Any]:
+    return dict(_context.get())
+
+
+class ContextFilter(logging.Filter):
+    # Runs in the caller's thread, before the record is queued, so the
+    # context of the thread that logged is the one captured
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+_formatter = logging.Formatter()
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # The stock prepare() folds the traceback into the message and drops
+    # exc_info, so the JSON formatter could never write its 'exception'
+    # field. The message is still rendered here, in the caller's thread, but
+    # the traceback is kept apart as exc_text for the formatters.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage().strip(),
+        }
+        payload.update({
+            key: value for key, value in vars(record).items()
+            if key not in _RESERVED and not key.startswith('_')
+        })
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exception'] = record.exc_text
+        if record.stack_info:
+            payload['stack'] = record.stack_info
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    # Console output keeps the CLI's plain progress lines, prefixed with the
+    # symbol when several are processed at once
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        symbol = getattr(record, 'symbol', None)
+        return f'[{symbol}] {message}' if symbol else message
+
+
+def setup_logger(
+    name: str = 'src',
+    level: str = 'INFO',
+    json_format: bool = False,
+    stream: Optional[TextIO] = None,
+    filename: Optional[str] = None
+) -> logging.Logger:
+    global _listener
+    
+    _settings.update(level=level, json=json_format)
+    
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
     
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    
+    formatter = JsonFormatter() if json_format else TextFormatter('%(message)s')
+    
+    handlers: list[logging.Handler] = [logging.StreamHandler(stream or sys.stdout)]
+    if filename:
+        handlers.append(logging.FileHandler(filename, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    # Callers only enqueue records; a background thread does the formatting
+    # and the (slow, contended) stream writes
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(records)
+    queue_handler.addFilter(ContextFilter())
+    logger.addHandler(queue_handler)
+    
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
     
     return logger
+
+
+def get_log_settings() -> Dict[str, Any]:
+    # Handed to worker processes so they log the same way as the parent
+    return dict(_settings)
+
+
+def flush_logs() -> None:
+    # Drain the queue so queued lines appear before direct prints
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+@atexit.register
+def _stop_listener() -> None:
+    global _listener
+    
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(cfg: Any = None, level: Optional[str] = None, json_format: Optional[bool] = None) -> logging.Logger:
+    log_config = cfg.get('logging', {}) if cfg is not None else {}
+    
+    return setup_logger(
+        level=level or log_config.get('level', 'INFO'),
+        json_format=json_format if json_format is not None else log_config.get('format', 'text') == 'json',
+        filename=log_config.get('file')
+    )
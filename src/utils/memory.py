@@ -0,0 +1,165 @@
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from .profiling import Profiler, peak_rss_mb
+
+MB = 1024 * 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    # Resident set size right now; ru_maxrss only ever reports the peak
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return peak_rss_mb()
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / MB
+
+
+class RssSampler:
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._samples: list[float] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+    
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+    
+    def sample(self) -> None:
+        rss = current_rss_mb()
+        if rss is not None:
+            self._samples.append(rss)
+    
+    def mark(self) -> int:
+        self.sample()
+        return len(self._samples) - 1
+    
+    def peak_since(self, mark: int) -> Optional[float]:
+        self.sample()
+        window = self._samples[max(mark, 0):]
+        return max(window) if window else None
+
+
+class MemoryProfiler(Profiler):
+    # A Profiler whose stages also record Python allocations (tracemalloc)
+    # and the sampled RSS peak, so @profiled stages report memory as well
+    def __init__(self, sample_interval: float = 0.005, frames: int = 1):
+        super().__init__()
+        self.frames = frames
+        self.sampler = RssSampler(sample_interval)
+        
+        # Absolute traced peaks of the open stages, innermost last
+        self._open: list[int] = []
+        self._started_tracing = False
+    
+    def start(self) -> 'MemoryProfiler':
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self.sampler.start()
+        return self
+    
+    def stop(self) -> None:
+        self.sampler.stop()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+    
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        if not tracemalloc.is_tracing():
+            with super().stage(name, rows) as record:
+                yield record
+            return
+        
+        # reset_peak() is global, so the enclosing stage's peak so far is
+        # saved here and folded back in when this stage ends
+        start_current, start_peak = tracemalloc.get_traced_memory()
+        if self._open:
+            self._open[-1] = max(self._open[-1], start_peak)
+        tracemalloc.reset_peak()
+        self._open.append(start_current)
+        
+        rss_mark = self.sampler.mark()
+        
+        with super().stage(name, rows) as record:
+            try:
+                yield record
+            finally:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, self._open.pop())
+                if self._open:
+                    self._open[-1] = max(self._open[-1], peak)
+                
+                record['traced_peak_mb'] = (peak - start_current) / MB
+                record['retained_mb'] = (current - start_current) / MB
+                record['rss_peak_mb'] = self.sampler.peak_since(rss_mark)
+    
+    def memory_summary(self) -> list[Dict[str, Any]]:
+        totals: Dict[str, Dict[str, Any]] = {}
+        
+        for record in self.records:
+            total = totals.setdefault(record['stage'], {
+                'stage': record['stage'],
+                'calls': 0,
+                'traced_peak_mb': 0.0,
+                'retained_mb': 0.0,
+                'rss_peak_mb': None,
+                'rows': None
+            })
+            total['calls'] += 1
+            total['traced_peak_mb'] = max(total['traced_peak_mb'], record.get('traced_peak_mb', 0.0))
+            total['retained_mb'] = max(total['retained_mb'], record.get('retained_mb', 0.0))
+            if record.get('rss_peak_mb') is not None:
+                total['rss_peak_mb'] = max(total['rss_peak_mb'] or 0.0, record['rss_peak_mb'])
+            if record['rows'] is not None:
+                total['rows'] = max(total['rows'] or 0, record['rows'])
+        
+        return sorted(totals.values(), key=lambda total: total['traced_peak_mb'], reverse=True)
+
+
+@contextmanager
+def memory_profiling(sample_interval: float = 0.005) -> Iterator[MemoryProfiler]:
+    from .profiling import profiling
+    
+    profiler = MemoryProfiler(sample_interval).start()
+    try:
+        with profiling(profiler):
+            yield profiler
+    finally:
+        profiler.stop()
+
+
+def check_budgets(summary: list[Dict[str, Any]], budgets: Dict[str, float]) -> list[str]:
+    # Budgets are traced (Python-visible) peaks in MB, keyed by stage name
+    by_stage = {total['stage']: total for total in summary}
+    violations = []
+    
+    for stage, budget in budgets.items():
+        total = by_stage.get(stage)
+        if total is None:
+            violations.append(f"{stage}: stage did not run")
+        elif total['traced_peak_mb'] > budget:
+            violations.append(f"{stage}: peak {total['traced_peak_mb']:.1f} MB exceeds budget {budget:.1f} MB")
+    
+    return violations
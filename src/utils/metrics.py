@@ -0,0 +1,269 @@
+import functools
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .logger import get_log_context
+from .profiling import count_rows, get_profiler
+
+# Seconds, from a warm cache lookup up to a slow multi-year fit
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelKey = tuple
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: tuple, values: tuple, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{_escape(value)}"' for name, value in (extra or {}).items()]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ''
+    
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[LabelKey, Any] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+    
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            for key in sorted(self._values):
+                lines += self._render_sample(key, self._values[key])
+        return lines
+    
+    def _render_sample(self, key: LabelKey, value: Any) -> list[str]:
+        return [f'{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+    
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+    
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+    
+    def value(self, **labels: Any) -> Optional[float]:
+        return self._values.get(self._key(labels))
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+    
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][i] += 1
+            state['sum'] += value
+            state['count'] += 1
+    
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def count(self, **labels: Any) -> int:
+        state = self._values.get(self._key(labels))
+        return state['count'] if state else 0
+    
+    def _render_sample(self, key: LabelKey, state: Any) -> list[str]:
+        lines = []
+        for bound, count in zip(self.buckets, state['counts']):
+            lines.append(f'{self.name}_bucket{_format_labels(self.label_names, key, {"le": _format_value(bound)})} {count}')
+        lines.append(f'{self.name}_bucket{_format_labels(self.label_names, key, {"le": "+Inf"})} {state["count"]}')
+        lines.append(f'{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(state["sum"])}')
+        lines.append(f'{self.name}_count{_format_labels(self.label_names, key)} {state["count"]}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, cls: type, name: str, help: str, labels: tuple, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labels, **kwargs)
+            elif not isinstance(metric, cls) or metric.label_names != tuple(labels):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+    
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self._register(Counter, name, help, labels)
+    
+    def gauge(self, name: str, help: str, labels: tuple = ()) -> Gauge:
+        return self._register(Gauge, name, help, labels)
+    
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labels, buckets=buckets)
+    
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+    
+    def reset(self) -> None:
+        for metric in list(self._metrics.values()):
+            metric.clear()
+    
+    def render(self) -> str:
+        lines = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            if metric._values:
+                lines += metric.render()
+        return '\n'.join(lines) + '\n' if lines else ''
+    
+    def write_textfile(self, path: str) -> str:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        
+        # node_exporter may read at any time, so never expose a partial file
+        tmp_path = target.with_name(f'{target.name}.{uuid.uuid4().hex}.tmp')
+        tmp_path.write_text(self.render(), encoding='utf-8')
+        os.replace(tmp_path, target)
+        
+        return str(target)
+    
+    def snapshot(self) -> Dict[str, Dict[LabelKey, Any]]:
+        snapshot = {}
+        for name, metric in self._metrics.items():
+            with metric._lock:
+                snapshot[name] = {
+                    key: ({**value, 'counts': list(value['counts'])} if isinstance(value, dict) else value)
+                    for key, value in metric._values.items()
+                }
+        return snapshot
+    
+    def merge(self, snapshot: Dict[str, Dict[LabelKey, Any]]) -> None:
+        # Folds in a snapshot taken in a worker process; metrics are
+        # registered at import time, so both sides know every name
+        for name, values in snapshot.items():
+            metric = self._metrics.get(name)
+            if metric is None:
+                continue
+            with metric._lock:
+                for key, value in values.items():
+                    current = metric._values.get(key)
+                    if isinstance(metric, Histogram):
+                        if current is None:
+                            metric._values[key] = {**value, 'counts': list(value['counts'])}
+                        else:
+                            current['counts'] = [a + b for a, b in zip(current['counts'], value['counts'])]
+                            current['sum'] += value['sum']
+                            current['count'] += value['count']
+                    elif isinstance(metric, Counter):
+                        metric._values[key] = (current or 0.0) + value
+                    else:
+                        metric._values[key] = value
+
+
+REGISTRY = MetricsRegistry()
+
+# Metrics shared across modules
+FETCH_SECONDS = REGISTRY.histogram('forecast_fetch_seconds', 'Time spent downloading price history')
+FIT_SECONDS = REGISTRY.histogram('forecast_fit_seconds', 'Time spent fitting a Prophet model')
+PREDICT_SECONDS = REGISTRY.histogram('forecast_predict_seconds', 'Time spent generating a forecast')
+ROWS_PROCESSED = REGISTRY.counter('forecast_rows_processed_total', 'Rows processed per stage', ('stage',))
+FAILURES = REGISTRY.counter('forecast_failures_total', 'Failed stages per symbol', ('symbol', 'stage'))
+CACHE_REQUESTS = REGISTRY.counter('forecast_cache_requests_total', 'Cache lookups by cache and result', ('cache', 'result'))
+INTERVAL_WIDTH = REGISTRY.gauge('forecast_interval_width', 'Width of the forecast interval at the horizon, relative to the forecast', ('symbol',))
+AVG_INTERVAL_WIDTH = REGISTRY.gauge('forecast_avg_interval_width', 'Average confidence range over the analysis window, in price units', ('symbol',))
+
+
+def cache_result(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def current_symbol() -> str:
+    return get_log_context().get('symbol') or 'unknown'
+
+
+def instrumented(stage: str, histogram: Optional[Histogram] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    # Always-on metrics for a pipeline stage, and its profile record while
+    # profiling is on: the call is timed and its rows counted once for both
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profiler = get_profiler()
+            start = time.perf_counter()
+            
+            with (profiler.stage(stage) if profiler is not None else nullcontext({})) as record:
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception:
+                    FAILURES.inc(symbol=current_symbol(), stage=stage)
+                    raise
+                
+                # Rows of the returned frame, or of the input frame for fits
+                rows = count_rows(result)
+                if rows is None:
+                    rows = next((n for n in map(count_rows, list(args) + list(kwargs.values())) if n is not None), None)
+                record['rows'] = rows
+            
+            if histogram is not None:
+                histogram.observe(time.perf_counter() - start)
+            if rows:
+                ROWS_PROCESSED.inc(rows, stage=stage)
+            
+            return result
+        
+        return wrapper
+    
+    return decorator
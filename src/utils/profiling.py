@@ -0,0 +1,175 @@
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+_active: Optional['Profiler'] = None
+_symbol: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('profile_symbol', default=None)
+_depth: contextvars.ContextVar[int] = contextvars.ContextVar('profile_depth', default=0)
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def count_rows(value: Any) -> Optional[int]:
+    shape = getattr(value, 'shape', None)
+    if shape is not None and len(shape) > 0:
+        return int(shape[0])
+    return None
+
+
+class Profiler:
+    def __init__(self):
+        self.records: list[Dict[str, Any]] = []
+        self.started_at = datetime.now().isoformat()
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        record: Dict[str, Any] = {
+            'stage': name,
+            'symbol': _symbol.get(),
+            'depth': _depth.get(),
+            'rows': rows
+        }
+        depth_token = _depth.set(record['depth'] + 1)
+        
+        rss_before = peak_rss_mb()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        
+        try:
+            yield record
+        finally:
+            record['wall_s'] = time.perf_counter() - wall_start
+            record['cpu_s'] = time.process_time() - cpu_start
+            # ru_maxrss is the peak over the process lifetime, not this stage's:
+            # what the stage owns is how far it raised that peak, which is zero
+            # for a stage that stays under an earlier one
+            record['process_peak_rss_mb'] = peak_rss_mb()
+            record['rss_growth_mb'] = (record['process_peak_rss_mb'] - rss_before) if rss_before is not None else None
+            _depth.reset(depth_token)
+            
+            with self._lock:
+                self.records.append(record)
+    
+    def extend(self, records: list[Dict[str, Any]]) -> None:
+        # Records collected in worker processes
+        with self._lock:
+            self.records.extend(records)
+    
+    def summary(self) -> list[Dict[str, Any]]:
+        totals: Dict[tuple, Dict[str, Any]] = {}
+        
+        for record in self.records:
+            key = (record['symbol'], record['stage'])
+            total = totals.setdefault(key, {
+                'symbol': record['symbol'],
+                'stage': record['stage'],
+                'calls': 0,
+                'wall_s': 0.0,
+                'cpu_s': 0.0,
+                'rss_growth_mb': None,
+                'rows': None
+            })
+            total['calls'] += 1
+            total['wall_s'] += record['wall_s']
+            total['cpu_s'] += record['cpu_s']
+            if record.get('rss_growth_mb') is not None:
+                total['rss_growth_mb'] = max(total['rss_growth_mb'] or 0.0, record['rss_growth_mb'])
+            if record['rows'] is not None:
+                total['rows'] = max(total['rows'] or 0, record['rows'])
+        
+        return sorted(totals.values(), key=lambda total: total['wall_s'], reverse=True)
+    
+    def report(self) -> Dict[str, Any]:
+        return {
+            'started_at': self.started_at,
+            'finished_at': datetime.now().isoformat(),
+            'peak_rss_mb': peak_rss_mb(),
+            'summary': self.summary(),
+            'records': self.records
+        }
+    
+    def save(self, path: str) -> str:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, default=str)
+        return path
+    
+    def print_summary(self, limit: int = 15) -> None:
+        logger.info("\n⏱️  Profile (top %s stages by wall time)", limit)
+        logger.info("   %-32s %-8s %5s %8s %8s %8s %8s", 'stage', 'symbol', 'calls', 'wall s', 'cpu s', '+peak MB', 'rows')
+        for total in self.summary()[:limit]:
+            rss = f"{total['rss_growth_mb']:.0f}" if total['rss_growth_mb'] is not None else '-'
+            rows = total['rows'] if total['rows'] is not None else '-'
+            logger.info(
+                "   %-32s %-8s %5d %8.3f %8.3f %8s %8s",
+                total['stage'], total['symbol'] or '-', total['calls'], total['wall_s'], total['cpu_s'], rss, rows
+            )
+
+
+def get_profiler() -> Optional[Profiler]:
+    return _active
+
+
+@contextmanager
+def profiling(profiler: Optional[Profiler] = None) -> Iterator[Profiler]:
+    global _active
+    
+    previous = _active
+    _active = profiler or Profiler()
+    try:
+        yield _active
+    finally:
+        _active = previous
+
+
+@contextmanager
+def profile_symbol(symbol: Optional[str]) -> Iterator[None]:
+    token = _symbol.set(symbol.upper() if symbol else None)
+    try:
+        yield
+    finally:
+        _symbol.reset(token)
+
+
+def profiled(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            # Costs a single global lookup while profiling is off
+            profiler = _active
+            if profiler is None:
+                return fn(*args, **kwargs)
+            
+            # Row count of the first frame argument, replaced by the
+            # result's when the stage returns a frame
+            rows = next((n for n in map(count_rows, list(args) + list(kwargs.values())) if n is not None), None)
+            
+            with profiler.stage(name, rows=rows) as record:
+                result = fn(*args, **kwargs)
+                result_rows = count_rows(result)
+                record['rows'] = result_rows if result_rows is not None else rows
+                return result
+        
+        return wrapper
+    
+    return decorator
@@ -1,3 +1,13 @@
-from .plotter import ForecastPlotter, plot_forecast_simple
+from typing import TYPE_CHECKING
+
+from src.utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .plotter import ForecastPlotter, plot_forecast_simple
 
 __all__ = ['ForecastPlotter', 'plot_forecast_simple']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'ForecastPlotter': '.plotter',
+    'plot_forecast_simple': '.plotter',
+})
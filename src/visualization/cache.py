@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from src.utils import frame_fingerprint
+from src.utils.metrics import cache_result
+
+
+# Stores between two scans of the cache directory for pruning
+PRUNE_EVERY = 64
+
+# Suffix of the empty marker whose mtime records a chart's last use
+USED_SUFFIX = '.used'
+
+
+class PlotCache:
+    def __init__(self, directory: str = './outputs/.plot_cache', max_age: Optional[float] = 7 * 86400, max_bytes: Optional[int] = 512 * 1024 ** 2):
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._stores = 0
+        
+        # Create cache directory if it doesn't exist
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prune()
+    
+    def key(self, frames: list[Optional[pd.DataFrame]], params: Dict[str, Any]) -> str:
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+        
+        for frame in frames:
+            digest.update(b'|' + (frame_fingerprint(frame).encode('utf-8') if frame is not None else b'none'))
+        
+        return digest.hexdigest()
+    
+    def path(self, key: str, fmt: str) -> Path:
+        return self.directory / f'{key}.{fmt}'
+    
+    def lookup(self, key: str, fmt: str) -> Optional[Path]:
+        path = self.path(key, fmt)
+        hit = path.exists()
+        cache_result('plot', hit)
+        if not hit:
+            return None
+        
+        # Hits count as use, so pruning drops the least recently used charts.
+        # The chart itself may be hard-linked to a published file whose
+        # mtime the pipeline checks, so its use is recorded on a marker.
+        self._used(path).touch()
+        return path if path.exists() else None
+    
+    def _used(self, path: Path) -> Path:
+        return path.with_name(path.name + USED_SUFFIX)
+    
+    def store(self, key: str, fig: Figure, fmt: str, dpi: int) -> Path:
+        path = self.path(key, fmt)
+        
+        # Write to a temporary name so readers never see a partial file
+        tmp_path = path.with_name(f'{path.name}.{uuid.uuid4().hex}.tmp')
+        fig.savefig(tmp_path, dpi=dpi, format=fmt, bbox_inches='tight')
+        os.replace(tmp_path, path)
+        
+        self._stores += 1
+        if self._stores % PRUNE_EVERY == 0:
+            self.prune()
+        return path
+    
+    def prune(self) -> int:
+        # Keys include the data and often the date, so stale charts are never
+        # looked up again: drop those unused for max_age, then the least
+        # recently used until the cache fits in max_bytes. Published charts
+        # are separate links or copies and are not affected.
+        now = time.time()
+        stats = {}
+        for path in self.directory.iterdir():
+            try:
+                stats[path] = path.stat()
+            except FileNotFoundError:
+                continue
+        
+        entries = []
+        for path, stat in stats.items():
+            # Another process may still be writing a recent temporary file
+            if path.suffix == '.tmp' and now - stat.st_mtime < 3600:
+                continue
+            if path.suffix == USED_SUFFIX:
+                # Markers go with their chart; orphans are dropped right away
+                if path.with_suffix('') not in stats:
+                    path.unlink(missing_ok=True)
+                continue
+            if path.is_file():
+                used = stats.get(self._used(path))
+                last_use = max(stat.st_mtime, used.st_mtime) if used is not None else stat.st_mtime
+                entries.append((last_use, stat.st_size, path))
+        entries.sort()
+        
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            expired = self.max_age is not None and now - mtime > self.max_age
+            oversized = self.max_bytes is not None and total > self.max_bytes
+            if not (expired or oversized):
+                break
+            path.unlink(missing_ok=True)
+            self._used(path).unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        
+        return removed
+    
+    def publish(self, cached: Path, target: Path) -> None:
+        if target.exists():
+            if os.path.samefile(cached, target):
+                return
+            target.unlink()
+        
+        # Hard links make publishing free, fall back to a copy across devices
+        try:
+            os.link(cached, target)
+        except OSError:
+            shutil.copyfile(cached, target)
@@ -1,132 +1,248 @@
 # pyright: reportArgumentType=false
 # pyright: reportGeneralTypeIssues=false
 
+import logging
 import pandas as pd
 import numpy as np
+import multiprocessing
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-from matplotlib.axes import Axes
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.lines import Line2D
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from .cache import PlotCache
+from .template import ForecastFigureTemplate
+from src.utils.profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+FORECAST_COLUMNS = ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
+MAX_LEGEND_ENTRIES = 20
+
+
+def minmax_indices(values: np.ndarray, n_buckets: int) -> np.ndarray:
+    n = len(values)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    
+    # Sort by (bucket, value): the first and last entry of each bucket are
+    # its minimum and maximum, which keeps every visible extreme
+    buckets = (np.arange(n) * n_buckets) // n
+    order = np.lexsort((values, buckets))
+    bucket_ends = np.flatnonzero(np.diff(buckets[order])) + 1
+    firsts = order[np.concatenate(([0], bucket_ends))]
+    lasts = order[np.concatenate((bucket_ends - 1, [n - 1]))]
+    
+    return np.unique(np.concatenate((firsts, lasts, [0, n - 1])))
+
+
+def downsample_frame(df: pd.DataFrame, columns: list[str], max_points: Optional[int]) -> pd.DataFrame:
+    if max_points is None or len(df) <= max_points:
+        return df
+    
+    # Rows are shared by all columns so bands can still be filled between them.
+    # Each column keeps two rows per bucket plus the shared first and last
+    # row, so the buckets are split between columns to keep the union within
+    # max_points (at least one bucket each, for tiny caps)
+    n_buckets = max((max_points - 2) // (2 * len(columns)), 1)
+    indices = np.unique(np.concatenate([
+        minmax_indices(np.asarray(df[col].values, dtype=float), n_buckets)
+        for col in columns
+    ]))
+    
+    return df.iloc[indices]
+
+
+def align_series(forecasts: Dict[str, pd.DataFrame], symbols: list[str], column: str = 'yhat') -> pd.DataFrame:
+    # One column per symbol on a shared date index
+    series = {
+        symbol: forecasts[symbol].set_index('ds')[column]
+        for symbol in symbols if symbol in forecasts
+    }
+    if not series:
+        return pd.DataFrame()
+    return pd.concat(series, axis=1).sort_index()
+
+
+def normalize_series(wide: pd.DataFrame, base_date: Optional[str] = None) -> pd.DataFrame:
+    if wide.empty:
+        return wide
+    
+    # Each series is rebased to its first value on or after the base date
+    start = wide.loc[pd.Timestamp(base_date):] if base_date else wide
+    if start.empty:
+        raise ValueError(f"No data on or after base date {pd.Timestamp(base_date):%Y-%m-%d} (last date is {wide.index[-1]:%Y-%m-%d})")
+    base = start.bfill().iloc[0]
+    
+    return wide.div(base, axis=1) * 100
+
+
+def _downsample_history(history: Optional[pd.DataFrame], max_points: Optional[int]) -> Optional[pd.DataFrame]:
+    if history is None:
+        return None
+    return downsample_frame(history[['ds', 'y']], ['y'], max_points)
+
+
+# One plotter per spawned worker process, so its figure templates survive
+# across tasks; the parent renders with its own plotter and never fills this
+_worker_plotters: Dict[tuple, 'ForecastPlotter'] = {}
+
+
+def _render_forecast_task(task: tuple) -> str:
+    output_dir, figsize, max_points, cache_dir, symbol, history, forecast, show_annotations, dpi, fmt = task
+    
+    settings = (output_dir, tuple(figsize), max_points, cache_dir, dpi)
+    plotter = _worker_plotters.get(settings)
+    if plotter is None:
+        plotter = ForecastPlotter(output_dir=output_dir, figsize=figsize, dpi=dpi, max_points=max_points, cache_dir=cache_dir)
+        _worker_plotters[settings] = plotter
+    
+    return plotter._render_forecast(history, forecast, symbol, show_annotations, dpi, fmt)
 
 
 class ForecastPlotter:
-    def __init__(self, output_dir: str = './outputs', figsize: tuple[int, int] = (16, 8), dpi: int = 300):
+    def __init__(self, output_dir: str = './outputs', figsize: tuple[int, int] = (16, 8), dpi: int = 300, max_points: Optional[int] = None, cache_dir: Optional[str] = None):
         self.output_dir = Path(output_dir)
         self.figsize = figsize
         self.dpi = dpi
         
+        # Never draw more points than the figure has horizontal pixels
+        self.max_points = max_points or int(figsize[0] * dpi)
+        
+        # Unchanged charts are served from the cache instead of re-rendered
+        self.cache = PlotCache(cache_dir) if cache_dir else None
+        
+        # Figure templates are reused across symbols, keyed by show_annotations
+        self._templates: Dict[bool, ForecastFigureTemplate] = {}
+        
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
+    @profiled('plot.forecast')
     def plot_forecast(self, model: Any, forecast: pd.DataFrame, symbol: str, show_annotations: bool = True) -> str:
-        print("📊 Creating forecast plot...")
-        
-        fig, ax = plt.subplots(figsize=self.figsize)
-        
-        # Plot historical data (black dots)
-        if hasattr(model, 'history') and model.history is not None:
-            history = model.history
-            ax.plot(
-                history['ds'], 
-                history['y'], 
-                'k.', 
-                label='Historical Data', 
-                markersize=3, 
-                alpha=0.5
-            )
-        
-        # Plot FORECAST (blue line)
-        ax.plot(
-            forecast['ds'], 
-            forecast['yhat'], 
-            'b-', 
-            linewidth=2.5, 
-            label='Forecast (Expected)', 
-            alpha=0.9
-        )
+        logger.info("📊 Creating forecast plot...")
         
-        # Plot UPPER LIMIT (green dashed line)
-        ax.plot(
-            forecast['ds'], 
-            forecast['yhat_upper'], 
-            'g--', 
-            linewidth=2, 
-            label='Optimistic Scenario (95%)', 
-            alpha=0.8
-        )
+        history = model.history if hasattr(model, 'history') else None
+        history, forecast = self._prepare_forecast(history, forecast)
+        plot_path = self._render_forecast(history, forecast, symbol, show_annotations, self.dpi, 'png')
+        logger.info("✅ Forecast plot saved: %s", plot_path)
         
-        # Plot LOWER LIMIT (red dashed line)
-        ax.plot(
-            forecast['ds'], 
-            forecast['yhat_lower'], 
-            'r--', 
-            linewidth=2, 
-            label='Pessimistic Scenario (95%)', 
-            alpha=0.8
-        )
+        return plot_path
+    
+    @profiled('plot.forecast_batch')
+    def plot_forecast_batch(
+        self,
+        forecasts: Dict[str, pd.DataFrame],
+        histories: Optional[Dict[str, pd.DataFrame]] = None,
+        dpi: Optional[int] = None,
+        fmt: str = 'png',
+        workers: Optional[int] = None,
+        show_annotations: bool = True
+    ) -> Dict[str, str]:
+        logger.info("📊 Rendering %d forecast plots...", len(forecasts))
+        
+        histories = histories or {}
+        dpi = dpi or self.dpi
+        
+        paths: Dict[str, str] = {}
+        tasks = []
+        
+        for symbol, forecast in forecasts.items():
+            # Downsample before sending frames to the workers
+            history, forecast = self._prepare_forecast(histories.get(symbol), forecast)
+            
+            if self.cache is not None:
+                key = self._cache_key(history, forecast, symbol, show_annotations, dpi, fmt)
+                cached = self._publish_cached(key, symbol, fmt)
+                if cached is not None:
+                    paths[symbol] = cached
+                    continue
+            
+            tasks.append((
+                str(self.output_dir), self.figsize, self.max_points,
+                str(self.cache.directory) if self.cache else None,
+                symbol, history, forecast, show_annotations, dpi, fmt
+            ))
+        
+        if workers == 1 or len(tasks) <= 1:
+            rendered = [self._render_forecast(history, forecast, symbol, annotate, dpi, fmt) for *_, symbol, history, forecast, annotate, dpi, fmt in tasks]
+        else:
+            # Spawned workers don't inherit locks held by the parent's threads
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                rendered = list(executor.map(_render_forecast_task, tasks, chunksize=max(len(tasks) // 32, 1)))
         
-        # Fill confidence interval
-        # Convert to numpy arrays for matplotlib compatibility
-        x_data = np.array(forecast['ds'].values, dtype='datetime64[ns]')
-        y1_data = np.array(forecast['yhat_lower'].values, dtype=float)
-        y2_data = np.array(forecast['yhat_upper'].values, dtype=float)
-        
-        ax.fill_between(  # type: ignore
-            x_data, 
-            y1_data, 
-            y2_data,
-            alpha=0.15, 
-            color='gray', 
-            label='95% Confidence Interval'
-        )
+        paths.update(zip((task[4] for task in tasks), rendered))
+        paths = {symbol: paths[symbol] for symbol in forecasts}
         
-        # Add vertical line for "today"
-        
-        today = pd.Timestamp.now()
-        today_num = mdates.date2num(today.to_pydatetime())
-        ax.axvline(
-            x=today_num, 
-            color='orange', 
-            linestyle=':', 
-            linewidth=2.5, 
-            label=f'Today ({today.strftime("%Y-%m-%d")})', 
-            alpha=0.8
+        logger.info("✅ Rendered %d forecast plots to: %s", len(paths), self.output_dir)
+        
+        return paths
+    
+    def _prepare_forecast(self, history: Optional[pd.DataFrame], forecast: pd.DataFrame) -> tuple[Optional[pd.DataFrame], pd.DataFrame]:
+        return (
+            _downsample_history(history, self.max_points),
+            downsample_frame(forecast[FORECAST_COLUMNS], FORECAST_COLUMNS[1:], self.max_points)
         )
+    
+    def _cache_key(self, history: Optional[pd.DataFrame], forecast: pd.DataFrame, symbol: str, show_annotations: bool, dpi: int, fmt: str) -> str:
+        params = {
+            'renderer': 'forecast',
+            'symbol': symbol,
+            'figsize': list(self.figsize),
+            'dpi': dpi,
+            'fmt': fmt,
+            'show_annotations': show_annotations,
+            # The chart marks today's date
+            'today': pd.Timestamp.now().strftime('%Y-%m-%d'),
+        }
+        return self.cache.key([history, forecast], params)
+    
+    def _publish_cached(self, key: Optional[str], symbol: str, fmt: str) -> Optional[str]:
+        if self.cache is None or key is None:
+            return None
         
-        # Add annotations if requested
-        if show_annotations:
-            self._add_value_annotations(ax, forecast, model)
+        cached = self.cache.lookup(key, fmt)
+        if cached is None:
+            return None
         
-        # Styling
-        ax.set_title(
-            f'Price Forecast - {symbol}\nProphet Model with Confidence Intervals', 
-            fontsize=16, 
-            fontweight='bold', 
-            pad=20
-        )
-        ax.set_xlabel('Date', fontsize=13, fontweight='bold')
-        ax.set_ylabel('Price (USD)', fontsize=13, fontweight='bold')
-        ax.legend(loc='upper left', fontsize=10, framealpha=0.9)
-        ax.grid(True, alpha=0.3, linestyle='--')
+        plot_path = self.output_dir / f'forecast_{symbol}.{fmt}'
+        self.cache.publish(cached, plot_path)
+        return str(plot_path)
+    
+    def _render_forecast(self, history: Optional[pd.DataFrame], forecast: pd.DataFrame, symbol: str, show_annotations: bool, dpi: int, fmt: str) -> str:
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(history, forecast, symbol, show_annotations, dpi, fmt)
+            cached = self._publish_cached(key, symbol, fmt)
+            if cached is not None:
+                return cached
         
-        # Format dates
-        fig.autofmt_xdate()
+        template = self._templates.get(show_annotations)
+        if template is None:
+            template = ForecastFigureTemplate(self.figsize, show_annotations=show_annotations)
+            self._templates[show_annotations] = template
         
-        plt.tight_layout()
+        fig = template.update(history, forecast, symbol)
         
         # Save plot
-        plot_path = self.output_dir / f'forecast_{symbol}.png'
-        plt.savefig(plot_path, dpi=self.dpi, bbox_inches='tight')
-        print(f"✅ Forecast plot saved: {plot_path}")
-        plt.close()
+        plot_path = self.output_dir / f'forecast_{symbol}.{fmt}'
+        if self.cache is not None and key is not None:
+            self.cache.publish(self.cache.store(key, fig, fmt, dpi), plot_path)
+        else:
+            fig.savefig(plot_path, dpi=dpi, format=fmt, bbox_inches='tight')
         
         return str(plot_path)
     
+    @profiled('plot.components')
     def plot_components(self, model: Any, forecast: pd.DataFrame, symbol: str) -> str:
-        print("📊 Creating components plot...")
+        logger.info("📊 Creating components plot...")
         
         # Access the underlying Prophet model
         if hasattr(model, 'model') and model.model is not None:
@@ -142,121 +258,116 @@ class ForecastPlotter:
         # Save plot
         plot_path = self.output_dir / f'forecast_components_{symbol}.png'
         plt.savefig(plot_path, dpi=self.dpi, bbox_inches='tight')
-        print(f"✅ Components plot saved: {plot_path}")
+        logger.info("✅ Components plot saved: %s", plot_path)
         plt.close()
         
         return str(plot_path)
     
-    def _add_value_annotations(self, ax: Axes, forecast: pd.DataFrame, model: Any) -> None:
-        # Get last forecast (1 year in future)
-        last_idx = len(forecast) - 1
-        last_date = forecast['ds'].iloc[last_idx]
-        
-        expected_value = forecast['yhat'].iloc[last_idx]
-        optimistic_value = forecast['yhat_upper'].iloc[last_idx]
-        pessimistic_value = forecast['yhat_lower'].iloc[last_idx]
-        
-        # Annotation for OPTIMISTIC (green, at top)
-        ax.annotate(
-            f'Optimistic: ${optimistic_value:.2f}',
-            xy=(last_date, optimistic_value),
-            xytext=(10, 10), 
-            textcoords='offset points',
-            fontsize=11, 
-            fontweight='bold', 
-            color='darkgreen',
-            bbox=dict(boxstyle='round,pad=0.5', facecolor='lightgreen', alpha=0.8),
-            arrowprops=dict(arrowstyle='->', color='green', lw=2)
-        )
+    @profiled('plot.comparison')
+    def create_comparison_plot(
+        self,
+        forecasts: Dict[str, pd.DataFrame],
+        symbols: list[str],
+        title: str = "Stock Comparison",
+        base_date: Optional[str] = None,
+        normalize: bool = True,
+        small_multiples: bool = False,
+        column: str = 'yhat'
+    ) -> str:
+        logger.info("📊 Creating comparison plot for %d stocks...", len(symbols))
+        
+        wide = align_series(forecasts, symbols, column)
+        if normalize:
+            wide = normalize_series(wide, base_date)
+        
+        if small_multiples:
+            fig = self._comparison_grid(wide, title, normalize)
+            plot_path = self.output_dir / 'comparison_grid.png'
+        else:
+            fig = self._comparison_lines(wide, title, normalize)
+            plot_path = self.output_dir / 'comparison.png'
         
-        # Annotation for EXPECTED (blue, middle)
-        ax.annotate(
-            f'Expected: ${expected_value:.2f}',
-            xy=(last_date, expected_value),
-            xytext=(10, -5), 
-            textcoords='offset points',
-            fontsize=11, 
-            fontweight='bold', 
-            color='darkblue',
-            bbox=dict(boxstyle='round,pad=0.5', facecolor='lightblue', alpha=0.8),
-            arrowprops=dict(arrowstyle='->', color='blue', lw=2)
-        )
+        # Save plot
+        fig.savefig(plot_path, dpi=self.dpi, bbox_inches='tight')
+        logger.info("✅ Comparison plot saved: %s", plot_path)
         
-        # Annotation for PESSIMISTIC (red, bottom)
-        ax.annotate(
-            f'Pessimistic: ${pessimistic_value:.2f}',
-            xy=(last_date, pessimistic_value),
-            xytext=(10, -20), 
-            textcoords='offset points',
-            fontsize=11, 
-            fontweight='bold', 
-            color='darkred',
-            bbox=dict(boxstyle='round,pad=0.5', facecolor='lightcoral', alpha=0.8),
-            arrowprops=dict(arrowstyle='->', color='red', lw=2)
-        )
+        return str(plot_path)
+    
+    def _comparison_segments(self, wide: pd.DataFrame, max_points: int) -> list[np.ndarray]:
+        x = mdates.date2num(wide.index.to_numpy())
+        segments = []
         
-        # Add summary text box - À DIREITA da legenda
-        if hasattr(model, 'history') and model.history is not None:
-            current_value = model.history['y'].iloc[-1]
-            variation = ((expected_value - current_value) / current_value) * 100
-            
-            summary_text = (
-                f'1 YEAR FORECAST (365 days)\n'
-                f'━━━━━━━━━━━━━━━━━━━━━━\n'
-                f'Current Value: ${current_value:.2f}\n'
-                f'Expected: ${expected_value:.2f} ({variation:+.1f}%)\n'
-                f'Optimistic: ${optimistic_value:.2f}\n'
-                f'Pessimistic: ${pessimistic_value:.2f}\n'
-                f'Range: ${optimistic_value - pessimistic_value:.2f}'
-            )
-            
-            # Posição: canto superior DIREITO (ao lado da legenda)
-            ax.text(
-                0.27, 0.98,
-                summary_text,
-                transform=ax.transAxes,
-                fontsize=10,
-                verticalalignment='top',
-                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.9),
-                family='monospace'
-            )
+        for values in wide.to_numpy(dtype=float).T:
+            valid = np.flatnonzero(~np.isnan(values))
+            keep = valid[minmax_indices(values[valid], max(max_points // 2, 1))]
+            segments.append(np.column_stack((x[keep], values[keep])))
+        
+        return segments
     
-    def create_comparison_plot(self, forecasts: Dict[str, pd.DataFrame], symbols: list[str], title: str = "Stock Comparison") -> str:
-        print(f"📊 Creating comparison plot for {len(symbols)} stocks...")
-        
-        fig, ax = plt.subplots(figsize=self.figsize)
-        
-        colors = ['blue', 'green', 'red', 'purple', 'orange', 'brown']
-        
-        for i, symbol in enumerate(symbols):
-            if symbol in forecasts:
-                forecast = forecasts[symbol]
-                color = colors[i % len(colors)]
-                
-                ax.plot(
-                    forecast['ds'],
-                    forecast['yhat'],
-                    label=symbol,
-                    color=color,
-                    linewidth=2
-                )
+    def _comparison_lines(self, wide: pd.DataFrame, title: str, normalize: bool) -> Figure:
+        fig = Figure(figsize=self.figsize)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        
+        # Hundreds of series are drawn as a single artist
+        colors = matplotlib.colormaps['tab10' if wide.shape[1] <= 10 else 'turbo'](np.linspace(0, 1, max(wide.shape[1], 1)))
+        lines = LineCollection(
+            self._comparison_segments(wide, self.max_points),
+            colors=colors,
+            linewidths=2 if wide.shape[1] <= 10 else 0.8,
+            alpha=0.9 if wide.shape[1] <= 10 else 0.6
+        )
+        ax.add_collection(lines)
+        ax.autoscale_view()
+        
+        # A legend only helps while it stays readable
+        if wide.shape[1] <= MAX_LEGEND_ENTRIES:
+            handles = [Line2D([], [], color=color, linewidth=2) for color in colors]
+            ax.legend(handles, list(wide.columns), loc='best', fontsize=10)
+        
+        if normalize:
+            ax.axhline(100, color='gray', linestyle=':', linewidth=1)
         
         ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
         ax.set_xlabel('Date', fontsize=13, fontweight='bold')
-        ax.set_ylabel('Normalized Price', fontsize=13, fontweight='bold')
-        ax.legend(loc='best', fontsize=10)
+        ax.set_ylabel('Normalized Price (base = 100)' if normalize else 'Price (USD)', fontsize=13, fontweight='bold')
         ax.grid(True, alpha=0.3, linestyle='--')
+        ax.xaxis_date()
         
         fig.autofmt_xdate()
-        plt.tight_layout()
+        fig.tight_layout()
         
-        # Save plot
-        plot_path = self.output_dir / 'comparison.png'
-        plt.savefig(plot_path, dpi=self.dpi, bbox_inches='tight')
-        print(f"✅ Comparison plot saved: {plot_path}")
-        plt.close()
+        return fig
+    
+    def _comparison_grid(self, wide: pd.DataFrame, title: str, normalize: bool) -> Figure:
+        n = max(wide.shape[1], 1)
+        ncols = int(np.ceil(np.sqrt(n)))
+        nrows = int(np.ceil(n / ncols))
+        
+        fig = Figure(figsize=(self.figsize[0], self.figsize[0] * nrows / ncols))
+        FigureCanvasAgg(fig)
+        axes = np.atleast_1d(fig.subplots(nrows, ncols, sharex=True, sharey=normalize)).ravel()
+        
+        # Each panel only gets a fraction of the figure width
+        segments = self._comparison_segments(wide, max(self.max_points // ncols, 2))
+        
+        for ax, symbol, segment in zip(axes, wide.columns, segments):
+            ax.plot(segment[:, 0], segment[:, 1], color='blue', linewidth=1)
+            ax.set_title(symbol, fontsize=9, fontweight='bold')
+            ax.grid(True, alpha=0.3, linestyle='--')
+            ax.tick_params(labelsize=7)
+            ax.xaxis_date()
+            if normalize:
+                ax.axhline(100, color='gray', linestyle=':', linewidth=0.8)
+        
+        for ax in axes[n:]:
+            ax.set_visible(False)
+        
+        fig.suptitle(title, fontsize=16, fontweight='bold')
+        fig.autofmt_xdate()
+        fig.tight_layout()
         
-        return str(plot_path)
+        return fig
 
 
 def plot_forecast_simple(model: Any, forecast: pd.DataFrame, symbol: str, output_dir: str = './outputs') -> tuple[str, str]:
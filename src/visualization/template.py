@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from typing import Optional
+
+
+def _date_numbers(dates: pd.Series) -> np.ndarray:
+    return mdates.date2num(pd.to_datetime(dates).to_numpy())
+
+
+class ForecastFigureTemplate:
+    # Static artists (axes styling, legend, annotation boxes, date axis) are
+    # built once; update() only swaps data and text for the next symbol
+    def __init__(self, figsize: tuple[int, int] = (16, 8), show_annotations: bool = True, show_summary: bool = True):
+        self.show_annotations = show_annotations
+        self.show_summary = show_summary
+        
+        # Object-oriented figure, no pyplot global state, safe in workers
+        self.fig = Figure(figsize=figsize)
+        FigureCanvasAgg(self.fig)
+        ax = self.ax = self.fig.add_subplot()
+        
+        # Plot historical data (black dots)
+        self.history_line, = ax.plot(
+            [], [],
+            'k.',
+            label='Historical Data',
+            markersize=3,
+            alpha=0.5
+        )
+        
+        # Plot FORECAST (blue line)
+        self.expected_line, = ax.plot(
+            [], [],
+            'b-',
+            linewidth=2.5,
+            label='Forecast (Expected)',
+            alpha=0.9
+        )
+        
+        # Plot UPPER LIMIT (green dashed line)
+        self.upper_line, = ax.plot(
+            [], [],
+            'g--',
+            linewidth=2,
+            label='Optimistic Scenario (95%)',
+            alpha=0.8
+        )
+        
+        # Plot LOWER LIMIT (red dashed line)
+        self.lower_line, = ax.plot(
+            [], [],
+            'r--',
+            linewidth=2,
+            label='Pessimistic Scenario (95%)',
+            alpha=0.8
+        )
+        
+        # Fill confidence interval (polygon is replaced per symbol)
+        self.band = ax.fill_between(
+            [0.0, 1.0],
+            [0.0, 0.0],
+            [0.0, 0.0],
+            alpha=0.15,
+            color='gray',
+            label='95% Confidence Interval'
+        )
+        
+        # Add vertical line for "today"
+        self.today_line = ax.axvline(
+            x=0.0,
+            color='orange',
+            linestyle=':',
+            linewidth=2.5,
+            label='Today',
+            alpha=0.8
+        )
+        
+        # Annotations for OPTIMISTIC (green, top), EXPECTED (blue, middle)
+        # and PESSIMISTIC (red, bottom)
+        self.annotations = {
+            'yhat_upper': self._annotation((10, 10), 'darkgreen', 'lightgreen', 'green'),
+            'yhat': self._annotation((10, -5), 'darkblue', 'lightblue', 'blue'),
+            'yhat_lower': self._annotation((10, -20), 'darkred', 'lightcoral', 'red'),
+        }
+        
+        # Summary text box - À DIREITA da legenda
+        self.summary = ax.text(
+            0.27, 0.98,
+            '',
+            transform=ax.transAxes,
+            fontsize=10,
+            verticalalignment='top',
+            bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.9),
+            family='monospace',
+            visible=False
+        )
+        
+        # Styling
+        self.title = ax.set_title(
+            '',
+            fontsize=16,
+            fontweight='bold',
+            pad=20
+        )
+        ax.set_xlabel('Date', fontsize=13, fontweight='bold')
+        ax.set_ylabel('Price (USD)', fontsize=13, fontweight='bold')
+        self.legend = ax.legend(loc='upper left', fontsize=10, framealpha=0.9)
+        ax.grid(True, alpha=0.3, linestyle='--')
+        
+        # Format dates
+        locator = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.AutoDateFormatter(locator))
+        ax.tick_params(axis='x', labelrotation=30)
+        
+        self.fig.tight_layout()
+    
+    def _annotation(self, offset: tuple[int, int], color: str, facecolor: str, arrow_color: str):
+        return self.ax.annotate(
+            '',
+            xy=(0.0, 0.0),
+            xytext=offset,
+            textcoords='offset points',
+            fontsize=11,
+            fontweight='bold',
+            color=color,
+            bbox=dict(boxstyle='round,pad=0.5', facecolor=facecolor, alpha=0.8),
+            arrowprops=dict(arrowstyle='->', color=arrow_color, lw=2),
+            visible=False
+        )
+    
+    def update(self, history: Optional[pd.DataFrame], forecast: pd.DataFrame, symbol: str) -> Figure:
+        x = _date_numbers(forecast['ds'])
+        expected = np.asarray(forecast['yhat'].values, dtype=float)
+        upper = np.asarray(forecast['yhat_upper'].values, dtype=float)
+        lower = np.asarray(forecast['yhat_lower'].values, dtype=float)
+        
+        if history is not None:
+            self.history_line.set_data(_date_numbers(history['ds']), np.asarray(history['y'].values, dtype=float))
+        else:
+            self.history_line.set_data([], [])
+        self.history_line.set_visible(history is not None)
+        
+        self.expected_line.set_data(x, expected)
+        self.upper_line.set_data(x, upper)
+        self.lower_line.set_data(x, lower)
+        
+        self.band.set_data(x, lower, upper)
+        
+        today = pd.Timestamp.now()
+        today_num = float(mdates.date2num(today.to_pydatetime()))
+        self.today_line.set_xdata([today_num, today_num])
+        self.legend.get_texts()[-1].set_text(f'Today ({today.strftime("%Y-%m-%d")})')
+        
+        self.title.set_text(f'Price Forecast - {symbol}\nProphet Model with Confidence Intervals')
+        
+        self._update_annotations(history, forecast, x[-1])
+        
+        # Rescale to the new data
+        self.ax.relim()
+        self.ax.autoscale_view()
+        
+        return self.fig
+    
+    def _update_annotations(self, history: Optional[pd.DataFrame], forecast: pd.DataFrame, last_x: float) -> None:
+        labels = {'yhat_upper': 'Optimistic', 'yhat': 'Expected', 'yhat_lower': 'Pessimistic'}
+        values = {column: float(forecast[column].iloc[-1]) for column in labels}
+        
+        for column, annotation in self.annotations.items():
+            annotation.xy = (last_x, values[column])
+            annotation.set_text(f'{labels[column]}: ${values[column]:.2f}')
+            annotation.set_visible(self.show_annotations)
+        
+        show_summary = self.show_annotations and self.show_summary and history is not None
+        self.summary.set_visible(show_summary)
+        
+        if show_summary:
+            current_value = float(history['y'].iloc[-1])
+            expected_value = values['yhat']
+            optimistic_value = values['yhat_upper']
+            pessimistic_value = values['yhat_lower']
+            variation = ((expected_value - current_value) / current_value) * 100
+            
+            self.summary.set_text(
+                f'1 YEAR FORECAST (365 days)\n'
+                f'━━━━━━━━━━━━━━━━━━━━━━\n'
+                f'Current Value: ${current_value:.2f}\n'
+                f'Expected: ${expected_value:.2f} ({variation:+.1f}%)\n'
+                f'Optimistic: ${optimistic_value:.2f}\n'
+                f'Pessimistic: ${pessimistic_value:.2f}\n'
+                f'Range: ${optimistic_value - pessimistic_value:.2f}'
+            )
+    
+    def save(self, path: str, dpi: int, fmt: str = 'png') -> str:
+        self.fig.savefig(path, dpi=dpi, format=fmt, bbox_inches='tight')
+        return path
@@ -32,3 +32,16 @@ def sample_forecast():
         'yhat_lower': 95 + pd.Series(range(len(dates))) * 0.1,
         'yhat_upper': 105 + pd.Series(range(len(dates))) * 0.1
     })
+
+@pytest.fixture(scope='session')
+def trained_model():
+    from src.models import ForecastModel
+    
+    dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='D')
+    data = pd.DataFrame({
+        'ds': dates,
+        'y': 100 + pd.Series(range(len(dates))) * 0.1
+    })
+    model = ForecastModel(config={'yearly_seasonality': False})
+    model.train(data)
+    return model
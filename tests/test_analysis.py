@@ -92,6 +92,18 @@ def test_generate_scenarios_with_target_date(sample_forecast):
     assert 'expected' in scenarios
     assert 'price' in scenarios['expected']
 
+@pytest.mark.parametrize("interval_width,tail,upper,lower", [
+    (0.8, 0.1, '90th', '10th'),
+    (0.95, 0.025, '97.5th', '2.5th'),
+])
+def test_generate_scenarios_follow_interval_width(sample_forecast, interval_width, tail, upper, lower):
+    scenarios = ForecastAnalyzer(interval_width).generate_scenarios(sample_forecast)
+    
+    assert scenarios['optimistic']['probability'] == tail
+    assert scenarios['pessimistic']['probability'] == tail
+    assert upper in scenarios['optimistic']['description']
+    assert lower in scenarios['pessimistic']['description']
+
 def test_export_to_csv(sample_forecast, tmp_path):
     analyzer = ForecastAnalyzer()
     
@@ -0,0 +1,193 @@
+import pytest
+import pandas as pd
+import yaml
+from src.models import ForecastModel, ModelRegistry
+from src.pipeline import BatchRunner, CheckpointManifest, read_symbols
+from src.utils import load_config
+
+
+def fake_fetch(symbol, start, end):
+    if symbol == 'BAD':
+        raise ValueError(f"No data returned for {symbol}")
+    
+    dates = pd.date_range(start='2024-01-01', end='2024-06-30', freq='D')
+    data = pd.DataFrame({
+        'Date': dates,
+        'Close': 100 + pd.Series(range(len(dates))) * 0.1
+    })
+    return data.set_index('Date')
+
+
+@pytest.fixture
+def batch_config(tmp_path):
+    config = {
+        'stock': {'symbol': 'AAPL', 'start': '2024-01-01', 'end': '2024-06-30'},
+        'forecast': {'days': 10},
+        'model': {'yearly_seasonality': False, 'weekly_seasonality': False},
+        'output': {'directory': str(tmp_path / 'outputs'), 'save_csv': True},
+        'registry': {'enabled': True, 'directory': str(tmp_path / 'models')},
+        'batch': {'workers': 1, 'checkpoint_dir': str(tmp_path / 'batch')}
+    }
+    path = tmp_path / 'config.yaml'
+    path.write_text(yaml.safe_dump(config), encoding='utf-8')
+    return load_config(str(path))
+
+
+def test_read_symbols(tmp_path):
+    path = tmp_path / 'symbols.txt'
+    path.write_text('aapl\n\n# tech\nMSFT  # comment\nAAPL\n', encoding='utf-8')
+    
+    assert read_symbols(str(path)) == ['AAPL', 'MSFT']
+
+
+def test_read_symbols_empty(tmp_path):
+    path = tmp_path / 'symbols.txt'
+    path.write_text('# nothing\n', encoding='utf-8')
+    
+    with pytest.raises(ValueError):
+        read_symbols(str(path))
+
+
+def test_manifest_roundtrip(tmp_path):
+    manifest = CheckpointManifest(str(tmp_path))
+    params = {'days': 10}
+    manifest.write('aapl', {'params': params, 'status': 'running', 'stage': 'train'})
+    
+    assert manifest.read('AAPL')['stage'] == 'train'
+    assert manifest.reached('AAPL', 'preprocess', params)
+    assert not manifest.reached('AAPL', 'predict', params)
+    assert not manifest.reached('AAPL', 'train', {'days': 20})
+    assert not manifest.is_done('AAPL', params)
+    assert list(manifest.states()) == ['AAPL']
+
+
+def test_batch_run_and_resume(batch_config, tmp_path, monkeypatch):
+    runner = BatchRunner(batch_config, fetch=fake_fetch, save_plots=False)
+    states = runner.run(['AAPL', 'BAD'])
+    
+    assert states['AAPL']['status'] == 'done'
+    assert states['AAPL']['stage'] == 'export'
+    assert states['BAD']['status'] == 'failed'
+    assert 'No data returned' in states['BAD']['error']
+    assert (tmp_path / 'outputs' / 'forecast_AAPL.csv').exists()
+    
+    summary = pd.read_csv(tmp_path / 'outputs' / 'batch_summary.csv')
+    assert list(summary['symbol']) == ['AAPL', 'BAD']
+    
+    # Completed symbols are skipped, failed ones are retried
+    retried = []
+    monkeypatch.setattr(runner, 'fetch', lambda symbol, start, end: retried.append(symbol) or fake_fetch(symbol, start, end))
+    states = runner.run(['AAPL', 'BAD'])
+    
+    assert retried == ['BAD']
+    assert states['AAPL']['status'] == 'done'
+
+
+def test_batch_progress_names_symbols(batch_config, caplog):
+    runner = BatchRunner(batch_config, fetch=fake_fetch, save_plots=False)
+    
+    with caplog.at_level('INFO', logger='src.pipeline.batch'):
+        states = runner.run(['AAPL', 'BAD'])
+    
+    assert {symbol: state['symbol'] for symbol, state in states.items()} == {'AAPL': 'AAPL', 'BAD': 'BAD'}
+    progress = [record.getMessage() for record in caplog.records if '/2]' in record.getMessage()]
+    assert any('AAPL: expected change' in message for message in progress)
+    assert any('BAD failed at' in message for message in progress)
+
+
+def test_batch_reuses_model_after_interruption(batch_config, monkeypatch):
+    runner = BatchRunner(batch_config, fetch=fake_fetch, save_plots=False)
+    runner.run(['AAPL'])
+    
+    # Simulate a run killed after training
+    state = runner.manifest.read('AAPL')
+    runner.manifest.write('AAPL', {**state, 'status': 'running', 'stage': 'train'})
+    
+    def fail(self, data):
+        raise AssertionError("model should not be refitted")
+    monkeypatch.setattr(ForecastModel, 'train', fail)
+    
+    states = runner.run(['AAPL'])
+    assert states['AAPL']['status'] == 'done'
+
+
+def test_batch_honors_ensemble_config(batch_config, tmp_path):
+    batch_config.config['ensemble'] = {'enabled': True, 'holdout': 20, 'members': [{'engine': 'trend'}]}
+    runner = BatchRunner(batch_config, fetch=fake_fetch, save_plots=False)
+    
+    states = runner.run(['AAPL'])
+    
+    assert states['AAPL']['status'] == 'done'
+    assert ModelRegistry(str(tmp_path / 'models')).meta('AAPL')['kind'] == 'ensemble'
+
+
+def test_batch_uses_visualization_settings(batch_config):
+    batch_config.config['visualization'] = {'figure_width': 10, 'figure_height': 5, 'show_annotations': False}
+    runner = BatchRunner(batch_config, fetch=fake_fetch)
+    
+    assert runner.settings['plot']['figsize'] == (10, 5)
+    assert runner.settings['plot']['show_annotations'] is False
+
+
+def test_batch_refits_model_from_other_window(batch_config, tmp_path, monkeypatch):
+    runner = BatchRunner(batch_config, fetch=fake_fetch, save_plots=False)
+    runner.run(['AAPL'])
+    
+    # Same settings, but fitted on a shorter history by another run
+    from src.data import prepare_for_prophet
+    shorter = ForecastModel(config=runner.params['model'])
+    shorter.train(prepare_for_prophet(fake_fetch('AAPL', None, None)).head(100))
+    ModelRegistry(str(tmp_path / 'models')).save('AAPL', shorter)
+    
+    state = runner.manifest.read('AAPL')
+    runner.manifest.write('AAPL', {**state, 'status': 'running', 'stage': 'train'})
+    
+    fitted = []
+    train = ForecastModel.train
+    monkeypatch.setattr(ForecastModel, 'train', lambda self, data: fitted.append(len(data)) or train(self, data))
+    
+    states = runner.run(['AAPL'])
+    assert states['AAPL']['status'] == 'done'
+    assert fitted == [182]
+    assert ModelRegistry(str(tmp_path / 'models')).meta('AAPL')['history_end'] == '2024-06-30'
+
+
+def test_batch_creates_one_plotter(batch_config, monkeypatch):
+    from src.pipeline import batch as batch_module
+    
+    class FakePlotter:
+        def plot_forecast(self, model, forecast, symbol, show_annotations=True):
+            return f'forecast_{symbol}.png'
+        
+        def plot_components(self, model, forecast, symbol):
+            return f'forecast_components_{symbol}.png'
+    
+    created = []
+    monkeypatch.setattr(batch_module, '_plotters', {})
+    monkeypatch.setattr(batch_module, 'create_plotter', lambda options: created.append(options) or FakePlotter())
+    
+    states = BatchRunner(batch_config, fetch=fake_fetch).run(['AAPL', 'MSFT'])
+    
+    assert len(created) == 1
+    assert states['MSFT']['outputs']['plot'] == 'forecast_MSFT.png'
+
+
+@pytest.mark.slow
+def test_batch_run_with_workers(batch_config):
+    runner = BatchRunner(batch_config, fetch=fake_fetch, save_plots=False)
+    states = runner.run(['AAPL', 'MSFT', 'BAD'], workers=2)
+    
+    assert [states[s]['status'] for s in ['AAPL', 'MSFT', 'BAD']] == ['done', 'done', 'failed']
+
+
+def test_batch_run_collects_profile(batch_config):
+    from src.utils.profiling import profiling
+    
+    runner = BatchRunner(batch_config, fetch=fake_fetch, save_plots=False)
+    with profiling() as profiler:
+        states = runner.run(['AAPL'])
+    
+    assert 'profile' not in states['AAPL']
+    stages = {(record['symbol'], record['stage']) for record in profiler.records}
+    assert ('AAPL', 'train') in stages
+    assert ('AAPL', 'predict') in stages
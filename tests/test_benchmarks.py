@@ -0,0 +1,90 @@
+import json
+
+import pandas as pd
+from benchmarks import suite
+from benchmarks.synthetic import forecast_frame, price_history, trading_index, universe
+from src.data import prepare_for_prophet
+
+
+def test_price_history_is_deterministic():
+    first = price_history('AAPL', years=1, seed=1)
+    
+    pd.testing.assert_frame_equal(first, price_history('AAPL', years=1, seed=1))
+    assert not first['Close'].equals(price_history('MSFT', years=1, seed=1)['Close'])
+    assert not first['Close'].equals(price_history('AAPL', years=1, seed=2)['Close'])
+
+
+def test_price_history_is_valid_ohlc():
+    data = price_history('AAPL', years=5)
+    
+    assert len(data) == 5 * 252
+    assert data.index.is_monotonic_increasing
+    assert data.index[-1] == pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=1)[0]
+    assert (data['Close'] > 0).all()
+    assert (data['High'] >= data[['Open', 'Close']].max(axis=1)).all()
+    assert (data['Low'] <= data[['Open', 'Close']].min(axis=1)).all()
+
+
+def test_intraday_index_stays_in_session():
+    index = trading_index('2024-06-28', 200, freq='15min')
+    minutes = index.hour * 60 + index.minute
+    
+    assert len(index) == 200
+    assert index.is_unique
+    assert minutes.min() >= 9 * 60 + 30
+    assert minutes.max() < 16 * 60
+    assert (index.dayofweek < 5).all()
+
+
+def test_universe_symbols():
+    data = universe(3, years=1)
+    
+    assert list(data) == ['SYN0000', 'SYN0001', 'SYN0002']
+
+
+def test_forecast_frame_matches_model_output(trained_model):
+    history = prepare_for_prophet(price_history('AAPL', years=1))
+    forecast = forecast_frame(history, periods=30)
+    
+    assert set(trained_model.predict(periods=30).columns) <= set(forecast.columns)
+    assert len(forecast) == len(history) + 30
+    assert (forecast['yhat_upper'] >= forecast['yhat_lower']).all()
+
+
+def _results(**medians):
+    return {'results': {name: {'median_s': median, 'hot': name.endswith('hot')} for name, median in medians.items()}}
+
+
+def test_compare_flags_hot_regressions():
+    baseline = _results(**{'small/a.hot': 1.0, 'small/b': 1.0, 'small/c.hot': 1.0, 'small/d.hot': 0.001, 'small/gone': 1.0})
+    current = _results(**{'small/a.hot': 1.5, 'small/b': 1.5, 'small/c.hot': 0.5, 'small/d.hot': 0.003, 'small/new': 1.0})
+    
+    status = {row['name']: row['status'] for row in suite.compare(baseline, current, threshold=0.25)}
+    
+    assert status == {
+        'small/a.hot': 'regressed',
+        'small/b': 'slower',
+        'small/c.hot': 'faster',
+        'small/d.hot': 'ok',
+        'small/gone': 'missing',
+        'small/new': 'new'
+    }
+
+
+def test_run_and_compare_commands(tmp_path, capsys):
+    baseline_path = tmp_path / 'baseline.json'
+    
+    assert suite.main(['run', '--scale', 'small', '--filter', 'preprocess$|analyze', '--repeat', '1', '--output', str(baseline_path)]) == 0
+    
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    assert 'small/preprocess' in baseline['results']
+    assert 'small/train' not in baseline['results']
+    
+    for result in baseline['results'].values():
+        result['median_s'] += 1.0
+    slow_path = tmp_path / 'slow.json'
+    slow_path.write_text(json.dumps(baseline), encoding='utf-8')
+    
+    assert suite.main(['compare', str(baseline_path), str(baseline_path)]) == 0
+    assert suite.main(['compare', str(baseline_path), str(slow_path)]) == 1
+    assert 'regressed' in capsys.readouterr().out
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.analysis import ForecastAnalyzer
+from src.models import EnsembleModel, ForecastModel, TrendModel, load_model
+from src.models.ensemble import backtest_weights, combine_forecasts
+
+
+@pytest.fixture
+def growth_data():
+    dates = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=300)
+    noise = np.random.default_rng(0).normal(0, 0.005, len(dates))
+    return pd.DataFrame({'ds': dates, 'y': 100 * np.exp(0.001 * np.arange(len(dates)) + noise)})
+
+
+def test_trend_model_fits_exponential_growth(growth_data):
+    model = TrendModel()
+    model.train(growth_data)
+    forecast = model.predict(periods=30)
+    
+    assert len(forecast) == len(growth_data) + 30
+    assert forecast['yhat'].iloc[-1] > growth_data['y'].iloc[-1]
+    
+    # Uncertainty widens with the horizon
+    width = forecast['yhat_upper'] - forecast['yhat_lower']
+    assert width.iloc[-1] > width.iloc[len(growth_data)]
+    assert (forecast['yhat_lower'] <= forecast['yhat']).all()
+
+
+def test_trend_model_rejects_non_positive_prices(growth_data):
+    growth_data.loc[5, 'y'] = 0
+    
+    with pytest.raises(ValueError):
+        TrendModel().train(growth_data)
+
+
+def test_combine_forecasts_weights_and_partial_columns():
+    ds = pd.date_range('2024-01-01', periods=3)
+    first = pd.DataFrame({'ds': ds, 'yhat': [1.0, 2.0, 3.0], 'weekly': [1.0, 1.0, 1.0]})
+    second = pd.DataFrame({'ds': ds, 'yhat': [3.0, 4.0, 5.0]})
+    
+    combined = combine_forecasts([first, second], np.array([0.75, 0.25]))
+    
+    assert list(combined.columns) == ['ds', 'yhat', 'weekly']
+    np.testing.assert_allclose(combined['yhat'], [1.5, 2.5, 3.5])
+    np.testing.assert_allclose(combined['weekly'], [1.0, 1.0, 1.0])
+    assert (combined['ds'] == ds).all()
+
+
+def test_backtest_weights_favor_lower_error():
+    weights = backtest_weights([1.0, 4.0, 0.0])
+    
+    assert weights.sum() == pytest.approx(1.0)
+    assert weights[2] > weights[0] > weights[1]
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        EnsembleModel([{'engine': 'arima'}])
+
+
+def test_from_config_merges_model_section():
+    ensemble = EnsembleModel.from_config(
+        {'yearly_seasonality': False, 'changepoint_prior_scale': 0.05},
+        {'members': [{'name': 'flexible', 'config': {'changepoint_prior_scale': 0.5}}, {'engine': 'trend'}], 'holdout': 20}
+    )
+    
+    assert ensemble.members[0]['config'] == {'yearly_seasonality': False, 'changepoint_prior_scale': 0.5}
+    assert ensemble.members[1] == {'name': 'trend_1', 'engine': 'trend', 'config': {}}
+    assert ensemble.holdout == 20
+    
+    # Only the interval's coverage carries over to other engines
+    ensemble = EnsembleModel.from_config({'interval_width': 0.95, 'changepoint_prior_scale': 0.05}, {'members': [{'engine': 'trend'}]})
+    assert ensemble.members[0]['config'] == {'interval_width': 0.95}
+
+
+def test_ensemble_keeps_forecast_schema(growth_data, tmp_path):
+    config = {'yearly_seasonality': False, 'weekly_seasonality': True}
+    ensemble = EnsembleModel([
+        {'name': 'prophet', 'engine': 'prophet', 'config': config},
+        {'name': 'trend', 'engine': 'trend'}
+    ], holdout=30)
+    ensemble.train(growth_data)
+    forecast = ensemble.predict(periods=30)
+    
+    assert set(ensemble.weights) == {'prophet', 'trend'}
+    assert sum(ensemble.weights.values()) == pytest.approx(1.0)
+    assert ensemble.model is ensemble.models['prophet'].model
+    
+    single = ForecastModel(config=config)
+    single.train(growth_data)
+    assert set(single.predict(periods=30).columns) <= set(forecast.columns)
+    assert not forecast[['yhat', 'yhat_lower', 'yhat_upper']].isna().any().any()
+    
+    analyzer = ForecastAnalyzer()
+    assert analyzer.find_optimal_sell_date(forecast)['date'] is not None
+    assert 'std_dev' in analyzer.calculate_volatility(forecast)
+    
+    loaded = load_model(ensemble.save(str(tmp_path / 'ensemble')))
+    assert isinstance(loaded, EnsembleModel)
+    assert loaded.weights == ensemble.weights
+    # Prophet samples its intervals, so only the point forecast is reproducible
+    np.testing.assert_allclose(loaded.predict(periods=30)['yhat'], forecast['yhat'])
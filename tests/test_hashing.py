@@ -0,0 +1,18 @@
+from src.utils import frame_fingerprint
+
+
+def test_fingerprint_is_stable(sample_stock_data):
+    assert frame_fingerprint(sample_stock_data) == frame_fingerprint(sample_stock_data.copy())
+
+
+def test_fingerprint_changes_with_data(sample_stock_data):
+    changed = sample_stock_data.copy()
+    changed.iloc[-1, changed.columns.get_loc('Close')] += 1
+    
+    assert frame_fingerprint(sample_stock_data) != frame_fingerprint(changed)
+
+
+def test_fingerprint_changes_with_columns(sample_stock_data):
+    renamed = sample_stock_data.rename(columns={'Close': 'close'})
+    
+    assert frame_fingerprint(sample_stock_data) != frame_fingerprint(renamed)
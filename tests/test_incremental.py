@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.models import IncrementalForecaster, TrendModel
+
+
+@pytest.fixture
+def trend_model(sample_prophet_data):
+    model = TrendModel()
+    model.train(sample_prophet_data)
+    return model
+
+
+def _bar(date, price):
+    return pd.DataFrame({'ds': [pd.Timestamp(date)], 'y': [price]})
+
+
+def test_update_matches_full_predict(trend_model):
+    live = IncrementalForecaster(trend_model, periods=30, max_outside=0)
+    forecast = live.update(_bar('2025-01-01', 136.6))
+    
+    expected_ds = pd.concat([live.history['ds'], pd.Series(pd.date_range('2025-01-02', periods=30))], ignore_index=True)
+    expected = trend_model.predict_dates(expected_ds)
+    
+    assert len(live.history) == 367
+    assert list(forecast.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(forecast, expected)
+
+
+def test_same_day_bar_replaces_last_value(trend_model):
+    live = IncrementalForecaster(trend_model, periods=30, max_outside=0)
+    live.update(_bar('2025-01-01', 136.6))
+    forecast = live.update(_bar('2025-01-01', 137.0))
+    
+    assert len(live.history) == 367
+    assert live.history['y'].iloc[-1] == 137.0
+    assert live.bars_since_fit == 1
+    assert forecast['ds'].iloc[-1] == pd.Timestamp('2025-01-31')
+    
+    # Bars older than the history are ignored
+    live.update(_bar('2024-06-01', 1.0))
+    assert len(live.history) == 367
+
+
+def test_refit_on_schedule(trend_model):
+    live = IncrementalForecaster(trend_model, periods=10, refit_every=3, max_outside=0)
+    
+    for day, price in enumerate([136.6, 136.7, 136.8], start=1):
+        live.update(_bar(f'2025-01-0{day}', price))
+    
+    assert live.refits == 1
+    assert live.bars_since_fit == 0
+    assert trend_model.history['ds'].iloc[-1] == pd.Timestamp('2025-01-03')
+    assert live.forecast['ds'].iloc[-1] == pd.Timestamp('2025-01-13')
+
+
+def test_refit_on_drift(trend_model):
+    live = IncrementalForecaster(trend_model, periods=10, max_outside=2, auto_refit=False)
+    
+    live.update(_bar('2025-01-01', 500.0))
+    assert live.refit_reason is None
+    live.update(_bar('2025-01-02', 500.0))
+    assert live.refit_reason == 'drift'
+    assert live.refits == 0
+    
+    forecast = live.refit()
+    assert live.refit_reason is None
+    assert forecast['yhat'].iloc[-1] > live.history['y'].iloc[-3]
+
+
+def test_update_with_prophet_model(trained_model):
+    live = IncrementalForecaster(trained_model, periods=15, max_outside=0)
+    forecast = live.update(_bar('2025-01-01', 136.6))
+    
+    assert len(forecast) == len(live.history) + 15
+    assert forecast['ds'].is_monotonic_increasing
+    assert {'yhat', 'yhat_lower', 'yhat_upper', 'trend'} <= set(forecast.columns)
+    np.testing.assert_allclose(
+        forecast['yhat'].iloc[-15:].to_numpy(),
+        trained_model.predict_dates(pd.date_range('2025-01-02', periods=15))['yhat'].to_numpy()
+    )
@@ -0,0 +1,88 @@
+import io
+import json
+import logging
+import logging.handlers
+
+import pytest
+from src.analysis import ForecastAnalyzer
+from src.utils import logger as log_module
+from src.utils.logger import flush_logs, get_log_settings, log_context, setup_logger
+
+
+@pytest.fixture
+def stream():
+    stream = io.StringIO()
+    yield stream
+    
+    log_module._stop_listener()
+    logger = logging.getLogger('src')
+    logger.handlers.clear()
+    logger.propagate = True
+    logger.setLevel(logging.NOTSET)
+
+
+def test_setup_logger_uses_queue_handler(stream):
+    logger = setup_logger(stream=stream)
+    
+    assert len(logger.handlers) == 1
+    assert isinstance(logger.handlers[0], logging.handlers.QueueHandler)
+    assert not logger.propagate
+
+
+def test_json_output_with_context(stream):
+    setup_logger(json_format=True, stream=stream)
+    
+    with log_context(symbol='AAPL', stage='fetch'):
+        logging.getLogger('src.data.fetcher').info("   Downloaded %d rows", 10, extra={'rows': 10})
+    logging.getLogger('src.cli').warning("done")
+    flush_logs()
+    
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first['message'] == 'Downloaded 10 rows'
+    assert first['logger'] == 'src.data.fetcher'
+    assert first['level'] == 'INFO'
+    assert (first['symbol'], first['stage'], first['rows']) == ('AAPL', 'fetch', 10)
+    assert second['level'] == 'WARNING'
+    assert 'symbol' not in second
+
+
+@pytest.mark.parametrize("json_format", [True, False])
+def test_exceptions_keep_tracebacks(stream, json_format):
+    setup_logger(json_format=json_format, stream=stream)
+    
+    try:
+        raise ValueError("bad data")
+    except ValueError:
+        logging.getLogger('src.cli').exception("fit failed for %s", 'AAPL')
+    flush_logs()
+    
+    output = stream.getvalue()
+    if json_format:
+        record = json.loads(output)
+        assert record['message'] == 'fit failed for AAPL'
+        assert 'Traceback' in record['exception']
+        assert 'ValueError: bad data' in record['exception']
+    else:
+        assert output.startswith('fit failed for AAPL\nTraceback')
+        assert 'ValueError: bad data' in output
+
+
+def test_text_output_prefixes_symbol(stream):
+    setup_logger(stream=stream)
+    
+    logging.getLogger('src.cli').info("starting")
+    with log_context(symbol='MSFT'):
+        logging.getLogger('src.cli').info("fitting")
+    flush_logs()
+    
+    assert stream.getvalue().splitlines() == ['starting', '[MSFT] fitting']
+
+
+def test_level_filters_records(stream, sample_forecast, tmp_path):
+    setup_logger(level='WARNING', stream=stream)
+    
+    ForecastAnalyzer().export_to_csv(sample_forecast, str(tmp_path / 'forecast.csv'))
+    flush_logs()
+    
+    assert stream.getvalue() == ''
+    assert get_log_settings() == {'level': 'WARNING', 'json': False}
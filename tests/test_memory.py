@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from benchmarks.memory import ROOT, load_budgets, run_pipeline
+from src.utils.memory import MemoryProfiler, check_budgets, current_rss_mb, memory_profiling
+from src.utils.profiling import profiled
+
+
+@profiled('allocate')
+def allocate(mb):
+    return np.ones(int(mb * 1024 * 1024 / 8))
+
+
+def test_stage_records_traced_peak_and_retained():
+    with memory_profiling() as profiler:
+        kept = allocate(8)
+        with profiler.stage('temporary'):
+            allocate(16)
+    
+    totals = {total['stage']: total for total in profiler.memory_summary()}
+    
+    assert totals['allocate']['traced_peak_mb'] == pytest.approx(16, abs=1)
+    assert totals['allocate']['calls'] == 2
+    assert totals['temporary']['traced_peak_mb'] == pytest.approx(16, abs=1)
+    assert totals['temporary']['retained_mb'] == pytest.approx(0, abs=1)
+    assert totals['temporary']['rss_peak_mb'] > 0
+    assert kept.nbytes == 8 * 1024 * 1024
+
+
+def test_nested_stage_peak_counts_toward_parent():
+    profiler = MemoryProfiler().start()
+    try:
+        with profiler.stage('outer'):
+            allocate(4)
+            with profiler.stage('inner'):
+                allocate(12)
+            allocate(2)
+    finally:
+        profiler.stop()
+    
+    totals = {total['stage']: total for total in profiler.memory_summary()}
+    
+    assert totals['outer']['traced_peak_mb'] == pytest.approx(12, abs=1)
+    assert totals['inner']['traced_peak_mb'] == pytest.approx(12, abs=1)
+
+
+def test_current_rss():
+    assert current_rss_mb() > 0
+
+
+def test_check_budgets():
+    summary = [
+        {'stage': 'train', 'traced_peak_mb': 50.0},
+        {'stage': 'predict', 'traced_peak_mb': 10.0}
+    ]
+    
+    violations = check_budgets(summary, {'train': 40, 'predict': 20, 'export': 5})
+    
+    assert violations == [
+        'train: peak 50.0 MB exceeds budget 40.0 MB',
+        'export: stage did not run'
+    ]
+
+
+@pytest.mark.slow
+def test_pipeline_stages_within_memory_budgets():
+    budgets = load_budgets()
+    
+    report = run_pipeline(budgets['years'], str(ROOT / 'config.yaml'), dpi=budgets['dpi'])
+    
+    assert check_budgets(report['stages'], budgets['budgets_mb']) == []
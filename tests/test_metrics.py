@@ -0,0 +1,149 @@
+import threading
+import urllib.request
+
+import pytest
+from src.service import ForecastService, create_server
+from src.utils.logger import log_context
+from src.utils.metrics import CACHE_REQUESTS, FAILURES, FIT_SECONDS, INTERVAL_WIDTH, REGISTRY, ROWS_PROCESSED, MetricsRegistry, instrumented
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+def test_render_counter_and_gauge(registry):
+    requests = registry.counter('requests_total', 'Requests', ('path',))
+    width = registry.gauge('width', 'Width')
+    
+    requests.inc(path='/forecast')
+    requests.inc(2, path='/forecast')
+    requests.inc(path='/say "hi"')
+    width.set(0.25)
+    
+    assert registry.render().splitlines() == [
+        '# HELP requests_total Requests',
+        '# TYPE requests_total counter',
+        'requests_total{path="/forecast"} 3',
+        'requests_total{path="/say \\"hi\\""} 1',
+        '# HELP width Width',
+        '# TYPE width gauge',
+        'width 0.25',
+    ]
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    
+    for value in [0.05, 0.5, 0.5, 5.0]:
+        latency.observe(value)
+    
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum 6.05' in lines
+    assert 'latency_seconds_count 4' in lines
+
+
+def test_metric_rejects_wrong_labels(registry):
+    counter = registry.counter('jobs_total', 'Jobs', ('status',))
+    
+    with pytest.raises(ValueError):
+        counter.inc(symbol='AAPL')
+    with pytest.raises(ValueError):
+        counter.inc(-1, status='done')
+    with pytest.raises(ValueError):
+        registry.gauge('jobs_total', 'Jobs')
+
+
+def test_merge_adds_counters_and_histograms(registry):
+    counter = registry.counter('jobs_total', 'Jobs', ('status',))
+    gauge = registry.gauge('width', 'Width')
+    histogram = registry.histogram('fit_seconds', 'Fit', buckets=(1.0,))
+    
+    counter.inc(status='done')
+    histogram.observe(0.5)
+    snapshot = registry.snapshot()
+    
+    registry.merge(snapshot)
+    gauge.set(1.0)
+    registry.merge({'width': {(): 2.0}, 'unknown': {(): 1.0}})
+    
+    assert counter.value(status='done') == 2
+    assert histogram.count() == 2
+    assert gauge.value() == 2.0
+
+
+def test_write_textfile(registry, tmp_path):
+    registry.counter('jobs_total', 'Jobs').inc()
+    
+    path = registry.write_textfile(str(tmp_path / 'metrics' / 'forecast.prom'))
+    
+    assert open(path, encoding='utf-8').read() == registry.render()
+    assert list((tmp_path / 'metrics').iterdir()) == [tmp_path / 'metrics' / 'forecast.prom']
+
+
+def test_instrumented_records_rows_and_failures(sample_stock_data):
+    @instrumented('preprocess', FIT_SECONDS)
+    def passthrough(data):
+        return data
+    
+    @instrumented('fetch')
+    def failing(symbol):
+        raise ValueError(symbol)
+    
+    passthrough(sample_stock_data)
+    with log_context(symbol='AAPL'), pytest.raises(ValueError):
+        failing('AAPL')
+    
+    assert ROWS_PROCESSED.value(stage='preprocess') == len(sample_stock_data)
+    assert FIT_SECONDS.count() == 1
+    assert FAILURES.value(symbol='AAPL', stage='fetch') == 1
+
+
+def test_model_records_fit_and_interval_width(sample_prophet_data):
+    from src.models import ForecastModel
+    
+    model = ForecastModel(config={'yearly_seasonality': False, 'weekly_seasonality': False})
+    with log_context(symbol='AAPL'):
+        model.train(sample_prophet_data)
+        model.predict(periods=10)
+    
+    assert FIT_SECONDS.count() == 1
+    assert ROWS_PROCESSED.value(stage='train') == len(sample_prophet_data)
+    assert INTERVAL_WIDTH.value(symbol='AAPL') > 0
+
+
+def test_service_exposes_metrics(trained_model):
+    service = ForecastService(lambda symbol: trained_model, max_days=90)
+    service.forecasts.get(('AAPL', 30))
+    service.forecasts.get(('AAPL', 30))
+    
+    assert CACHE_REQUESTS.value(cache='forecasts', result='hit') == 1
+    assert CACHE_REQUESTS.value(cache='models', result='miss') == 1
+    
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    
+    try:
+        port = server.server_address[1]
+        urllib.request.urlopen(f'http://127.0.0.1:{port}/health').read()
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+            content_type = response.headers['Content-Type']
+            body = response.read().decode('utf-8')
+    finally:
+        server.shutdown()
+        server.server_close()
+    
+    assert content_type.startswith('text/plain; version=0.0.4')
+    assert 'forecast_service_requests_total{endpoint="/health",status="200"} 1' in body
+    assert 'forecast_cache_requests_total{cache="forecasts",result="hit"} 1' in body
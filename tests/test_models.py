@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+import pandas as pd
+from src.models import ForecastModel, ModelRegistry
+
+
+def test_predict_requires_training():
+    model = ForecastModel()
+    
+    with pytest.raises(RuntimeError):
+        model.predict(periods=10)
+
+
+def test_save_and_load_roundtrip(trained_model, tmp_path):
+    path = trained_model.save(str(tmp_path / 'model'))
+    loaded = ForecastModel.load(path)
+    
+    assert loaded.trained
+    assert loaded.config == trained_model.config
+    
+    expected = trained_model.predict(periods=10)
+    result = loaded.predict(periods=10)
+    
+    assert len(result) == len(expected)
+    assert result['ds'].equals(expected['ds'])
+    assert abs(result['yhat'] - expected['yhat']).max() < 1e-6
+
+
+def test_load_is_lazy(trained_model, tmp_path):
+    path = trained_model.save(str(tmp_path / 'model'))
+    loaded = ForecastModel.load(path)
+    
+    # Nothing is deserialized until it is used
+    assert loaded._model is None
+    assert loaded._history is None
+    
+    assert loaded.model is not None
+    assert loaded._history is None
+    
+    history = loaded.history
+    assert len(history) == len(trained_model.history)
+
+
+def test_save_replaces_model_atomically(trained_model, tmp_path, monkeypatch):
+    path = trained_model.save(str(tmp_path / 'model'))
+    path = trained_model.save(path)
+    
+    assert [p.name for p in tmp_path.iterdir()] == ['model']
+    assert ForecastModel.load(path).predict(periods=5) is not None
+    
+    # A save that fails halfway leaves the previous model untouched
+    saved_at = ForecastModel.load(path).meta['saved_at']
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(pd.DataFrame, 'to_csv', fail)
+    with pytest.raises(OSError):
+        trained_model.save(path)
+    
+    assert [p.name for p in tmp_path.iterdir()] == ['model']
+    assert ForecastModel.load(path).meta['saved_at'] == saved_at
+    assert len(ForecastModel.load(path).history) == len(trained_model.history)
+
+
+def test_interval_width_sets_bands_and_labels():
+    from src.analysis import ForecastAnalyzer
+    
+    rng = np.random.default_rng(0)
+    dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='D')
+    data = pd.DataFrame({'ds': dates, 'y': 100 + 0.1 * np.arange(len(dates)) + rng.normal(0, 2, len(dates))})
+    model = ForecastModel(config={'yearly_seasonality': False, 'weekly_seasonality': False, 'interval_width': 0.95})
+    model.train(data)
+    forecast = model.predict(periods=30)
+    
+    assert model.model.interval_width == 0.95
+    
+    # In sample, the share of prices above the band matches the labelled tail
+    scenarios = ForecastAnalyzer.from_config(model.config).generate_scenarios(forecast)
+    fitted = forecast.merge(data, on='ds')
+    above = float((fitted['y'] > fitted['yhat_upper']).mean())
+    assert scenarios['optimistic']['probability'] == 0.025
+    assert abs(above - scenarios['optimistic']['probability']) < 0.03
+
+
+def test_load_missing_model(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ForecastModel.load(str(tmp_path / 'missing'))
+
+
+def test_registry(trained_model, tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    
+    assert registry.load('AAPL') is None
+    
+    registry.save('AAPL', trained_model)
+    
+    assert registry.exists('aapl')
+    assert registry.list_symbols() == ['AAPL']
+    assert registry.load('AAPL') is not None
+    assert registry.load('AAPL', config={'yearly_seasonality': True}) is None
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.models import IncrementalForecaster, TrendModel
+from src.monitoring import DriftMonitor, monitor_symbols
+from src.monitoring.drift import STATE_DTYPE
+
+
+@pytest.fixture
+def forecast():
+    dates = pd.date_range('2025-01-01', periods=60, freq='D')
+    return pd.DataFrame({'ds': dates, 'yhat': 100.0, 'yhat_lower': 95.0, 'yhat_upper': 105.0})
+
+
+def _actual(forecast, shift=1.0, after=0, seed=0):
+    rng = np.random.default_rng(seed)
+    y = 100 * np.exp(rng.normal(0, 0.02, len(forecast)))
+    y = y * np.where(np.arange(len(forecast)) >= after, shift, 1.0)
+    return pd.DataFrame({'ds': forecast['ds'], 'y': y})
+
+
+def test_calibrated_forecast_is_not_flagged(forecast):
+    monitor = DriftMonitor()
+    
+    assert monitor.observe('aapl', _actual(forecast), forecast) == 60
+    assert monitor.flags('AAPL') == []
+    
+    record = monitor.records[0]
+    assert record['symbol'] == 'AAPL'
+    assert record['n'] == 60
+    assert 0.7 < record['coverage'] <= 1.0
+    assert record['mape'] < 0.05
+
+
+def test_level_shift_is_flagged(forecast):
+    monitor = DriftMonitor()
+    
+    monitor.observe('UP', _actual(forecast, shift=1.08, after=30), forecast)
+    monitor.observe('DOWN', _actual(forecast, shift=0.92, after=30), forecast)
+    monitor.observe('FLAT', _actual(forecast, seed=1), forecast)
+    
+    flagged = monitor.needs_refit()
+    assert 'drift_up' in flagged['UP']
+    assert 'drift_down' in flagged['DOWN']
+    assert 'FLAT' not in flagged
+    
+    scores = dict(zip(monitor.records['symbol'], monitor.scores()))
+    assert scores['UP'] > 1 > scores['FLAT']
+    
+    monitor.reset('UP')
+    assert monitor.flags('UP') == []
+    assert monitor.last_day('UP') == monitor.last_day('FLAT')
+
+
+def test_bars_are_counted_once(forecast):
+    monitor = DriftMonitor()
+    actual = _actual(forecast)
+    
+    assert monitor.observe('AAPL', actual.head(20), forecast) == 20
+    assert monitor.observe('AAPL', actual, forecast) == 40
+    assert monitor.observe('AAPL', actual, forecast) == 0
+    assert monitor.observe('MSFT', actual, forecast, since='2025-02-19') == 10
+
+
+def test_state_file_roundtrip(tmp_path, forecast):
+    path = tmp_path / 'drift.npy'
+    monitor = DriftMonitor(str(path))
+    for i in range(40):
+        monitor.observe(f'S{i}', _actual(forecast, seed=i), forecast)
+    monitor.save()
+    
+    loaded = DriftMonitor(str(path))
+    assert loaded.size == 40
+    assert loaded.records.dtype == STATE_DTYPE
+    np.testing.assert_array_equal(loaded.records, monitor.records)
+    assert loaded.last_day('S39') == monitor.last_day('S39')
+    assert list(loaded.summary().columns[-2:]) == ['last_date', 'score']
+    
+    with pytest.raises(ValueError):
+        DriftMonitor().save()
+
+
+def test_long_symbols_roundtrip(tmp_path, forecast):
+    path = tmp_path / 'drift.npy'
+    symbol = 'VERY-LONG-TICKER.XY'
+    monitor = DriftMonitor(str(path))
+    monitor.observe(symbol, _actual(forecast), forecast)
+    monitor.save()
+    
+    loaded = DriftMonitor(str(path))
+    assert loaded.records['symbol'].tolist() == [symbol]
+    assert loaded.last_day(symbol) == monitor.last_day(symbol)
+    
+    with pytest.raises(ValueError, match='longer than'):
+        monitor.observe('X' * 33, _actual(forecast), forecast)
+
+
+def test_state_without_model_day_loads(tmp_path, forecast):
+    monitor = DriftMonitor()
+    monitor.observe('AAPL', _actual(forecast), forecast)
+    names = [name for name in STATE_DTYPE.names if name != 'model_day']
+    old = np.zeros(1, dtype=[('symbol', 'U16')] + [(name, STATE_DTYPE[name]) for name in names[1:]])
+    for name in names:
+        old[name] = monitor.records[name]
+    path = tmp_path / 'drift.npy'
+    np.save(path, old)
+    
+    loaded = DriftMonitor(str(path))
+    assert loaded.records['model_day'].tolist() == [-1]
+    assert loaded.records['n'].tolist() == [60]
+
+
+def test_monitor_symbols(forecast):
+    monitor = DriftMonitor()
+    requested = []
+    
+    def fetch_actual(symbol, start):
+        requested.append((symbol, start))
+        return _actual(forecast, shift=1.1 if symbol == 'BAD' else 1.0)
+    
+    flagged = monitor_symbols(
+        monitor, ['GOOD', 'BAD', 'NONE'],
+        load_forecast=lambda symbol: None if symbol == 'NONE' else forecast,
+        fetch_actual=fetch_actual,
+        since=lambda symbol: '2025-01-09'
+    )
+    
+    assert list(flagged) == ['BAD']
+    assert requested == [('GOOD', '2025-01-10'), ('BAD', '2025-01-10')]
+    assert monitor.records['n'].tolist() == [51, 51]
+
+
+def test_monitor_symbols_resets_after_refit(forecast):
+    monitor = DriftMonitor()
+    history_end = {'BAD': '2025-01-09'}
+    
+    def run():
+        return monitor_symbols(
+            monitor, ['BAD'],
+            load_forecast=lambda symbol: forecast,
+            fetch_actual=lambda symbol, start: _actual(forecast, shift=1.1),
+            since=history_end.get
+        )
+    
+    assert 'BAD' in run()
+    
+    # The same model keeps its errors; a model fitted on newer data starts over
+    assert 'BAD' in run()
+    history_end['BAD'] = '2025-02-20'
+    assert run() == {}
+    assert monitor.records['n'].tolist() == [0]
+    assert monitor.summary()['model_end'].tolist() == [pd.Timestamp('2025-02-20')]
+
+
+def test_incremental_forecaster_refits_on_monitor_drift(sample_prophet_data):
+    model = TrendModel()
+    model.train(sample_prophet_data)
+    monitor = DriftMonitor(cusum_h=2.0)
+    live = IncrementalForecaster(model, periods=10, max_outside=0, monitor=monitor, symbol='SYN')
+    
+    live.update(pd.DataFrame({'ds': [pd.Timestamp('2025-01-01')], 'y': [137.0]}))
+    assert live.refits == 0
+    assert monitor.records['n'][0] == 1
+    
+    # One bar far outside the interval is enough to cross a low threshold
+    live.update(pd.DataFrame({'ds': [pd.Timestamp('2025-01-02')], 'y': [200.0]}))
+    assert live.refits == 1
+    assert monitor.flags('SYN') == []
+    assert monitor.records['n'][0] == 0
@@ -0,0 +1,119 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.analysis import ScenarioEngine, SellOptimizer
+from src.analysis.optimizer import stack_forecasts
+
+
+@pytest.fixture
+def forecasts():
+    dates = pd.date_range('2030-01-01', periods=60, freq='D')
+    t = np.arange(len(dates))
+    return {
+        'RISING': pd.DataFrame({'ds': dates, 'yhat': 100 + t, 'yhat_lower': 95 + t, 'yhat_upper': 105 + t}),
+        'PEAKED': pd.DataFrame({'ds': dates, 'yhat': 130 - np.abs(t - 20), 'yhat_lower': 125 - np.abs(t - 20), 'yhat_upper': 135 - np.abs(t - 20)}),
+        # Same expected path, but the interval widens quickly after day 10
+        'RISKY': pd.DataFrame({'ds': dates, 'yhat': 100 + 0.1 * t, 'yhat_lower': 100 - np.maximum(t - 10, 0) * 2.0, 'yhat_upper': 100.2 + 0.2 * t + np.maximum(t - 10, 0) * 2.0})
+    }
+
+
+def test_stack_forecasts(forecasts):
+    symbols, ds, mean, sd = stack_forecasts(forecasts, start_date='2030-01-11', end_date='2030-01-20', interval_width=0.8)
+    
+    assert symbols == ['RISING', 'PEAKED', 'RISKY']
+    assert mean.shape == sd.shape == (3, 10)
+    assert ds[0] == pd.Timestamp('2030-01-11')
+    assert sd[0, 0] == pytest.approx(10 / (2 * 1.2815515655446004))
+
+
+def test_single_date_picks_risk_adjusted_peak(forecasts):
+    schedule = SellOptimizer(risk_aversion=0.5).optimize(forecasts, start_date='2030-01-01').set_index('symbol')
+    
+    assert schedule.loc['RISING', 'date'] == pd.Timestamp('2030-03-01')
+    assert schedule.loc['PEAKED', 'date'] == pd.Timestamp('2030-01-21')
+    assert schedule.loc['RISKY', 'date'] <= pd.Timestamp('2030-01-11')
+    
+    # Without a penalty, the widening interval no longer matters
+    neutral = SellOptimizer(risk_aversion=0).optimize(forecasts, start_date='2030-01-01').set_index('symbol')
+    assert neutral.loc['RISKY', 'date'] == pd.Timestamp('2030-03-01')
+
+
+def test_min_hold_and_costs(forecasts):
+    optimizer = SellOptimizer(min_hold_days=30, cost_rate=0.01, fixed_cost=2.0, risk_aversion=0)
+    schedule = optimizer.optimize(forecasts, start_date='2030-01-01', quantities={'PEAKED': 10}, entry_dates={'PEAKED': '2030-01-01'}).set_index('symbol')
+    
+    # The peak is inside the holding period, so the first allowed date wins
+    assert schedule.loc['PEAKED', 'date'] == pd.Timestamp('2030-01-31')
+    assert schedule.loc['PEAKED', 'value'] == pytest.approx(10 * 120 * 0.99 - 2.0)
+
+
+def test_tranches_match_brute_force():
+    rng = np.random.default_rng(0)
+    ds = pd.date_range('2030-01-01', periods=12, freq='D')
+    mean = rng.normal(100, 5, (20, 12))
+    symbols = [f'S{i}' for i in range(20)]
+    entry = {symbol: '2030-01-01' for symbol in symbols}
+    
+    for tranches, spacing in [(1, 1), (2, 1), (2, 3), (3, 2)]:
+        optimizer = SellOptimizer(cost_rate=0, risk_aversion=0, min_hold_days=2, tranches=tranches, spacing_days=spacing)
+        schedule = optimizer.optimize_arrays(symbols, ds, mean, np.zeros_like(mean), entry_dates=entry)
+        
+        for i, symbol in enumerate(symbols):
+            best = max(
+                mean[i, list(dates)].sum() / tranches
+                for dates in itertools.combinations(range(2, 12), tranches)
+                if all(b - a >= spacing for a, b in zip(dates, dates[1:]))
+            )
+            rows = schedule[schedule['symbol'] == symbol]
+            assert rows['value'].sum() == pytest.approx(best)
+            assert rows['total_value'].iloc[0] == pytest.approx(best)
+            assert (rows['date'].diff().dropna() >= pd.Timedelta(days=spacing)).all()
+
+
+def test_spacing_follows_business_days():
+    rng = np.random.default_rng(1)
+    ds = pd.bdate_range('2030-01-01', periods=15)
+    mean = rng.normal(100, 5, (20, 15))
+    symbols = [f'S{i}' for i in range(20)]
+    optimizer = SellOptimizer(cost_rate=0, risk_aversion=0, tranches=2, spacing_days=3)
+    
+    schedule = optimizer.optimize_arrays(symbols, ds, mean, np.zeros_like(mean), entry_dates={s: '2030-01-01' for s in symbols})
+    
+    # Spacing is in calendar days, so Friday to Monday is far enough
+    for i, symbol in enumerate(symbols):
+        best = max(
+            mean[i, list(dates)].sum() / 2
+            for dates in itertools.combinations(range(15), 2)
+            if ds[dates[1]] - ds[dates[0]] >= pd.Timedelta(days=3)
+        )
+        rows = schedule[schedule['symbol'] == symbol]
+        assert rows['total_value'].iloc[0] == pytest.approx(best)
+        assert (rows['date'].diff().dropna() >= pd.Timedelta(days=3)).all()
+    
+    friday, monday = ds.get_loc(pd.Timestamp('2030-01-04')), ds.get_loc(pd.Timestamp('2030-01-07'))
+    assert optimizer._next_columns(ds)[friday] == monday
+
+
+def test_infeasible_schedule_and_validation(forecasts):
+    optimizer = SellOptimizer(tranches=3, spacing_days=30)
+    schedule = optimizer.optimize(forecasts, start_date='2030-01-01', end_date='2030-01-31', entry_dates={s: '2030-01-01' for s in forecasts})
+    
+    assert schedule['date'].isna().all()
+    with pytest.raises(ValueError):
+        SellOptimizer(tranches=0)
+    with pytest.raises(ValueError):
+        SellOptimizer().optimize(forecasts, start_date='2040-01-01')
+
+
+def test_optimize_scenarios():
+    dates = pd.date_range('2030-01-01', periods=120, freq='D')
+    history = pd.DataFrame({'ds': dates[:60], 'y': np.linspace(90, 100, 60)})
+    forecast = pd.DataFrame({'ds': dates, 'yhat': np.linspace(90, 110, 120)})
+    scenarios = {'SYN': ScenarioEngine(n_paths=500, seed=0).simulate(forecast, history)}
+    
+    schedule = SellOptimizer(risk_aversion=0, tranches=2, spacing_days=5).optimize_scenarios(scenarios, entry_dates={'SYN': '2030-01-01'})
+    
+    assert len(schedule) == 2
+    assert schedule['date'].notna().all()
@@ -0,0 +1,135 @@
+import pytest
+import pandas as pd
+import yaml
+from src.pipeline import ArtifactStore, Pipeline, Stage, build_forecast_pipeline
+from src.utils import load_config
+from tests.test_batch import fake_fetch
+
+
+def _counting_pipeline(calls, store, scale=1, label='chart'):
+    def load():
+        calls.append('load')
+        return pd.DataFrame({'x': [1.0, 2.0, 3.0]})
+    
+    def transform(load):
+        calls.append('transform')
+        return load * scale
+    
+    def summarize(transform):
+        calls.append('summarize')
+        return {'total': float(transform['x'].sum()), 'label': label}
+    
+    return Pipeline([
+        Stage('load', load, kind='frame'),
+        Stage('transform', transform, inputs=['load'], config={'scale': scale}, kind='frame'),
+        Stage('summarize', summarize, inputs=['transform'], config={'label': label}, kind='json'),
+    ], store)
+
+
+def test_pipeline_caches_artifacts(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    calls = []
+    
+    result = _counting_pipeline(calls, store).run()
+    assert result['summarize'] == {'total': 6.0, 'label': 'chart'}
+    assert calls == ['load', 'transform', 'summarize']
+    
+    calls.clear()
+    pipeline = _counting_pipeline(calls, store)
+    result = pipeline.run(['summarize'])
+    
+    # Cached targets are loaded without resolving their inputs
+    assert calls == []
+    assert result == {'summarize': {'total': 6.0, 'label': 'chart'}}
+    assert pipeline.status == {'summarize': 'cached'}
+
+
+def test_pipeline_reruns_only_changed_stages(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    _counting_pipeline([], store).run()
+    
+    calls = []
+    _counting_pipeline(calls, store, label='other').run(['summarize'])
+    assert calls == ['summarize']
+    
+    calls = []
+    result = _counting_pipeline(calls, store, scale=2).run(['summarize'])
+    assert calls == ['transform', 'summarize']
+    assert result['summarize']['total'] == 12.0
+
+
+def test_pipeline_force_and_no_store(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    _counting_pipeline([], store).run()
+    
+    calls = []
+    _counting_pipeline(calls, store).run(force=True)
+    assert calls == ['load', 'transform', 'summarize']
+    
+    calls = []
+    _counting_pipeline(calls, None).run()
+    _counting_pipeline(calls, None).run()
+    assert len(calls) == 6
+
+
+def test_pipeline_rejects_bad_graphs():
+    with pytest.raises(ValueError):
+        Pipeline([Stage('a', lambda b: b, inputs=['b'])])
+    
+    pipeline = Pipeline([
+        Stage('a', lambda b: b, inputs=['b']),
+        Stage('b', lambda a: a, inputs=['a']),
+    ])
+    with pytest.raises(ValueError):
+        pipeline.key('a')
+
+
+def test_files_artifact_invalidated_when_overwritten(tmp_path):
+    store = ArtifactStore(str(tmp_path / 'cache'))
+    target = tmp_path / 'out.txt'
+    calls = []
+    
+    def write():
+        calls.append('write')
+        target.write_text('data', encoding='utf-8')
+        return {'out': str(target)}
+    
+    stages = [Stage('write', write, kind='files')]
+    Pipeline(stages, store).run()
+    Pipeline(stages, store).run()
+    assert calls == ['write']
+    
+    target.write_text('changed elsewhere', encoding='utf-8')
+    Pipeline(stages, store).run()
+    assert calls == ['write', 'write']
+
+
+def test_forecast_pipeline_visualization_change(tmp_path):
+    config = {
+        'stock': {'symbol': 'AAPL', 'start': '2024-01-01', 'end': '2024-06-30'},
+        'forecast': {'days': 10},
+        'model': {'yearly_seasonality': False, 'weekly_seasonality': False},
+        'output': {'directory': str(tmp_path / 'outputs'), 'plot_dpi': 40, 'plot_cache': False},
+        'visualization': {'figure_width': 8, 'figure_height': 4}
+    }
+    path = tmp_path / 'config.yaml'
+    path.write_text(yaml.safe_dump(config), encoding='utf-8')
+    store = ArtifactStore(str(tmp_path / 'cache'))
+    
+    pipeline = build_forecast_pipeline(load_config(str(path)), 'AAPL', 10, store, fetch=fake_fetch)
+    results = pipeline.run(['predict', 'analyze', 'plot', 'export'])
+    
+    assert set(pipeline.status.values()) == {'ran'}
+    assert len(results['predict']) == results['analyze']['samples'] + 10
+    assert (tmp_path / 'outputs' / 'forecast_AAPL.csv').exists()
+    
+    config['visualization']['figure_width'] = 10
+    path.write_text(yaml.safe_dump(config), encoding='utf-8')
+    
+    pipeline = build_forecast_pipeline(load_config(str(path)), 'AAPL', 10, store, fetch=fake_fetch)
+    pipeline.run(['predict', 'analyze', 'plot', 'export'])
+    
+    assert pipeline.status['plot'] == 'ran'
+    assert pipeline.status['train'] == 'cached'
+    assert 'fetch' not in pipeline.status
+    assert all(pipeline.status[name] == 'cached' for name in ['predict', 'analyze', 'export'])
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.analysis import ForecastAnalyzer
+from src.models import PooledModel
+from src.models.pooled import fourier_features
+
+
+def _series(n_days, growth, seed, end=None):
+    dates = pd.bdate_range(end=end or pd.Timestamp.now().normalize(), periods=n_days)
+    rng = np.random.default_rng(seed)
+    season = 0.05 * np.sin(2 * np.pi * dates.dayofyear.to_numpy() / 365.25)
+    log_y = np.log(100) + growth * np.arange(n_days) / 252 + season + rng.normal(0, 0.002, n_days)
+    return pd.DataFrame({'ds': dates, 'y': np.exp(log_y)})
+
+
+@pytest.fixture
+def sector():
+    return {
+        'UP': _series(756, 0.20, 0),
+        'DOWN': _series(756, -0.10, 1),
+        'SHORT': _series(40, 0.05, 2)
+    }
+
+
+def test_fourier_features_shape():
+    features = fourier_features(pd.date_range('2024-01-01', periods=10), yearly_order=2, weekly_order=1)
+    
+    assert features.shape == (10, 6)
+    assert np.abs(features).max() <= 1
+
+
+def test_pooled_model_recovers_trends_and_shared_season(sector):
+    model = PooledModel()
+    model.train(sector)
+    forecasts = model.predict(periods=30)
+    
+    assert set(forecasts) == {'UP', 'DOWN', 'SHORT'}
+    up, down = forecasts['UP'], forecasts['DOWN']
+    assert up['trend'].iloc[-1] > up['trend'].iloc[-31]
+    assert down['trend'].iloc[-1] < down['trend'].iloc[-31]
+    
+    # In-sample fit is close, and seasonality is the same for every series
+    fitted = up['yhat'].iloc[:len(sector['UP'])].to_numpy()
+    assert np.abs(np.log(fitted / sector['UP']['y'].to_numpy())).mean() < 0.01
+    np.testing.assert_allclose(up['yearly'].iloc[-30:].to_numpy(), down['yearly'].iloc[-30:].to_numpy())
+    assert up['yearly'].abs().max() > 0.02
+
+
+def test_short_history_forecast_is_stable(sector):
+    model = PooledModel()
+    model.train(sector)
+    forecast = model.forecast_symbol('SHORT', periods=90)
+    
+    assert len(forecast) == 40 + 90
+    assert (forecast['yhat'] > 0).all()
+    assert (forecast['yhat_lower'] <= forecast['yhat']).all()
+    assert (forecast['yhat'] <= forecast['yhat_upper']).all()
+    assert forecast['yhat'].iloc[-1] == pytest.approx(sector['SHORT']['y'].iloc[-1], rel=0.2)
+
+
+def test_forecast_works_with_analyzer_and_series_view(sector):
+    model = PooledModel()
+    model.train(sector)
+    
+    series = model.series('UP')
+    forecast = series.predict(periods=30)
+    analyzer = ForecastAnalyzer()
+    
+    assert series.history is model.histories['UP']
+    assert series.model is None
+    assert analyzer.find_optimal_sell_date(forecast)['date'] is not None
+    assert 'std_dev' in analyzer.calculate_volatility(forecast)
+    assert list(forecast['yhat']) == pytest.approx(list(model.forecast_symbol('UP', periods=30)['yhat']))
+
+
+def test_pooled_model_validation(sector):
+    with pytest.raises(ValueError):
+        PooledModel().train({})
+    with pytest.raises(ValueError):
+        PooledModel().train({'BAD': sector['UP'].assign(y=-1.0)})
+    with pytest.raises(RuntimeError):
+        PooledModel().forecast_symbol('UP')
+    
+    model = PooledModel()
+    model.train(sector)
+    with pytest.raises(KeyError):
+        model.series('MISSING')
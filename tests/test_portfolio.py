@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.analysis import PortfolioAnalyzer
+from src.analysis.portfolio import shrunk_correlation
+
+
+def _book(n_symbols, market_beta, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2029-01-01', periods=300)
+    future = pd.date_range(dates[-1], periods=61, freq='D')[1:]
+    market = rng.normal(0, 0.01, len(dates))
+    
+    histories, forecasts = {}, {}
+    for i in range(n_symbols):
+        y = 100 * np.exp(np.cumsum(market_beta * market + rng.normal(0, 0.01, len(dates))))
+        fitted = pd.Series(y).rolling(10, min_periods=1, center=True).mean().to_numpy()
+        yhat = np.concatenate((fitted, np.full(len(future), y[-1])))
+        width = np.concatenate((np.full(len(dates), 2.0), 2.0 + np.arange(len(future)) * 0.1))
+        
+        symbol = f'S{i}'
+        histories[symbol] = pd.DataFrame({'ds': dates, 'y': y})
+        forecasts[symbol] = pd.DataFrame({'ds': dates.append(future), 'yhat': yhat, 'yhat_lower': yhat - width, 'yhat_upper': yhat + width})
+    
+    return histories, forecasts
+
+
+def test_shrunk_correlation_recovers_factor_structure():
+    rng = np.random.default_rng(1)
+    factor = rng.normal(size=(400, 1))
+    residuals = factor * 0.6 + rng.normal(size=(400, 30)) * 0.8
+    residuals[:50, :5] = np.nan
+    
+    correlation, shrinkage = shrunk_correlation(residuals)
+    
+    off = ~np.eye(30, dtype=bool)
+    assert correlation.shape == (30, 30)
+    assert np.allclose(np.diag(correlation), 1.0)
+    assert 0 <= shrinkage < 0.5
+    assert correlation[off].mean() == pytest.approx(0.36 / (0.36 + 0.64), abs=0.1)
+    
+    # Shrinkage pulls the sample correlations towards zero
+    sample = np.corrcoef(residuals[50:].T)
+    assert correlation[off].mean() < sample[off].mean()
+    assert np.linalg.eigvalsh(correlation).min() >= -1e-10
+
+
+def test_shrunk_correlation_fixed_intensity():
+    residuals = np.random.default_rng(2).normal(size=(100, 4))
+    
+    correlation, shrinkage = shrunk_correlation(residuals, shrinkage=1.0)
+    
+    assert shrinkage == 1.0
+    assert np.allclose(correlation, np.eye(4))
+
+
+def test_portfolio_value_and_diversification():
+    histories, forecasts = _book(20, market_beta=0.0)
+    positions = {symbol: 10.0 for symbol in histories}
+    
+    portfolio = PortfolioAnalyzer()
+    value = portfolio.analyze(forecasts, histories, positions, start_date='2030-02-01')
+    
+    expected = sum(10 * forecasts[s].set_index('ds').loc['2030-02-01', 'yhat'] for s in histories)
+    assert value['ds'].iloc[0] == pd.Timestamp('2030-02-01')
+    assert value['expected_value'].iloc[0] == pytest.approx(expected)
+    assert (value['value_lower'] < value['expected_value']).all()
+    assert value['value_sd'].iloc[-1] > value['value_sd'].iloc[0]
+    
+    # Independent names diversify close to 1/sqrt(n); correlated ones do not
+    assert value['diversification_ratio'].iloc[-1] == pytest.approx(1 / np.sqrt(20), abs=0.1)
+    
+    histories, forecasts = _book(20, market_beta=3.0)
+    correlated = PortfolioAnalyzer().analyze(forecasts, histories, positions, start_date='2030-02-01')
+    assert correlated['diversification_ratio'].iloc[-1] > 0.6
+
+
+def test_portfolio_scenarios():
+    histories, forecasts = _book(10, market_beta=1.0)
+    positions = {symbol: 5.0 for symbol in histories}
+    
+    portfolio = PortfolioAnalyzer()
+    portfolio.analyze(forecasts, histories, positions, start_date='2030-02-01')
+    first = portfolio.scenarios(n_paths=2000, seed=3)
+    second = portfolio.scenarios(n_paths=2000, seed=3)
+    
+    assert first == second
+    assert first['quantiles']['p5'] < first['quantiles']['p50'] < first['quantiles']['p95']
+    assert first['expected_shortfall_5'] < first['quantiles']['p5']
+    assert 0 < first['probability_of_loss'] < 1
+    assert first['current_value'] == pytest.approx(sum(5 * h['y'].iloc[-1] for h in histories.values()))
+
+
+def test_portfolio_validation():
+    histories, forecasts = _book(2, market_beta=0.0)
+    
+    with pytest.raises(RuntimeError):
+        PortfolioAnalyzer().scenarios()
+    with pytest.raises(ValueError):
+        PortfolioAnalyzer().analyze(forecasts, histories, {'MISSING': 1.0})
+    with pytest.raises(ValueError):
+        PortfolioAnalyzer().analyze(forecasts, histories, {'S0': 1.0}, start_date='2040-01-01')
@@ -0,0 +1,64 @@
+import json
+import pandas as pd
+from src.analysis import ForecastAnalyzer
+from src.utils.profiling import Profiler, get_profiler, profiled, profiling, profile_symbol
+
+
+@profiled('double')
+def double(df):
+    return pd.concat([df, df])
+
+
+@profiled('outer')
+def outer(df):
+    return double(df)
+
+
+def test_profiled_is_transparent_when_disabled(sample_prophet_data):
+    assert get_profiler() is None
+    assert len(double(sample_prophet_data)) == 2 * len(sample_prophet_data)
+
+
+def test_profiled_records_stage(sample_prophet_data):
+    with profiling() as profiler, profile_symbol('aapl'):
+        outer(sample_prophet_data)
+    
+    assert get_profiler() is None
+    
+    records = {record['stage']: record for record in profiler.records}
+    assert set(records) == {'outer', 'double'}
+    assert records['double']['rows'] == 2 * len(sample_prophet_data)
+    assert records['outer']['depth'] == 0
+    assert records['double']['depth'] == 1
+    assert records['outer']['symbol'] == 'AAPL'
+    assert records['outer']['wall_s'] >= records['double']['wall_s'] >= 0
+    assert records['outer']['cpu_s'] >= 0
+
+
+def test_profiler_summary_and_report(sample_forecast, tmp_path):
+    analyzer = ForecastAnalyzer()
+    
+    with profiling() as profiler:
+        for symbol in ['AAPL', 'MSFT']:
+            with profile_symbol(symbol):
+                analyzer.calculate_volatility(sample_forecast)
+                analyzer.calculate_volatility(sample_forecast)
+    
+    summary = {(total['symbol'], total['stage']): total for total in profiler.summary()}
+    assert summary[('AAPL', 'analyze.calculate_volatility')]['calls'] == 2
+    assert summary[('MSFT', 'analyze.get_future_values')]['calls'] == 2
+    
+    path = profiler.save(str(tmp_path / 'profile.json'))
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    
+    assert len(report['records']) == 8
+    assert report['summary'][0]['wall_s'] >= report['summary'][-1]['wall_s']
+
+
+def test_profiler_extend():
+    profiler = Profiler()
+    profiler.extend([{'stage': 'train', 'symbol': 'AAPL', 'wall_s': 1.0, 'cpu_s': 1.0, 'rss_growth_mb': 100.0, 'rows': 10}])
+    
+    assert profiler.summary()[0]['stage'] == 'train'
+    assert profiler.summary()[0]['rss_growth_mb'] == 100.0
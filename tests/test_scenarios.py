@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.analysis import ScenarioEngine, ScenarioSet
+from src.analysis.scenarios import noise_parameters
+
+
+@pytest.fixture
+def history():
+    dates = pd.date_range(end='2024-12-31', periods=250, freq='D')
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'ds': dates, 'y': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))})
+
+
+@pytest.fixture
+def forecast(history):
+    dates = pd.date_range(start=history['ds'].iloc[0], end='2025-03-31', freq='D')
+    yhat = np.full(len(dates), float(history['y'].iloc[-1]))
+    return pd.DataFrame({'ds': dates, 'yhat': yhat, 'yhat_lower': yhat * 0.9, 'yhat_upper': yhat * 1.1})
+
+
+def test_noise_parameters(history, forecast):
+    params = noise_parameters(history, forecast)
+    
+    assert params['step_sd'] == pytest.approx(0.01, rel=0.15)
+    assert params['resid_sd'] > 0
+
+
+def test_simulate_shape_and_seed(history, forecast):
+    first = ScenarioEngine(n_paths=500, seed=7).simulate(forecast, history)
+    second = ScenarioEngine(n_paths=500, seed=7).simulate(forecast, history)
+    
+    assert first.paths.shape == (500, 90)
+    assert first.ds[0] == pd.Timestamp('2025-01-01')
+    assert (first.paths > 0).all()
+    np.testing.assert_array_equal(first.paths, second.paths)
+
+
+def test_quantiles_widen_with_horizon(history, forecast):
+    scenarios = ScenarioEngine(n_paths=4000, seed=1).simulate(forecast, history)
+    quantiles = scenarios.quantiles([0.05, 0.5, 0.95])
+    
+    assert list(quantiles.columns) == ['ds', 'p5', 'p50', 'p95', 'mean']
+    spread = quantiles['p95'] - quantiles['p5']
+    assert spread.iloc[-1] > spread.iloc[0]
+    
+    # yhat is the median path
+    assert quantiles['p50'].iloc[-1] == pytest.approx(forecast['yhat'].iloc[-1], rel=0.02)
+
+
+def test_exceedance_and_sell_dates(history, forecast):
+    scenarios = ScenarioEngine(n_paths=4000, seed=2).simulate(forecast, history)
+    price = forecast['yhat'].iloc[-1]
+    
+    assert scenarios.exceedance_probability(price, date='2025-03-31') == pytest.approx(0.5, abs=0.05)
+    assert scenarios.exceedance_probability(price) > scenarios.exceedance_probability(price, date='2025-03-31')
+    assert scenarios.exceedance_probability(price * 100) == 0.0
+    curve = scenarios.exceedance_curve(price)
+    assert len(curve) == 90
+    
+    sell_dates = scenarios.sell_date_distribution(start_date='2025-02-01')
+    assert sell_dates['probability'].sum() == pytest.approx(1.0)
+    assert sell_dates['ds'].min() == pd.Timestamp('2025-02-01')
+    
+    summary = scenarios.summary(target=price)
+    assert summary['paths'] == 4000
+    assert summary['quantiles']['p5'] < summary['quantiles']['p95']
+    assert 0 < summary['target']['probability_at_end'] < summary['target']['probability_any_time']
+
+
+def test_simulate_validation(history, forecast):
+    engine = ScenarioEngine(n_paths=10, seed=0)
+    
+    with pytest.raises(ValueError):
+        engine.simulate(forecast[forecast['ds'] <= history['ds'].max()], history)
+    with pytest.raises(ValueError):
+        engine.simulate(forecast.assign(yhat=-1.0), history)
+    with pytest.raises(ValueError):
+        engine.simulate(forecast, history).exceedance_probability(100, date='2030-01-01')
+    with pytest.raises(ValueError):
+        ScenarioEngine(n_paths=0)
+
+
+def test_simulate_model(trained_model):
+    scenarios = ScenarioEngine(n_paths=200, seed=0).simulate_model(trained_model, periods=30)
+    
+    assert scenarios.paths.shape == (200, 30)
+
+
+def test_median_peak_counts_calendar_days():
+    ds = pd.bdate_range('2025-01-06', periods=10)
+    paths = np.ones((3, 10))
+    paths[:, 5] = 2.0
+    scenarios = ScenarioSet(ds, paths, {}, origin='2025-01-03')
+    
+    # The sixth business day is ten calendar days after the Friday origin
+    sell_date = scenarios.summary()['sell_date']
+    assert sell_date['median_date'] == '2025-01-13'
+    assert sell_date['median_days'] == 10
@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta
+from functools import partial
+
+import pandas as pd
+import pytest
+import yaml
+from src.models import ModelRegistry
+from src.monitoring import DriftMonitor
+from src.pipeline import BatchRunner, RetrainScheduler
+from src.pipeline import scheduler as scheduler_module
+from src.utils import load_config
+
+NOW = datetime(2025, 6, 30, 12)
+
+
+def _ago(days):
+    return (NOW - timedelta(days=days)).isoformat(timespec='seconds')
+
+
+def retrain_ok(symbol, failing=()):
+    if symbol in failing:
+        raise ValueError(f"No data returned for {symbol}")
+    return {'symbol': symbol, 'status': 'done'}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Each fake refit advances the CPU clock by its symbol's cost
+    state = {'seconds': 0.0}
+    monkeypatch.setattr(scheduler_module, '_cpu_seconds', lambda: state['seconds'])
+    return state
+
+
+def _costly(clock, costs, calls):
+    def retrain(symbol):
+        calls.append(symbol)
+        clock['seconds'] += costs.get(symbol, 1.0)
+        return {'status': 'done'}
+    return retrain
+
+
+def test_priority_combines_signals():
+    scheduler = RetrainScheduler(retrain_ok)
+    scheduler.update('FRESH', history_end=_ago(1), saved_at=_ago(1))
+    scheduler.update('STALE', history_end=_ago(10), saved_at=_ago(10))
+    scheduler.update('DRIFT', history_end=_ago(1), saved_at=_ago(1), error=2.0)
+    scheduler.update('POPULAR', history_end=_ago(1), saved_at=_ago(1))
+    scheduler.record_demand('POPULAR', 1000)
+    scheduler.update('NEW')
+    
+    priority = {symbol: scheduler.priority(symbol, NOW) for symbol in scheduler.symbols}
+    
+    assert priority['NEW'] == scheduler.untrained_priority
+    assert priority['STALE'] > priority['FRESH']
+    assert priority['DRIFT'] > priority['FRESH'] + 1.9
+    assert priority['POPULAR'] > 3 * priority['FRESH']
+    
+    # Only symbols that are due enter the queue, most urgent first
+    heap = scheduler.queue(now=NOW)
+    order = [symbol for _, symbol in sorted(heap)]
+    assert order == ['NEW', 'DRIFT', 'STALE']
+
+
+def test_cycle_stays_within_budget(clock):
+    calls = []
+    costs = {'A': 10.0, 'B': 10.0, 'C': 10.0, 'D': 10.0}
+    scheduler = RetrainScheduler(_costly(clock, costs, calls), cpu_budget=25.0)
+    for i, symbol in enumerate(costs):
+        scheduler.update(symbol, history_end=_ago(30 - i), saved_at=_ago(30 - i))
+        scheduler.symbols[symbol]['cost'] = 10.0
+    
+    report = scheduler.run_cycle(now=NOW)
+    
+    assert calls == ['A', 'B']
+    assert report['done'] == ['A', 'B']
+    assert report['deferred'] == ['C', 'D']
+    assert report['cpu_seconds'] == pytest.approx(20.0)
+    
+    # Refitted symbols drop out; the deferred ones go next cycle
+    report = scheduler.run_cycle(now=NOW)
+    assert report['done'] == ['C', 'D']
+
+
+def test_costly_symbol_runs_first_and_updates_estimate(clock):
+    calls = []
+    scheduler = RetrainScheduler(_costly(clock, {'BIG': 50.0, 'SMALL': 1.0}, calls), cpu_budget=10.0, default_cost=5.0)
+    scheduler.update('BIG', history_end=_ago(60), saved_at=_ago(60))
+    scheduler.update('SMALL', history_end=_ago(20), saved_at=_ago(20))
+    
+    report = scheduler.run_cycle(now=NOW)
+    
+    # Over budget on its own, but never starved by cheaper symbols
+    assert report['done'] == ['BIG']
+    assert report['deferred'] == ['SMALL']
+    assert scheduler.estimate('BIG') == 50.0
+    assert scheduler.estimate('SMALL') == 50.0  # median of the known costs
+
+
+def test_failed_refit_keeps_priority():
+    scheduler = RetrainScheduler(partial(retrain_ok, failing=('BAD',)))
+    scheduler.update('BAD', history_end=_ago(30), saved_at=_ago(30), error=1.5)
+    scheduler.update('GOOD', history_end=_ago(30), saved_at=_ago(30), error=1.5)
+    
+    report = scheduler.run_cycle()
+    
+    assert report['failed'] == ['BAD']
+    assert report['done'] == ['GOOD']
+    assert scheduler.symbols['BAD']['cost'] is None
+    assert scheduler.symbols['BAD']['error'] == 1.5
+    assert scheduler.symbols['GOOD']['error'] == 0.0
+    assert scheduler.priority('GOOD') < scheduler.min_priority
+
+
+def test_drift_monitor_feeds_error_and_is_reset():
+    dates = pd.date_range('2025-01-01', periods=30, freq='D')
+    forecast = pd.DataFrame({'ds': dates, 'yhat': 100.0, 'yhat_lower': 95.0, 'yhat_upper': 105.0})
+    monitor = DriftMonitor()
+    monitor.observe('AAPL', pd.DataFrame({'ds': dates, 'y': 120.0}), forecast)
+    assert monitor.flags('AAPL')
+    
+    scheduler = RetrainScheduler(retrain_ok, monitor=monitor)
+    scheduler.update('AAPL', history_end=datetime.now().isoformat(), saved_at=datetime.now().isoformat())
+    scheduler.update('MSFT', history_end=datetime.now().isoformat(), saved_at=datetime.now().isoformat())
+    
+    report = scheduler.run_cycle(['AAPL', 'MSFT'])
+    
+    assert report['done'] == ['AAPL']
+    assert monitor.flags('AAPL') == []
+
+
+def test_state_roundtrip_and_demand_decay(tmp_path):
+    path = tmp_path / 'scheduler.json'
+    scheduler = RetrainScheduler(retrain_ok, state_file=str(path), demand_decay=0.5)
+    scheduler.record_demand('aapl', 8)
+    scheduler.update('AAPL', history_end=datetime.now().isoformat(), saved_at=datetime.now().isoformat())
+    
+    scheduler.run_cycle()
+    scheduler.save()
+    
+    restored = RetrainScheduler(retrain_ok, state_file=str(path))
+    assert restored.symbols['AAPL']['demand'] == 4.0
+    assert restored.symbols['AAPL']['history_end'] is None
+
+
+def fake_fetch(symbol, start, end):
+    dates = pd.date_range(start='2024-01-01', end='2024-06-30', freq='D')
+    data = pd.DataFrame({'Date': dates, 'Close': 100 + pd.Series(range(len(dates))) * 0.1})
+    return data.set_index('Date')
+
+
+@pytest.fixture
+def batch_config(tmp_path):
+    config = {
+        'stock': {'symbol': 'AAPL', 'start': '2024-01-01', 'end': '2024-06-30'},
+        'forecast': {'days': 10},
+        'model': {'yearly_seasonality': False, 'weekly_seasonality': False},
+        'output': {'directory': str(tmp_path / 'outputs'), 'save_csv': True},
+        'registry': {'enabled': True, 'directory': str(tmp_path / 'models')},
+        'batch': {'workers': 1, 'checkpoint_dir': str(tmp_path / 'batch')}
+    }
+    path = tmp_path / 'config.yaml'
+    path.write_text(yaml.safe_dump(config), encoding='utf-8')
+    return load_config(str(path))
+
+
+def test_batch_retrainer_fills_registry(batch_config, tmp_path):
+    runner = BatchRunner(batch_config, fetch=fake_fetch, save_plots=False)
+    registry = ModelRegistry(str(tmp_path / 'models'))
+    scheduler = RetrainScheduler(runner.retrainer(), registry=registry, cpu_budget=1e6)
+    
+    report = scheduler.run_cycle(['AAPL', 'MSFT'])
+    
+    assert sorted(report['done']) == ['AAPL', 'MSFT']
+    assert registry.list_symbols() == ['AAPL', 'MSFT']
+    assert scheduler.symbols['AAPL']['history_end'] == '2024-06-30'
+    assert scheduler.symbols['AAPL']['cost'] > 0
+    assert (tmp_path / 'outputs' / 'forecast_AAPL.csv').exists()
+
+
+@pytest.mark.slow
+def test_cycle_with_workers():
+    scheduler = RetrainScheduler(partial(retrain_ok, failing=('BAD',)), workers=2)
+    for symbol in ['AAPL', 'MSFT', 'BAD']:
+        scheduler.update(symbol)
+    
+    report = scheduler.run_cycle()
+    
+    assert sorted(report['done']) == ['AAPL', 'MSFT']
+    assert report['failed'] == ['BAD']
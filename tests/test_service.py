@@ -0,0 +1,202 @@
+import json
+import threading
+import time
+import urllib.request
+import pytest
+from src.models import ForecastModel
+from src.service import ModelPool, JobQueue, ForecastService, create_server
+
+
+def test_pool_caches_values():
+    calls = []
+    pool = ModelPool(lambda key: calls.append(key) or key.lower())
+    
+    assert pool.get('AAPL') == 'aapl'
+    assert pool.get('AAPL') == 'aapl'
+    assert calls == ['AAPL']
+    assert pool.hits == 1
+    assert pool.misses == 1
+
+
+def test_pool_evicts_least_recently_used():
+    pool = ModelPool(lambda key: key, max_size=2)
+    
+    pool.get('A')
+    pool.get('B')
+    pool.get('A')
+    pool.get('C')
+    
+    assert pool.keys() == ['A', 'C']
+
+
+def test_pool_expires_old_entries():
+    calls = []
+    pool = ModelPool(lambda key: calls.append(key) or key, max_age=0)
+    
+    pool.get('A')
+    time.sleep(0.01)
+    pool.get('A')
+    
+    assert len(calls) == 2
+
+
+def test_pool_coalesces_concurrent_loads():
+    calls = []
+    
+    def slow_loader(key):
+        calls.append(key)
+        time.sleep(0.2)
+        return key
+    
+    pool = ModelPool(slow_loader)
+    threads = [threading.Thread(target=pool.get, args=('AAPL',)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert calls == ['AAPL']
+
+
+def test_pool_propagates_loader_errors():
+    def failing_loader(key):
+        raise ValueError(f"No data returned for {key}")
+    
+    pool = ModelPool(failing_loader)
+    
+    with pytest.raises(ValueError):
+        pool.get('INVALID')
+    assert len(pool) == 0
+
+
+def test_pool_accepts_per_call_loader():
+    pool = ModelPool()
+    
+    assert pool.get('AAPL:abc', lambda: 'fitted') == 'fitted'
+    assert pool.get('AAPL:abc', lambda: 'refitted') == 'fitted'
+
+
+def wait_for(queue, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not queue.get(job_id).finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return queue.get(job_id)
+
+
+def test_job_queue_runs_jobs_with_progress():
+    queue = JobQueue()
+    
+    def work(report):
+        report(0.5, 'Halfway')
+        return 42
+    
+    job = wait_for(queue, queue.submit('AAPL:30', work))
+    
+    assert job.status == 'done'
+    assert job.result == 42
+    assert job.progress == 1.0
+
+
+def test_job_queue_reuses_jobs_for_same_key():
+    calls = []
+    queue = JobQueue()
+    
+    first = queue.submit('AAPL:30', lambda report: calls.append(1) or len(calls))
+    wait_for(queue, first)
+    second = queue.submit('AAPL:30', lambda report: calls.append(1) or len(calls))
+    
+    assert first == second
+    assert calls == [1]
+
+
+def test_job_queue_retries_failed_jobs():
+    queue = JobQueue()
+    
+    def failing(report):
+        raise ValueError('No data returned for INVALID')
+    
+    first = queue.submit('INVALID:30', failing)
+    job = wait_for(queue, first)
+    
+    assert job.status == 'failed'
+    assert 'INVALID' in job.error
+    assert queue.submit('INVALID:30', failing) != first
+
+
+@pytest.fixture
+def service(trained_model):
+    return ForecastService(lambda symbol: trained_model, max_days=90)
+
+
+def test_service_handles_endpoints(service):
+    status, payload = service.handle('/forecast', {'symbol': 'aapl', 'days': '30'})
+    assert status == 200
+    assert payload['symbol'] == 'AAPL'
+    
+    status, payload = service.handle('/scenarios', {'symbol': 'AAPL', 'days': '30'})
+    assert status == 200
+    assert 'expected' in payload['scenarios']
+    
+    status, payload = service.handle('/scenarios', {'symbol': 'AAPL', 'days': '30', 'paths': '500', 'seed': '1', 'target': '140'})
+    assert status == 200
+    assert payload['simulation']['paths'] == 500
+    assert 'target' in payload['simulation']
+    
+    status, payload = service.handle('/optimal-sell-date', {'symbol': 'AAPL'})
+    assert status == 200
+    assert 'optimal' in payload
+    
+    # Every horizon was served from a single fit
+    assert service.models.misses == 1
+
+
+def test_service_metrics_are_labelled_by_symbol(trained_model):
+    # An untrained model fails in predict(), inside the request's context
+    service = ForecastService(lambda symbol: ForecastModel() if symbol == 'BAD' else trained_model)
+    
+    assert service.handle('/forecast', {'symbol': 'aapl', 'days': '10'})[0] == 200
+    assert service.handle('/forecast', {'symbol': 'msft', 'days': '10'})[0] == 200
+    assert service.handle('/forecast', {'symbol': 'bad', 'days': '10'})[0] == 500
+    
+    status, metrics = service.handle('/metrics', {})
+    assert status == 200
+    assert 'forecast_interval_width{symbol="AAPL"}' in metrics
+    assert 'forecast_interval_width{symbol="MSFT"}' in metrics
+    assert 'forecast_failures_total{symbol="BAD",stage="predict"}' in metrics
+
+
+@pytest.mark.parametrize("path,params,expected_status", [
+    ('/unknown', {'symbol': 'AAPL'}, 404),
+    ('/forecast', {}, 400),
+    ('/forecast', {'symbol': 'AAPL', 'days': '1000'}, 400),
+    ('/forecast', {'symbol': 'AAPL', 'days': 'abc'}, 400),
+    ('/forecast', {'symbol': 'AA:PL', 'days': '10'}, 400),
+    ('/scenarios', {'symbol': 'AAPL MSFT'}, 400),
+])
+def test_service_rejects_bad_requests(service, path, params, expected_status):
+    status, payload = service.handle(path, params)
+    
+    assert status == expected_status
+    assert 'error' in payload
+
+
+def test_service_accepts_yahoo_symbols(service):
+    for symbol in ['BRK-B', '^GSPC', 'EURUSD=X', 'RDS.A']:
+        status, payload = service.handle('/forecast', {'symbol': symbol, 'days': '5'})
+        assert status == 200
+        assert payload['symbol'] == symbol.upper()
+
+
+def test_http_server(service):
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/health') as response:
+            payload = json.loads(response.read())
+        assert payload['status'] == 'ok'
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _loaded_modules(code):
+    probe = f'{code}\nimport sys\nprint(",".join(sorted(sys.modules)))'
+    result = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(result.stdout.strip().split(','))
+
+
+@pytest.mark.parametrize('code', [
+    'import main',
+    'import src.data, src.models, src.analysis, src.visualization, src.service, src.utils',
+    'from src.utils import load_config',
+])
+def test_imports_skip_heavy_dependencies(code):
+    loaded = _loaded_modules(code)
+    
+    for module in ('prophet', 'cmdstanpy', 'matplotlib', 'yfinance', 'pandas'):
+        assert module not in loaded
+
+
+def test_lazy_exports_resolve():
+    loaded = _loaded_modules('from src.models import ModelRegistry\nfrom src.service import ModelPool')
+    
+    assert 'src.models.registry' in loaded
+    assert 'src.service.pool' in loaded
+    assert 'prophet' not in loaded
+
+
+def test_lazy_exports_unknown_name():
+    import src.models
+    
+    with pytest.raises(AttributeError):
+        src.models.DoesNotExist
+
+
+def test_cli_help_runs():
+    result = subprocess.run([sys.executable, 'main.py', '--help'], cwd=ROOT, capture_output=True, text=True)
+    
+    assert result.returncode == 0
+    assert '--symbol' in result.stdout
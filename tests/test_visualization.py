@@ -0,0 +1,229 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.visualization.plotter import ForecastPlotter, minmax_indices, downsample_frame, align_series, normalize_series
+from src.visualization.cache import PlotCache
+from src.visualization.template import ForecastFigureTemplate
+
+
+def test_minmax_indices_keeps_extremes():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=10_000)
+    
+    indices = minmax_indices(values, 100)
+    
+    assert len(indices) <= 202
+    assert indices[0] == 0
+    assert indices[-1] == len(values) - 1
+    assert values.argmax() in indices
+    assert values.argmin() in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_minmax_indices_short_series_unchanged():
+    values = np.arange(50, dtype=float)
+    
+    assert np.array_equal(minmax_indices(values, 100), np.arange(50))
+
+
+def test_downsample_frame_shares_rows(sample_forecast):
+    result = downsample_frame(sample_forecast, ['yhat', 'yhat_lower', 'yhat_upper'], 100)
+    
+    assert len(result) <= 100
+    assert result['ds'].is_monotonic_increasing
+    assert result['ds'].iloc[-1] == sample_forecast['ds'].iloc[-1]
+
+
+@pytest.mark.parametrize("max_points", [10, 57, 300])
+def test_downsample_frame_caps_union(max_points):
+    # Unrelated noise in each column, so their extremes fall on different rows
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(size=(5000, 3)), columns=['a', 'b', 'c'])
+    
+    result = downsample_frame(frame, ['a', 'b', 'c'], max_points)
+    
+    assert len(result) <= max_points
+    assert result.index[0] == 0
+    assert result.index[-1] == 4999
+
+
+@pytest.mark.parametrize("max_points", [None, 10_000])
+def test_downsample_frame_no_op(sample_forecast, max_points):
+    result = downsample_frame(sample_forecast, ['yhat'], max_points)
+    
+    assert len(result) == len(sample_forecast)
+
+
+def test_plot_forecast_creates_file(trained_model, tmp_path):
+    plotter = ForecastPlotter(output_dir=str(tmp_path), dpi=50)
+    forecast = trained_model.predict(periods=30)
+    
+    path = plotter.plot_forecast(trained_model, forecast, 'TEST')
+    
+    assert (tmp_path / 'forecast_TEST.png').exists()
+    assert path.endswith('forecast_TEST.png')
+
+
+@pytest.mark.parametrize("fmt,workers", [('png', 1), ('svg', 1), ('png', 2)])
+def test_plot_forecast_batch(sample_forecast, sample_prophet_data, tmp_path, fmt, workers):
+    plotter = ForecastPlotter(output_dir=str(tmp_path))
+    forecasts = {'AAA': sample_forecast, 'BBB': sample_forecast}
+    histories = {'AAA': sample_prophet_data}
+    
+    paths = plotter.plot_forecast_batch(forecasts, histories, dpi=40, fmt=fmt, workers=workers)
+    
+    assert set(paths) == {'AAA', 'BBB'}
+    for symbol in forecasts:
+        assert (tmp_path / f'forecast_{symbol}.{fmt}').exists()
+
+
+def test_plot_cache_skips_unchanged_charts(sample_forecast, sample_prophet_data, tmp_path, monkeypatch):
+    plotter = ForecastPlotter(output_dir=str(tmp_path), dpi=40, cache_dir=str(tmp_path / 'cache'))
+    histories = {'AAA': sample_prophet_data}
+    
+    plotter.plot_forecast_batch({'AAA': sample_forecast}, histories, workers=1)
+    assert len(list((tmp_path / 'cache').glob('*.png'))) == 1
+    
+    # A second run with identical data must not render
+    def fail(*args, **kwargs):
+        raise AssertionError('chart was re-rendered')
+    monkeypatch.setattr(ForecastFigureTemplate, 'update', fail)
+    
+    paths = plotter.plot_forecast_batch({'AAA': sample_forecast}, histories, workers=1)
+    assert (tmp_path / 'forecast_AAA.png').exists()
+    assert paths['AAA'].endswith('forecast_AAA.png')
+
+
+def test_in_process_batch_keeps_no_worker_plotters(sample_forecast, tmp_path):
+    from src.visualization import plotter as plotter_module
+    
+    plotter = ForecastPlotter(output_dir=str(tmp_path), dpi=40)
+    plotter.plot_forecast_batch({'AAA': sample_forecast, 'BBB': sample_forecast}, workers=1)
+    
+    assert plotter_module._worker_plotters == {}
+    assert (tmp_path / 'forecast_BBB.png').exists()
+
+
+def test_plot_cache_renders_changed_charts(sample_forecast, tmp_path):
+    plotter = ForecastPlotter(output_dir=str(tmp_path), dpi=40, cache_dir=str(tmp_path / 'cache'))
+    changed = sample_forecast.copy()
+    changed['yhat'] += 1
+    
+    plotter.plot_forecast_batch({'AAA': sample_forecast}, workers=1)
+    plotter.plot_forecast_batch({'AAA': changed}, workers=1)
+    
+    assert len(list((tmp_path / 'cache').glob('*.png'))) == 2
+
+
+def test_plot_cache_prunes_old_and_excess_charts(tmp_path):
+    directory = tmp_path / 'cache'
+    directory.mkdir()
+    now = time.time()
+    for i, age_days in enumerate([30, 3, 2, 1]):
+        path = directory / f'chart{i}.png'
+        path.write_bytes(b'x' * 1000)
+        os.utime(path, (now - age_days * 86400, now - age_days * 86400))
+    
+    # Construction prunes: chart0 is past max_age, chart1 is the least
+    # recently used of the rest and doesn't fit
+    cache = PlotCache(str(directory), max_age=7 * 86400, max_bytes=2500)
+    assert sorted(p.name for p in directory.iterdir()) == ['chart2.png', 'chart3.png']
+    
+    # A hit marks the chart as used, so the other one goes first; the chart
+    # itself (and any published hard link to it) keeps its mtime
+    published = tmp_path / 'published.png'
+    cache.publish(directory / 'chart2.png', published)
+    mtime = published.stat().st_mtime
+    cache.lookup('chart2', 'png')
+    assert published.stat().st_mtime == mtime
+    
+    (directory / 'chart4.png').write_bytes(b'x' * 1000)
+    assert cache.prune() == 1
+    assert sorted(p.name for p in directory.iterdir()) == ['chart2.png', 'chart2.png.used', 'chart4.png']
+    
+    # A pruned chart takes its marker with it
+    cache.max_bytes = 1500
+    assert cache.prune() == 1
+    assert sorted(p.name for p in directory.iterdir()) == ['chart4.png']
+
+
+def test_template_reuses_artists(sample_forecast, sample_prophet_data):
+    template = ForecastFigureTemplate(figsize=(8, 4))
+    
+    template.update(sample_prophet_data, sample_forecast, 'AAA')
+    artists = list(template.ax.get_children())
+    
+    shifted = sample_forecast.copy()
+    shifted[['yhat', 'yhat_lower', 'yhat_upper']] *= 2
+    template.update(None, shifted, 'BBB')
+    
+    assert list(template.ax.get_children()) == artists
+    assert 'BBB' in template.title.get_text()
+    assert template.ax.get_ylim()[1] >= shifted['yhat_upper'].max()
+    assert not template.history_line.get_visible()
+    assert not template.summary.get_visible()
+
+
+def _comparison_forecasts(n_symbols, n_days=500):
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2023-01-01', periods=n_days, freq='D')
+    return {
+        f'SYM{i}': pd.DataFrame({'ds': dates, 'yhat': rng.uniform(10, 500) * np.exp(np.cumsum(rng.normal(0, 0.01, n_days)))})
+        for i in range(n_symbols)
+    }
+
+
+def test_normalize_series_rebases_to_100():
+    forecasts = _comparison_forecasts(3)
+    wide = normalize_series(align_series(forecasts, list(forecasts)), base_date='2023-03-01')
+    
+    assert list(wide.columns) == ['SYM0', 'SYM1', 'SYM2']
+    assert np.allclose(wide.loc['2023-03-01'], 100)
+
+
+def test_normalize_series_base_date_after_data():
+    forecasts = _comparison_forecasts(2)
+    wide = align_series(forecasts, list(forecasts))
+    
+    with pytest.raises(ValueError, match='2099-01-01'):
+        normalize_series(wide, base_date='2099-01-01')
+
+
+def test_normalize_series_uses_first_valid_value():
+    forecasts = _comparison_forecasts(2)
+    forecasts['SYM1'] = forecasts['SYM1'].iloc[10:]
+    wide = normalize_series(align_series(forecasts, list(forecasts)))
+    
+    assert wide['SYM0'].iloc[0] == pytest.approx(100)
+    assert wide['SYM1'].dropna().iloc[0] == pytest.approx(100)
+
+
+def test_comparison_plot_single_collection(tmp_path):
+    forecasts = _comparison_forecasts(150)
+    plotter = ForecastPlotter(output_dir=str(tmp_path), figsize=(8, 4), dpi=50)
+    
+    fig = plotter._comparison_lines(normalize_series(align_series(forecasts, list(forecasts))), 'Comparison', True)
+    ax = fig.axes[0]
+    
+    assert len(ax.collections) == 1
+    assert len(ax.collections[0].get_segments()) == 150
+    assert all(len(segment) < 500 for segment in ax.collections[0].get_segments())
+    assert ax.get_legend() is None
+    assert ax.get_ylabel() == 'Normalized Price (base = 100)'
+    
+    path = plotter.create_comparison_plot(forecasts, list(forecasts))
+    assert path.endswith('comparison.png')
+    assert (tmp_path / 'comparison.png').exists()
+
+
+def test_comparison_plot_small_multiples(tmp_path):
+    forecasts = _comparison_forecasts(5)
+    plotter = ForecastPlotter(output_dir=str(tmp_path), figsize=(8, 4), dpi=50)
+    
+    path = plotter.create_comparison_plot(forecasts, list(forecasts), small_multiples=True)
+    
+    assert path.endswith('comparison_grid.png')
+    assert (tmp_path / 'comparison_grid.png').exists()